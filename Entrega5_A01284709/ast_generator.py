@@ -1,116 +1,224 @@
+from array import array
 from dataclasses import dataclass
 from typing import List, Optional, Union
-from lark import Transformer, Token
 
-@dataclass
+@dataclass(slots=True)
 class ASTNode:
     pass
 
-@dataclass
+@dataclass(slots=True)
 class Program(ASTNode):
     name: str
     variables: List['VariableDecl']
     functions: List['Function']
     main: 'Block'
 
-@dataclass
+@dataclass(slots=True)
 class VariableDecl(ASTNode):
     names: List[str]
     type: str  # 'int' or 'float'
 
-@dataclass
+@dataclass(slots=True)
 class Function(ASTNode):
     name: str
     parameters: List['Parameter']
     variables: List['VariableDecl']
     body: 'Block'
 
-@dataclass
+@dataclass(slots=True)
 class Parameter(ASTNode):
     name: str
     type: str  # 'int' or 'float'
     address: int = None
 
 # Statements
-@dataclass
+@dataclass(slots=True)
 class Block(ASTNode):
     statements: List['Statement']
 
-@dataclass
+@dataclass(slots=True)
 class Statement(ASTNode):
     pass
 
-@dataclass
+@dataclass(slots=True)
 class Assignment(Statement):
     target: str
     value: 'Expression'
 
-@dataclass
+@dataclass(slots=True)
 class IfStatement(Statement):
     condition: 'Expression'
     then_block: Block
     else_block: Optional[Block]
 
-@dataclass
+@dataclass(slots=True)
 class WhileLoop(Statement):
     condition: 'Expression'
     body: Block
 
-@dataclass
+@dataclass(slots=True)
 class FunctionCall(Statement):
     name: str
     arguments: List['Expression']
 
-@dataclass
+@dataclass(slots=True)
 class PrintStatement(Statement):
     items: List[Union['Expression', str]]
 
 # Expressions
-@dataclass
+@dataclass(slots=True)
 class Expression(ASTNode):
     pass
 
-@dataclass
+@dataclass(slots=True)
 class BinaryOp(Expression):
     left: Expression
     op: str  # +,-,*,/,>,<,!=
     right: Expression
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOp(Expression):
     op: str  # +,-
     operand: Expression
 
-@dataclass
+@dataclass(slots=True)
 class Variable(Expression):
     name: str
 
-@dataclass
+@dataclass(slots=True)
 class Literal(Expression):
     value: Union[int, float]
     type: str  # int or float
 
-class ASTTransformer(Transformer):
-    def _create_node(self, **attrs):
-        return type('Node', (), attrs)
+# Arena de expresiones
+# opcodes de los nodos guardados en la arena; los binarios usan el mismo simbolo que BinaryOp.op
+ARENA_LITERAL = 0
+ARENA_VARIABLE = 1
+ARENA_OPS = ('literal', 'variable', '+', '-', '*', '/', '>', '<', '!=', 'u+', 'u-')
+ARENA_OPCODES = {op: code for code, op in enumerate(ARENA_OPS)}
+ARENA_FIRST_UNARY = ARENA_OPCODES['u+']
+
+class ExpressionArena:
+    # guarda los nodos de expresion en arreglos paralelos en lugar de un objeto por nodo:
+    #   ops[i]    opcode del nodo (ARENA_OPS)
+    #   left[i]   indice del hijo izquierdo (o del operando en unarios), -1 si no tiene
+    #   right[i]  indice del hijo derecho, -1 si no tiene
+    #   values[i] indice en literals (ARENA_LITERAL) o en names (ARENA_VARIABLE), -1 si no aplica
+    # los hijos siempre se agregan antes que el padre, asi que left[i] y right[i] son menores que i
+    def __init__(self):
+        self.ops = array('b')
+        self.left = array('i')
+        self.right = array('i')
+        self.values = array('i')
+        self.literals = []  # [(value, type)]
+        self.names = []
+        self._literal_index = {}
+        self._name_index = {}
+
+    def __len__(self):
+        return len(self.ops)
+
+    def _add(self, op, left, right, value):
+        self.ops.append(op)
+        self.left.append(left)
+        self.right.append(right)
+        self.values.append(value)
+        return len(self.ops) - 1
+
+    def _literal_slot(self, value, type):
+        key = (value, type)
+        index = self._literal_index.get(key)
+        if index is None:
+            index = len(self.literals)
+            self.literals.append(key)
+            self._literal_index[key] = index
+        return index
+
+    def add_literal(self, value, type):
+        return self._add(ARENA_LITERAL, -1, -1, self._literal_slot(value, type))
+
+    def set_literal(self, index, value, type):
+        # convierte el nodo index en una literal (lo usa el constant folding);
+        # sus hijos quedan en la arena pero ya nadie los referencia
+        self.ops[index] = ARENA_LITERAL
+        self.left[index] = -1
+        self.right[index] = -1
+        self.values[index] = self._literal_slot(value, type)
+
+    def add_variable(self, name):
+        index = self._name_index.get(name)
+        if index is None:
+            index = len(self.names)
+            self.names.append(name)
+            self._name_index[name] = index
+        return self._add(ARENA_VARIABLE, -1, -1, index)
+
+    def add_binary(self, left, op, right):
+        return self._add(ARENA_OPCODES[op], left, right, -1)
+
+    def add_unary(self, op, operand):
+        return self._add(ARENA_OPCODES['u' + op], operand, -1, -1)
+
+    def to_node(self, index):
+        # reconstruye el subarbol como nodos normales (util para depurar y comparar)
+        op = self.ops[index]
+        if op == ARENA_LITERAL:
+            value, type = self.literals[self.values[index]]
+            return Literal(value=value, type=type)
+        if op == ARENA_VARIABLE:
+            return Variable(name=self.names[self.values[index]])
+        if op >= ARENA_FIRST_UNARY:
+            return UnaryOp(op=ARENA_OPS[op][1:], operand=self.to_node(self.left[index]))
+        return BinaryOp(left=self.to_node(self.left[index]), op=ARENA_OPS[op], right=self.to_node(self.right[index]))
+
+@dataclass(slots=True)
+class ArenaExpression(Expression):
+    # referencia a la raiz de una expresion guardada en un ExpressionArena
+    arena: ExpressionArena
+    index: int
+
+class ASTTransformer:
+    def __init__(self, arena=None):
+        # con arena, las expresiones se guardan en el ExpressionArena y el AST solo
+        # tiene ArenaExpression en las raices (asignaciones, condiciones, prints, argumentos)
+        self.arena = arena
+
+
+    # no dependemos de lark: el arbol puede venir de lark o del parser standalone generado,
+    # solo necesitamos que los nodos tengan .data y .children (los tokens son str)
+    def transform(self, tree):
+        children = [self.transform(child) if hasattr(child, 'children') else child for child in tree.children]
+        return getattr(self, tree.data)(children)
+
+    def _binary(self, left, op, right):
+        if self.arena is None:
+            return BinaryOp(left=left, op=op, right=right)
+        return ArenaExpression(self.arena, self.arena.add_binary(left.index, op, right.index))
+
+    def _unary(self, op, operand):
+        if self.arena is None:
+            return UnaryOp(op=op, operand=operand)
+        return ArenaExpression(self.arena, self.arena.add_unary(op, operand.index))
+
+    def _variable(self, name):
+        if self.arena is None:
+            return Variable(name=name)
+        return ArenaExpression(self.arena, self.arena.add_variable(name))
+
+    def _literal(self, value, type):
+        if self.arena is None:
+            return Literal(value=value, type=type)
+        return ArenaExpression(self.arena, self.arena.add_literal(value, type))
     
+    def start(self, items):
+        return items[0]
+
     def programa(self, items):
         # PROGRAM ID SEMI pro_vars_dec funcs_loop MAIN body END
-        variables = items[3] if isinstance(items[3], list) else []
-        functions = items[4] if isinstance(items[4], list) else []
-        
-        # aplanar funciones en caso de que haya listas anidadas
-        flat_functions = []
-        for item in functions:
-            if isinstance(item, list):
-                flat_functions.extend(item)
-            else:
-                flat_functions.append(item)
-        
         return Program(
             name=items[1].value,
-            variables=variables,
-            functions=flat_functions,
+            variables=items[3],
+            functions=items[4],
             main=items[6]
         )
     
@@ -118,60 +226,20 @@ class ASTTransformer(Transformer):
         return items[0] if items else []
     
     def funcs_loop(self, items):
-        # aplanar funciones en caso de que haya listas anidadas
-        functions = []
-        for item in items:
-            if isinstance(item, list):
-                functions.extend(item)
-            else:
-                functions.append(item)
-        return functions
+        # funcs*, la gramatica ya nos da la lista plana
+        return items
     
     def vars(self, items):
-        # VAR variable vars_prime
-        variables = [items[1]]
-        if len(items) > 2:
-            variables.extend(items[2])
-        return variables
-    
-    def vars_prime(self, items):
-        # aplanar variables en caso de que haya listas anidadas
-        result = []
-        for item in items:
-            if isinstance(item, list):
-                result.extend(item)
-            else:
-                result.append(item)
-        return result
+        # VAR variable+
+        return items[1:]
     
     def variable(self, items):
         # ids COLON type SEMI
-        return VariableDecl(
-            names=items[0] if isinstance(items[0], list) else [items[0]],
-            type=items[2]
-        )
+        return VariableDecl(names=items[0], type=items[2])
     
     def ids(self, items):
-        # ID ids_prime
-        names = [items[0].value]
-        if len(items) > 1:
-            if isinstance(items[1], list):
-                names.extend(items[1])
-            else:
-                names.append(items[1])
-        return names
-
-    def ids_prime(self, items):
-        if not items:
-            return []
-        # COMMA ID ids_prime
-        names = [items[1].value]
-        if len(items) > 2:
-            if isinstance(items[2], list):
-                names.extend(items[2])
-            else:
-                names.append(items[2])
-        return names
+        # ID (COMMA ID)*, los ids estan en las posiciones pares
+        return [token.value for token in items[::2]]
     
     def type(self, items):
         return items[0].type.lower()
@@ -182,14 +250,8 @@ class ASTTransformer(Transformer):
         return Block(statements=items[1])
     
     def statement_loop(self, items):
-        # aplanar statements en caso de que haya listas anidadas
-        statements = []
-        for item in items:
-            if isinstance(item, list):
-                statements.extend(item)
-            else:
-                statements.append(item)
-        return statements
+        # statement*, la gramatica ya nos da la lista plana
+        return items
     
     def statement(self, items):
         return items[0]
@@ -226,97 +288,42 @@ class ASTTransformer(Transformer):
         return PrintStatement(items=items[2])
     
     def expstr_loop(self, items):
-        items_list = [items[0]]
-        if len(items) > 1:
-            items_list.extend(items[1])
-        return items_list
+        # expstr (COMMA expstr)*
+        return items[::2]
     
-    def expstr_loop_prime(self, items):
-        if not items:
-            return []
-        # COMMA expresion or COMMA CTE_STRING
-        items_list = [items[1]]
-        if len(items) > 2:
-            items_list.extend(items[2])
-        return items_list
+    def expstr(self, items):
+        # los CTE_STRING se guardan como str simple (con comillas) para no depender del Token
+        item = items[0]
+        return str(item) if isinstance(item, str) else item
     
     # Expressions
     def expresion(self, items):
         if len(items) == 1:
             return items[0]
         # exp OP exp
-        return BinaryOp(left=items[0], op=items[1].value, right=items[2])
+        return self._binary(items[0], items[1].value, items[2])
     
     def exp(self, items):
         return items[0]
     
-    def exp_loop(self, items):
-        # exp_loop: termino exp_loop_prime
+    def _fold_left(self, items):
+        # items = [operando, op, operando, op, operando, ...]
+        # construimos el arbol asociando a la izquierda en una sola pasada
         left = items[0]
-        
-        if len(items) == 1 or not items[1]:
-            return left
-        
-        exp_loop_prime = items[1]
-        
-        if isinstance(exp_loop_prime, list):
-            if not exp_loop_prime:
-                return left
-            op = exp_loop_prime[0].value if isinstance(exp_loop_prime[0], Token) else exp_loop_prime[0]
-            right = exp_loop_prime[1]
-            return BinaryOp(left=left, op=op, right=right)
-        
-        if hasattr(exp_loop_prime, 'children'):
-            op_token = exp_loop_prime.children[0]
-            right = exp_loop_prime.children[1]
-            return BinaryOp(left=left, op=op_token.value, right=right)
-        
+        for i in range(1, len(items), 2):
+            left = self._binary(left, items[i].value, items[i + 1])
         return left
-
-    def exp_loop_prime(self, items):
-        # exp_loop_prime: PLUS exp_loop | MINUS exp_loop | ε
-        if not items:
-            return []
-        return items[:2]
+    
+    def exp_loop(self, items):
+        # termino ((PLUS | MINUS) termino)*
+        return self._fold_left(items)
     
     def termino(self, items):
         return items[0]
     
     def term_loop(self, items):
-        # term_loop: factor term_loop_prime
-        left = items[0]
-        
-        # si no hay term_loop_prime o es vacio, solo retorna el factor
-        if len(items) == 1 or not items[1]:
-            return left
-        
-        # term_loop_prime contiene el operador y el operando derecho
-        term_loop_prime = items[1]
-        
-        # si term_loop_prime es una lista (del transformer)
-        if isinstance(term_loop_prime, list):
-            if not term_loop_prime:
-                return left
-            # la lista debe contener [operador, operando derecho]
-            op = term_loop_prime[0].value if isinstance(term_loop_prime[0], Token) else term_loop_prime[0]
-            right = term_loop_prime[1]
-            return BinaryOp(left=left, op=op, right=right)
-        
-        # si term_loop_prime es un Tree (original parse tree)
-        if hasattr(term_loop_prime, 'children'):
-            op_token = term_loop_prime.children[0]
-            right = term_loop_prime.children[1]
-            return BinaryOp(left=left, op=op_token.value, right=right)
-        
-        return left
-
-    def term_loop_prime(self, items):
-        # term_loop_prime: TIMES term_loop | DIVIDE term_loop | ε
-        if not items:
-            return []
-        
-        # retorna el operador y el operando derecho
-        return items[:2] 
+        # factor ((TIMES | DIVIDE) factor)*
+        return self._fold_left(items)
     
     def factor(self, items):
         if len(items) == 3:  # LPAR expresion RPAR
@@ -324,53 +331,38 @@ class ASTTransformer(Transformer):
         # ops idcte
         operand = items[1]
         if items[0]: # tiene operador
-            return UnaryOp(op=items[0], operand=operand)
+            return self._unary(items[0], operand)
         return operand
     
     def ops(self, items):
         return items[0].value if items else None
     
     def idcte(self, items):
-        if isinstance(items[0], Token) and items[0].type == 'ID':
-            return Variable(name=items[0].value)
+        if isinstance(items[0], str):  # token ID
+            return self._variable(items[0].value)
         return items[0]  # cte
     
     def cte(self, items):
         value = items[0].value
         if items[0].type == 'CTE_INT':
-            return Literal(value=int(value), type='int')
+            return self._literal(int(value), 'int')
         elif items[0].type == 'CTE_FLOAT':
-            return Literal(value=float(value), type='float')
+            return self._literal(float(value), 'float')
     
     # Functions
     def funcs(self, items):
         # VOID ID LPAR id_loop RPAR LBRACK vars_des body RBRACK SEMI
         return Function(
             name=items[1].value,
-            parameters=items[3] if isinstance(items[3], list) else [],
-            variables=items[6] if isinstance(items[6], list) else [],
+            parameters=items[3],
+            variables=items[6],
             body=items[7]
         )
     
     def id_loop(self, items):
-        if not items:
-            return []
-        # ID COLON type id_loop_prime
-        param = Parameter(name=items[0].value, type=items[2])
-        params = [param]
-        if len(items) > 3:
-            params.extend(items[3])
-        return params
-    
-    def id_loop_prime(self, items):
-        if not items:
-            return []
-        # COMMA ID COLON type id_loop_prime
-        param = Parameter(name=items[1].value, type=items[3])
-        params = [param]
-        if len(items) > 4:
-            params.extend(items[4])
-        return params
+        # (ID COLON type (COMMA ID COLON type)*)?
+        # cada parametro ocupa 3 posiciones y los separa una COMMA
+        return [Parameter(name=items[i].value, type=items[i + 2]) for i in range(0, len(items), 4)]
     
     def vars_des(self, items):
         return items[0] if items else []
@@ -380,19 +372,5 @@ class ASTTransformer(Transformer):
         return FunctionCall(name=items[0].value, arguments=items[2])
     
     def exp_fcall_loop(self, items):
-        if not items:
-            return []
-        # expresion exp_fcall_loop_prime
-        args = [items[0]]
-        if len(items) > 1:
-            args.extend(items[1])
-        return args
-    
-    def exp_fcall_loop_prime(self, items):
-        if not items:
-            return []
-        # COMMA expresion exp_fcall_loop_prime
-        args = [items[1]]
-        if len(items) > 2:
-            args.extend(items[2])
-        return args
\ No newline at end of file
+        # (expresion (COMMA expresion)*)?
+        return items[::2]
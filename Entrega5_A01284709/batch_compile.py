@@ -0,0 +1,126 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import compiled_program
+from vm import compile_program
+
+SOURCE_EXTENSION = '.bd'
+
+def collect_sources(paths):
+    # acepta archivos sueltos o directorios (se buscan los .bd recursivamente)
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                sources.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(SOURCE_EXTENSION))
+        else:
+            sources.append(path)
+    return sources
+
+def output_path(source_path, output_dir):
+    base = os.path.splitext(os.path.basename(source_path))[0] + compiled_program.COMPILED_EXTENSION
+    return os.path.join(output_dir or os.path.dirname(source_path), base)
+
+def compile_file(job):
+    # corre en un proceso del pool; cada proceso construye su parser una sola vez
+    source_path, output_dir, options = job
+    result = {'source': source_path, 'error': None, 'timings': {}, 'stats': {}, 'quadruples': 0, 'bytes': 0}
+    timings = result['timings']
+
+    try:
+        start = time.perf_counter()
+        with open(source_path) as f:
+            source_code = f.read()
+        timings['read'] = time.perf_counter() - start
+        result['bytes'] = len(source_code.encode('utf-8'))
+
+        compilation_data = compile_program(source_code, timings=timings, stats=result['stats'], **options)
+        result['quadruples'] = len(compilation_data['quadruples'])
+
+        start = time.perf_counter()
+        result['output'] = output_path(source_path, output_dir)
+        compiled_program.save(compilation_data, result['output'])
+        timings['write'] = time.perf_counter() - start
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    return result
+
+def print_report(results, wall_time, jobs):
+    phases = ('read', 'parse', 'fold', 'semantic', 'cse', 'peephole', 'encode', 'write')
+    header = f"{'file':<40} " + ' '.join(f"{phase + ' ms':>12}" for phase in phases) + f" {'quads':>8}"
+    print(header)
+    print('-' * len(header))
+
+    for result in results:
+        name = result['source']
+        if result['error']:
+            print(f"{name:<40} ERROR {result['error']}")
+            continue
+        cells = ' '.join(f"{result['timings'].get(phase, 0) * 1000:12.2f}" for phase in phases)
+        print(f"{name:<40} {cells} {result['quadruples']:>8}")
+
+    compiled = [r for r in results if not r['error']]
+    total_bytes = sum(r['bytes'] for r in compiled)
+    total_quads = sum(r['quadruples'] for r in compiled)
+    print('-' * len(header))
+    totals = ' '.join(f"{sum(r['timings'].get(phase, 0) for r in compiled) * 1000:12.2f}" for phase in phases)
+    print(f"{'total (cpu time per phase)':<40} {totals} {total_quads:>8}")
+    # contadores de las optimizaciones (cuadruplos eliminados, etc.) sumados sobre todos los archivos
+    stats = {}
+    for r in compiled:
+        for name, value in r['stats'].items():
+            if isinstance(value, int):
+                stats[name] = stats.get(name, 0) + value
+    for name, value in stats.items():
+        print(f"{name}: {value}")
+    print(f"\n{len(compiled)}/{len(results)} files compiled with {jobs} workers in {wall_time:.3f} s")
+    if wall_time > 0:
+        print(f"throughput: {len(compiled) / wall_time:.1f} files/s, "
+              f"{total_bytes / 2**20 / wall_time:.2f} MB/s, {total_quads / wall_time:.0f} quads/s")
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compile BabyDuck programs in parallel")
+    arg_parser.add_argument('paths', nargs='+', help=f"{SOURCE_EXTENSION} files or directories")
+    arg_parser.add_argument('-o', '--output-dir', help="directory for the compiled files (default: next to each source)")
+    arg_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help="number of worker processes")
+    arg_parser.add_argument('--parser', choices=('earley', 'lalr'), default='lalr', help="parser mode")
+    arg_parser.add_argument('--fast-tokenizer', action='store_true', help="use BabyDuckTokenizer instead of lark's lexer")
+    arg_parser.add_argument('--no-fold', action='store_true', help="disable constant folding")
+    arg_parser.add_argument('--no-licm', action='store_true', help="disable loop-invariant code motion")
+    arg_parser.add_argument('--rotate-loops', action='store_true', help="emit while loops with the condition at the bottom (GOTOV)")
+    arg_parser.add_argument('--no-specialize', action='store_true', help="emit generic operators instead of type-specialized opcodes")
+    arg_parser.add_argument('--inline-threshold', type=int, default=8, help="inline void functions with at most this many quadruples (0 disables)")
+    arg_parser.add_argument('--no-cse', action='store_true', help="disable common subexpression elimination")
+    arg_parser.add_argument('--no-peephole', action='store_true', help="disable the peephole optimizer")
+    args = arg_parser.parse_args(argv)
+
+    sources = collect_sources(args.paths)
+    if not sources:
+        print("No source files found")
+        return 1
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    options = {'parser_mode': args.parser, 'fast_tokenizer': args.fast_tokenizer, 'fold_constants': not args.no_fold,
+               'hoist_invariants': not args.no_licm, 'rotate_loops': args.rotate_loops,
+               'specialize_ops': not args.no_specialize, 'inline_threshold': args.inline_threshold,
+               'eliminate_subexpressions': not args.no_cse, 'peephole_optimize': not args.no_peephole}
+    jobs = max(1, min(args.jobs, len(sources)))
+    work = [(source, args.output_dir, options) for source in sources]
+
+    start = time.perf_counter()
+    if jobs == 1:
+        results = [compile_file(job) for job in work]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(compile_file, work, chunksize=max(1, len(work) // (jobs * 4))))
+    wall_time = time.perf_counter() - start
+
+    print_report(results, wall_time, jobs)
+    return 1 if any(r['error'] for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
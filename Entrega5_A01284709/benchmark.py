@@ -0,0 +1,585 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from lark import Lark
+from grammar import grammar
+from sample_programs import test1, test2, test3, test5, test6, test7, generate_program, generate_mixed_program, generate_expression_program, generate_nested_loop_program, generate_call_program, generate_wide_caller_program
+from dataclasses import dataclass
+from ast_generator import ASTTransformer, BinaryOp, Variable, ExpressionArena, IfStatement, WhileLoop
+from semantic_analyzer import SemanticAnalyzer
+import parsing
+from tokenizer import BabyDuckTokenizer
+
+PROGRAMS = {
+    'test1': test1,
+    'test2': test2,
+    'test3': test3,
+    'test5': test5,
+    'test6': test6,
+    'test7': test7,
+}
+
+def timeit(func, repeat=20):
+    # regresamos el mejor tiempo en milisegundos
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def bench_parser(repeat=20):
+    print("=== Parser: Earley vs LALR cacheado ===")
+
+    # construccion del parser: Earley compila la gramatica siempre,
+    # LALR carga las tablas del cache en disco
+    parsing.build_parser('lalr')  # aseguramos que el cache exista
+    earley_build = timeit(lambda: parsing.build_parser('earley'), repeat)
+    lalr_nocache_build = timeit(lambda: Lark(grammar, start='start', parser='lalr'), repeat)
+    lalr_build = timeit(lambda: parsing.build_parser('lalr'), repeat)
+    print(f"{'build':<10} earley {earley_build:9.3f} ms   lalr {lalr_nocache_build:9.3f} ms   lalr(cache) {lalr_build:9.3f} ms")
+
+    earley = parsing.get_parser('earley')
+    lalr = parsing.get_parser('lalr')
+    print(f"{'program':<10} {'earley ms':>12} {'lalr ms':>12} {'speedup':>10}")
+    for name, code in PROGRAMS.items():
+        earley_ms = timeit(lambda: earley.parse(code), repeat)
+        lalr_ms = timeit(lambda: lalr.parse(code), repeat)
+        print(f"{name:<10} {earley_ms:12.3f} {lalr_ms:12.3f} {earley_ms / lalr_ms:9.1f}x")
+
+def run_vm_process(source_code, standalone):
+    # corremos vm.py en frio, alimentando el programa por stdin como lo haria un usuario
+    env = dict(os.environ, BABYDUCK_STANDALONE='1' if standalone else '0')
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, 'vm.py'],
+        input=source_code.strip() + '\n\n',
+        capture_output=True, text=True, check=True,
+        cwd=parsing.BASE_DIR, env=env,
+    )
+    return (time.perf_counter() - start) * 1000
+
+def bench_startup(repeat=10):
+    print("=== Arranque en frio de vm.py ===")
+    if parsing.load_standalone() is None:
+        print("babyduck_parser.py is missing or stale, run: python generate_parser.py")
+        return
+
+    parsing.build_parser('lalr')  # el modo lark tambien parte con el cache de tablas listo
+
+    def interpreter_only():
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        return (time.perf_counter() - start) * 1000
+
+    best = min(interpreter_only() for _ in range(repeat))
+    print(f"{'python -c pass':<20} {best:9.1f} ms")
+    for label, standalone in (('lark (cached lalr)', False), ('standalone', True)):
+        best = min(run_vm_process(test2, standalone) for _ in range(repeat))
+        print(f"{label:<20} {best:9.1f} ms")
+
+def bench_scaling(repeat=3):
+    print("=== Escalamiento de parse + ASTTransformer con el tamano del programa ===")
+    parser = parsing.get_parser('lalr')
+    transformer = ASTTransformer()
+
+    def measure(label, sizes, make_program):
+        # tiempo por elemento constante => crecimiento lineal
+        print(f"{label:>12} {'parse ms':>12} {'transform ms':>14} {'us/elem':>10}")
+        for n in sizes:
+            code = make_program(n)
+            parse_ms = timeit(lambda: parser.parse(code), repeat)
+            tree = parser.parse(code)
+            transform_ms = timeit(lambda: transformer.transform(tree), repeat)
+            print(f"{n:>12} {parse_ms:12.1f} {transform_ms:14.1f} {(parse_ms + transform_ms) * 1000 / n:10.2f}")
+
+    sizes = (1000, 2000, 4000, 8000, 16000)
+    measure('statements', sizes, lambda n: generate_program(statements=n))
+    measure('chain', sizes, lambda n: generate_program(statements=1, chain=n))
+
+def bench_inline(statements=20000, repeat=3):
+    print(f"=== Arbol de lark + transform vs transformer inline ({statements} statements) ===")
+    code = generate_program(statements=statements, chain=4)
+
+    def two_pass():
+        return parsing.parse_program(code, inline=False)
+
+    def one_pass():
+        return parsing.parse_program(code, inline=True)
+
+    print(f"{'mode':<16} {'time ms':>10} {'peak MB':>10}")
+    for label, func in (('tree+transform', two_pass), ('inline', one_pass)):
+        func()  # construimos el parser fuera de la medicion
+        ms = timeit(func, repeat)
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{label:<16} {ms:10.1f} {peak / 2**20:10.1f}")
+
+@dataclass
+class DictBinaryOp:
+    # BinaryOp sin slots, como eran los nodos antes, solo como referencia
+    left: object
+    op: str
+    right: object
+
+def traced_bytes(build):
+    # memoria retenida por lo que regresa build()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+def bench_ast_memory(nodes=100000, statements=20000):
+    print(f"=== Memoria por nodo de expresion ({nodes} nodos) ===")
+    leaf = Variable(name='x')
+
+    def dict_nodes():
+        return [DictBinaryOp(left=leaf, op='+', right=leaf) for _ in range(nodes)]
+
+    def slotted_nodes():
+        return [BinaryOp(left=leaf, op='+', right=leaf) for _ in range(nodes)]
+
+    def arena_nodes():
+        arena = ExpressionArena()
+        x = arena.add_variable('x')
+        for _ in range(nodes):
+            arena.add_binary(x, '+', x)
+        return arena
+
+    # la lista que guarda los nodos cuesta 8 bytes por elemento, la descontamos
+    print(f"{'layout':<22} {'bytes/node':>12}")
+    for label, build, overhead in (('dataclass (__dict__)', dict_nodes, 8),
+                                   ('dataclass (slots)', slotted_nodes, 8),
+                                   ('ExpressionArena', arena_nodes, 0)):
+        size, _ = traced_bytes(build)
+        print(f"{label:<22} {size / nodes - overhead:12.1f}")
+
+    print(f"=== AST completo de un programa generado ({statements} statements) ===")
+    code = generate_program(statements=statements, chain=4)
+    for arena in (False, True):
+        parsing.parse_program(code, arena=arena)  # construimos el parser fuera de la medicion
+        size, _ = traced_bytes(lambda: parsing.parse_program(code, arena=arena))
+        label = 'ExpressionArena' if arena else 'dataclass (slots)'
+        print(f"{label:<22} {size / 2**20:9.2f} MB  (source {len(code) / 2**20:.2f} MB)")
+
+def bench_tokenizer(statements=20000, repeat=3):
+    print(f"=== Tokenizer: lexer de lark vs BabyDuckTokenizer ({statements} statements) ===")
+    code = generate_program(statements=statements, chain=4)
+    megabytes = len(code.encode('utf-8')) / 2**20
+    parser = parsing.get_parser('lalr')
+    tokenizer = BabyDuckTokenizer(sys.modules[type(parser).__module__].Token)
+
+    print(f"{'lexer':<20} {'ms':>10} {'MB/s':>8}")
+    for label, lex in (('lark', lambda: list(parser.lex(code))),
+                       ('BabyDuckTokenizer', lambda: list(tokenizer.tokenize(code)))):
+        ms = timeit(lex, repeat)
+        print(f"{label:<20} {ms:10.1f} {megabytes / (ms / 1000):8.2f}")
+
+    # parse completo (inline) con cada lexer
+    for label, fast in (('parse + lark lexer', False), ('parse + tokenizer', True)):
+        parsing.parse_program(code, fast_tokenizer=fast)
+        ms = timeit(lambda: parsing.parse_program(code, fast_tokenizer=fast), repeat)
+        print(f"{label:<20} {ms:10.1f} {megabytes / (ms / 1000):8.2f}")
+
+def count_statements(block):
+    total = 0
+    for stmt in block.statements:
+        total += 1
+        if isinstance(stmt, IfStatement):
+            total += count_statements(stmt.then_block)
+            if stmt.else_block:
+                total += count_statements(stmt.else_block)
+        elif isinstance(stmt, WhileLoop):
+            total += count_statements(stmt.body)
+    return total
+
+def bench_codegen(blocks=400, repeat=10):
+    print(f"=== Generacion de codigo de SemanticAnalyzer ({blocks} bloques mixtos) ===")
+    code = generate_mixed_program(blocks)
+    for arena in (False, True):
+        ast = parsing.parse_program(code, arena=arena)
+        statements = count_statements(ast.main) + sum(count_statements(f.body) for f in ast.functions)
+
+        def codegen():
+            SemanticAnalyzer().process_ast(ast)
+
+        ms = timeit(codegen, repeat)
+        label = 'arena' if arena else 'nodes'
+        print(f"{label:<8} {statements} statements  {ms:8.2f} ms  {statements / (ms / 1000):12.0f} statements/s")
+
+def bench_deep_expressions(sizes=(1000, 10000, 100000), repeat=3):
+    print("=== Generacion de codigo para expresiones largas y anidadas ===")
+    print(f"{'shape':<8} {'ast':<6} {'operators':>10} {'ms':>10} {'us/op':>8}")
+    for nested in (False, True):
+        for arena in (False, True):
+            for n in sizes:
+                shape = 'nested' if nested else 'chain'
+                label = f"{shape:<8} {'arena' if arena else 'nodes':<6} {n:>10}"
+                ast = parsing.parse_program(generate_expression_program(n, nested), arena=arena)
+                try:
+                    ms = timeit(lambda: SemanticAnalyzer().process_ast(ast), repeat)
+                except (RecursionError, MemoryError) as e:
+                    print(f"{label} {type(e).__name__}: {e}")
+                    continue
+                print(f"{label} {ms:10.2f} {ms * 1000 / n:8.2f}")
+
+def bench_folding():
+    print("=== Constant folding: cuadruplos con y sin la pasada ===")
+    from vm import compile_program
+    print(f"{'program':<10} {'sin fold':>10} {'con fold':>10} {'eliminados':>11} {'unarios':>8}")
+    for name, source in PROGRAMS.items():
+        plain = compile_program(source, fold_constants=False)
+        stats = {}
+        folded = compile_program(source, stats=stats)
+        print(f"{name:<10} {len(plain['quadruples']):>10} {len(folded['quadruples']):>10} "
+              f"{stats['folded_quadruples']:>11} {stats['folded_unary']:>8}")
+
+def bench_temps(sizes=(100, 1000, 10000)):
+    print("=== Reuso de temporales: direcciones usadas vs pico de temporales vivos ===")
+    print(f"{'blocks':>8} {'quads':>8} {'int':>6} {'float':>6} {'bool':>6}   pico por funcion")
+    for blocks in sizes:
+        analyzer = SemanticAnalyzer()
+        analyzer.process_ast(parsing.parse_program(generate_mixed_program(blocks)))
+        memory = analyzer.memory
+        # direcciones distintas que llego a usar cada segmento temporal
+        used = [memory.current_address[seg] - memory.address_ranges[seg][0] for seg in ('temp_int', 'temp_float', 'temp_bool')]
+        peaks = ', '.join(f"{name}: {peak}" for name, peak in analyzer.peak_temps.items())
+        print(f"{blocks:>8} {len(analyzer.quadruples):>8} {used[0]:>6} {used[1]:>6} {used[2]:>6}   {peaks}")
+
+def run_counted(compilation_data):
+    # ejecuta el programa sin imprimir y regresa cuantos cuadruplos despacho la VM
+    from vm import VirtualMachine
+    vm = VirtualMachine(compilation_data)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vm.execute()
+    return vm.executed_instructions
+
+def bench_cse():
+    print("=== CSE local: cuadruplos estaticos y ejecutados ===")
+    from vm import compile_program
+    print(f"{'program':<10} {'quads':>7} {'con cse':>8} {'ejecutados':>11} {'con cse':>8}")
+    for name, source in PROGRAMS.items():
+        plain = compile_program(source, eliminate_subexpressions=False)
+        optimized = compile_program(source)
+        print(f"{name:<10} {len(plain['quadruples']):>7} {len(optimized['quadruples']):>8} "
+              f"{run_counted(plain):>11} {run_counted(optimized):>8}")
+
+def bench_peephole():
+    print("=== Peephole: cuadruplos estaticos y ejecutados ===")
+    from vm import compile_program
+    print(f"{'program':<10} {'quads':>7} {'peephole':>9} {'ejecutados':>11} {'peephole':>9}")
+    for name, source in PROGRAMS.items():
+        plain = compile_program(source, peephole_optimize=False)
+        optimized = compile_program(source)
+        print(f"{name:<10} {len(plain['quadruples']):>7} {len(optimized['quadruples']):>9} "
+              f"{run_counted(plain):>11} {run_counted(optimized):>9}")
+
+def bench_licm(sizes=((100, 100), (300, 300)), repeat=3):
+    print("=== Loop-invariant code motion en ciclos anidados ===")
+    from vm import compile_program, VirtualMachine
+    print(f"{'trips':>10} {'hoist':>6} {'sacados':>8} {'ejecutados':>11} {'ms':>10}")
+    for outer, inner in sizes:
+        source = generate_nested_loop_program(outer, inner)
+        for hoist in (False, True):
+            stats = {}
+            data = compile_program(source, hoist_invariants=hoist, stats=stats)
+
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    VirtualMachine(data).execute()
+
+            ms = timeit(run, repeat)
+            print(f"{f'{outer}x{inner}':>10} {str(hoist):>6} {stats['hoisted_quadruples']:>8} {run_counted(data):>11} {ms:10.1f}")
+
+def bench_rotation(iterations=1000):
+    print("=== Rotacion de ciclos: cuadruplos despachados por iteracion ===")
+    from vm import compile_program
+    # la diferencia entre correr el ciclo interno 2N y N veces deja solo el costo por iteracion
+    print(f"{'rotado':>7} {'por iteracion':>14} {'nested 100x100':>15}")
+    for rotate in (False, True):
+        short = run_counted(compile_program(generate_nested_loop_program(1, iterations), rotate_loops=rotate))
+        long = run_counted(compile_program(generate_nested_loop_program(1, 2 * iterations), rotate_loops=rotate))
+        nested = run_counted(compile_program(generate_nested_loop_program(100, 100), rotate_loops=rotate))
+        print(f"{str(rotate):>7} {(long - short) / iterations:>14.2f} {nested:>15}")
+
+def bench_cube(lookups=200000, operators=20000, repeat=5):
+    print("=== Cubo semantico: dict con llaves tupla vs tabla densa por codigos ===")
+    from semantic_analyzer import CuboSemantico, TYPE_CODES, TYPE_COUNT, OPERATOR_CODES
+    cube = CuboSemantico()
+    queries = [key for key in cube.ops] * (lookups // len(cube.ops))
+    coded = [(TYPE_CODES[left], OPERATOR_CODES[op], TYPE_CODES[right]) for left, op, right in queries]
+
+    def tuple_lookups():
+        get = cube.ops.get
+        for left, op, right in queries:
+            get((left, op, right))
+
+    def coded_lookups():
+        check = cube.check_codes
+        for left, op, right in coded:
+            check(left, op, right)
+
+    def table_lookups():
+        # lo que hace emit_binary_op en linea: un indice a la lista
+        table = cube.table
+        for left, op, right in coded:
+            table[(op * TYPE_COUNT + left) * TYPE_COUNT + right]
+
+    for name, func in (('tupla + dict', tuple_lookups), ('check_codes', coded_lookups), ('indice directo', table_lookups)):
+        ms = timeit(func, repeat)
+        print(f"{name:<16} {ms:8.2f} ms  {ms * 1e6 / len(queries):6.1f} ns/consulta")
+
+    print()
+    for nested in (False, True):
+        ast = parsing.parse_program(generate_expression_program(operators, nested))
+        ms = timeit(lambda: SemanticAnalyzer().process_ast(ast), repeat)
+        print(f"codegen {'nested' if nested else 'chain':<7} {operators} operadores: {ms:8.2f} ms")
+
+def bench_specialize(repeat=5):
+    print("=== Opcodes especializados por tipo vs operadores genericos ===")
+    from vm import compile_program, VirtualMachine
+    programs = {'test6': test6, 'test7': test7, 'nested 100x100': generate_nested_loop_program(100, 100)}
+    print(f"{'program':<16} {'generico ms':>12} {'especializado ms':>17} {'speedup':>8}")
+    for name, source in programs.items():
+        times = []
+        for specialize in (False, True):
+            data = compile_program(source, specialize_ops=specialize)
+
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    VirtualMachine(data).execute()
+            times.append(timeit(run, repeat))
+        print(f"{name:<16} {times[0]:12.2f} {times[1]:17.2f} {times[0] / times[1]:7.2f}x")
+
+def bench_inlining(thresholds=(0, 8, 32), repeat=20):
+    print("=== Inlining de funciones void chicas ===")
+    from vm import compile_program, VirtualMachine
+    programs = {'test5': test5, 'test6': test6, 'mixed 100': generate_mixed_program(100)}
+    print(f"{'program':<10} {'umbral':>7} {'llamadas':>9} {'overhead':>9} {'ejecutados':>11} {'ms':>8}")
+    for name, source in programs.items():
+        for threshold in thresholds:
+            stats = {}
+            data = compile_program(source, inline_threshold=threshold, stats=stats)
+
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    VirtualMachine(data).execute()
+            ms = timeit(run, repeat)
+            print(f"{name:<10} {threshold:>7} {stats['inlined_calls']:>9} {stats['inlined_overhead']:>9} {run_counted(data):>11} {ms:8.2f}")
+
+def tiled_quadruples(copies):
+    # repite el main de generate_mixed_program con los saltos recorridos, para tener programas
+    # de millones de cuadruplos sin pasar por el parser
+    from vm import compile_program
+    from cfg import JUMP_OPS
+    data = compile_program(generate_mixed_program(100))
+    quadruples = data['quadruples']
+    main = quadruples[0][3]
+    body = quadruples[main:-1]
+    tiled = quadruples[:main]
+    for _ in range(copies):
+        offset = len(tiled) - main
+        tiled.extend((op, arg1, arg2, result + offset) if op in JUMP_OPS else (op, arg1, arg2, result)
+                     for op, arg1, arg2, result in body)
+    tiled.append(quadruples[-1])
+    return tiled
+
+def bench_cfg(copies=(10, 100, 1000), repeat=3):
+    print("=== Grafo de flujo de control: construccion, dominadores y serializacion ===")
+    from cfg import ControlFlowGraph
+    print(f"{'quads':>10} {'bloques':>9} {'build ms':>10} {'idom ms':>10} {'serialize ms':>13} {'ns/quad':>8}")
+    for count in copies:
+        quadruples = tiled_quadruples(count)
+        graph = ControlFlowGraph(quadruples)
+        blocks = [quadruples[block.start:block.end] for block in graph.blocks]
+        build = timeit(lambda: ControlFlowGraph(quadruples), repeat)
+
+        def dominators():
+            graph._idom = None
+            graph.immediate_dominators()
+        idom = timeit(dominators, repeat)
+        serialize = timeit(lambda: graph.serialize(blocks), repeat)
+        total = build + idom + serialize
+        print(f"{len(quadruples):>10} {len(graph):>9} {build:10.1f} {idom:10.1f} {serialize:13.1f} {total * 1e6 / len(quadruples):8.0f}")
+
+def bench_frames(repeat=5):
+    print("=== Direccionamiento plano por frame: fibonacci / factorial ===")
+    from vm import compile_program, VirtualMachine
+    programs = {'test6': test6, 'calls 100': generate_call_program(100), 'calls 1000': generate_call_program(1000)}
+    print(f"{'program':<12} {'inline':>7} {'link ms':>8} {'run ms':>9} {'ejecutados':>11} {'instr/s':>12}")
+    for name, source in programs.items():
+        for threshold in (0, 8):
+            data = compile_program(source, inline_threshold=threshold)
+            link = timeit(lambda: VirtualMachine(data), repeat)
+
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    VirtualMachine(data).execute()
+            ms = timeit(run, repeat) - link
+            executed = run_counted(data)
+            print(f"{name:<12} {threshold:>7} {link:8.2f} {ms:9.2f} {executed:>11} {executed / ms * 1000:12.0f}")
+
+def bench_dispatch(repeat=5):
+    print("=== Despacho: cadena de elif vs threaded code predecodificado ===")
+    from vm import compile_program, VirtualMachine
+    programs = {'test2': test2, 'nested 100x100': generate_nested_loop_program(100, 100),
+                'calls 1000': generate_call_program(1000)}
+    print(f"{'program':<16} {'ejecutados':>11} {'decode ms':>10} {'elif instr/s':>13} {'threaded instr/s':>17} {'speedup':>8}")
+    for name, source in programs.items():
+        data = compile_program(source)
+        executed = run_counted(data)
+        decode = timeit(lambda: VirtualMachine(data).decode(), repeat)
+        rates = []
+        for method in (VirtualMachine.execute_switch, VirtualMachine.execute):
+            def run():
+                vm = VirtualMachine(data)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    method(vm)
+                    return time.perf_counter() - start
+            rates.append(executed / min(run() for _ in range(repeat)))
+        print(f"{name:<16} {executed:>11} {decode:10.2f} {rates[0]:13.0f} {rates[1]:17.0f} {rates[1] / rates[0]:7.2f}x")
+
+def bench_encoding(blocks=(100, 1000), repeat=5):
+    print("=== Codificacion compacta: tuplas vs columnas array('i') ===")
+    import json
+    import compiled_program
+    from vm import compile_program, VirtualMachine
+    print(f"{'blocks':>7} {'quads':>7} {'tuplas B/quad':>14} {'columnas B/quad':>16} {'json tuplas KB':>15} {'bdc KB':>7} {'load ms':>8} {'vm init ms':>11}")
+    for count in blocks:
+        data = compile_program(generate_mixed_program(count))
+        quadruples, code = data['quadruples'], data['code']
+        # memoria de la lista y de cada tupla (los operandos son ints y strings compartidos)
+        tuple_bytes = sys.getsizeof(quadruples) + sum(sys.getsizeof(quad) for quad in quadruples)
+        column_bytes = sum(getattr(code, column).buffer_info()[1] * getattr(code, column).itemsize
+                           for column in compiled_program.CODE_COLUMNS)
+        tuples_json = len(json.dumps([[op, arg1, None if op == 'FUNC' else arg2, result]
+                                      for op, arg1, arg2, result in quadruples]))
+        path = 'benchmark_encoding.bdc'
+        compiled_program.save(data, path)
+        size = os.path.getsize(path)
+        load = timeit(lambda: compiled_program.load(path), repeat)
+        loaded = compiled_program.load(path)
+        init = timeit(lambda: VirtualMachine(loaded), repeat)
+        os.remove(path)
+        print(f"{count:>7} {len(quadruples):>7} {tuple_bytes / len(quadruples):14.1f} {column_bytes / len(quadruples):16.1f} "
+              f"{tuples_json / 1024:15.1f} {size / 1024:7.1f} {load:8.2f} {init:11.2f}")
+
+def bench_activation(local_counts=(1, 50, 500), calls=5000, repeat=5):
+    print("=== Registros de activacion: costo por llamada vs locales del llamador ===")
+    from vm import compile_program, VirtualMachine
+    print(f"{'locales':>8} {'us/llamada':>11}")
+    for local_count in local_counts:
+        # sin inlining para que cada iteracion haga ERA / PARAM / GOSUB / ENDFUNC
+        data = compile_program(generate_wide_caller_program(local_count, calls), inline_threshold=0)
+        empty = compile_program(generate_wide_caller_program(local_count, 0), inline_threshold=0)
+
+        def runner(data):
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    VirtualMachine(data).execute()
+            return run
+        ms = timeit(runner(data), repeat) - timeit(runner(empty), repeat)
+        print(f"{local_count:>8} {ms * 1000 / calls:11.3f}")
+
+def bench_backend(repeat=5):
+    print("=== Backend a python vs interprete en programas con ciclos ===")
+    from vm import compile_program, VirtualMachine
+    from python_backend import PythonBackend
+    programs = {'test2': test2, 'nested 100x100': generate_nested_loop_program(100, 100),
+                'nested 300x300': generate_nested_loop_program(300, 300), 'calls 1000': generate_call_program(1000)}
+    print(f"{'program':<16} {'vm setup ms':>12} {'vm run ms':>10} {'py setup ms':>12} {'py run ms':>10} {'speedup':>8}")
+    for name, source in programs.items():
+        data = compile_program(source)
+        row = []
+        for make in (VirtualMachine, PythonBackend):
+            # setup: ligar y decodificar (vm) o generar y compilar el fuente (backend)
+            row.append(timeit(lambda: make(data), repeat))
+            outputs = []
+            def run():
+                runner = make(data)
+                buffer = io.StringIO()
+                with contextlib.redirect_stdout(buffer):
+                    start = time.perf_counter()
+                    runner.execute()
+                    elapsed = time.perf_counter() - start
+                outputs.append(buffer.getvalue())
+                return elapsed
+            row.append(min(run() for _ in range(repeat)) * 1000)
+            row.append(outputs[0])
+        assert row[2] == row[5], f"{name}: la salida del backend no coincide con la VM"
+        print(f"{name:<16} {row[0]:12.2f} {row[1]:10.2f} {row[3]:12.2f} {row[4]:10.2f} {row[1] / row[4]:7.1f}x")
+
+def bench_tiering(thresholds=(None, 10, 100, 1000), repeat=5):
+    print("=== Ejecucion por niveles: interprete que promueve funciones calientes ===")
+    from vm import compile_program, VirtualMachine
+    from python_backend import PythonBackend
+    programs = {'test5': test5, 'nested 300x300': generate_nested_loop_program(300, 300),
+                'calls 1000': generate_call_program(1000)}
+    print(f"{'program':<16} {'modo':<12} {'total ms':>9}   promovidas (funcion, llamadas, saltos atras, ms)")
+    for name, source in programs.items():
+        data = compile_program(source)
+
+        def total(make):
+            # construir + ejecutar, que es lo que paga un script de una sola corrida
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    runner = make(data)
+                    runner.execute()
+                return runner
+            return timeit(run, repeat), run()
+
+        ms, _ = total(PythonBackend)
+        print(f"{name:<16} {'backend':<12} {ms:9.2f}")
+        for threshold in thresholds:
+            ms, vm = total(lambda data: VirtualMachine(data, tier_threshold=threshold))
+            promoted = ', '.join(f"({p.function}, {p.calls}, {p.back_edges}, {p.seconds * 1000:.2f})" for p in vm.promotions)
+            mode = 'vm' if threshold is None else f"umbral {threshold}"
+            print(f"{name:<16} {mode:<12} {ms:9.2f}   {promoted or '-'}")
+
+BENCHMARKS = {
+    'parser': bench_parser,
+    'startup': bench_startup,
+    'scaling': bench_scaling,
+    'inline': bench_inline,
+    'ast_memory': bench_ast_memory,
+    'tokenizer': bench_tokenizer,
+    'codegen': bench_codegen,
+    'deep_expressions': bench_deep_expressions,
+    'folding': bench_folding,
+    'temps': bench_temps,
+    'cse': bench_cse,
+    'peephole': bench_peephole,
+    'licm': bench_licm,
+    'rotation': bench_rotation,
+    'cube': bench_cube,
+    'specialize': bench_specialize,
+    'inlining': bench_inlining,
+    'cfg': bench_cfg,
+    'frames': bench_frames,
+    'dispatch': bench_dispatch,
+    'encoding': bench_encoding,
+    'activation': bench_activation,
+    'backend': bench_backend,
+    'tiering': bench_tiering,
+}
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name}. Available: {', '.join(BENCHMARKS)}")
+            continue
+        BENCHMARKS[name]()
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+from dataclasses import dataclass, field
+from typing import List
+
+# grafo de flujo de control sobre la lista de cuadruplos: bloques basicos por funcion, aristas de
+# predecesores y sucesores, dominadores y la serializacion de regreso a una lista plana con los
+# destinos de los saltos recorridos. todo se construye en tiempo lineal sobre los cuadruplos
+
+JUMP_OPS = ('GOTO', 'GOTOF', 'GOTOV')
+CONDITIONAL_JUMP_OPS = ('GOTOF', 'GOTOV')
+
+# un bloque termina despues de estos cuadruplos
+BLOCK_END_OPS = ('GOTO', 'GOTOF', 'GOTOV', 'GOSUB', 'MAIN_START', 'FUNC', 'ENDFUNC')
+# y empieza uno nuevo en estos (ERA cambia el contexto de memoria en la VM)
+BLOCK_START_OPS = ('FUNC', 'ENDFUNC', 'ERA')
+
+# los bloques fuera de cualquier FUNC ... ENDFUNC (MAIN_START y el main) son de esta funcion
+MAIN_FUNCTION = 'main'
+
+@dataclass(slots=True)
+class BasicBlock:
+    index: int
+    start: int  # primer cuadruplo
+    end: int    # fin exclusivo
+    function: str
+    successors: List[int] = field(default_factory=list)
+    predecessors: List[int] = field(default_factory=list)
+
+def block_leaders(quadruples):
+    # marcamos los lideres en un arreglo en lugar de ordenar un conjunto, para que sea lineal
+    size = len(quadruples)
+    leader = bytearray(size + 1)
+    leader[0] = 1
+    for index, quad in enumerate(quadruples):
+        op = quad[0]
+        if op in JUMP_OPS or op == 'MAIN_START':
+            if quad[3] is not None and quad[3] < size:
+                leader[quad[3]] = 1
+        if op in BLOCK_END_OPS:
+            leader[index + 1] = 1
+        if op in BLOCK_START_OPS:
+            leader[index] = 1
+    return [index for index in range(size) if leader[index]]
+
+def rebuild_quadruples(quadruples, replacements, function_directory):
+    # replacements[i] es la lista de cuadruplos que sustituye al cuadruplo i (vacia si se borra).
+    # un salto al cuadruplo i pasa a apuntar al primer cuadruplo de su reemplazo, o al
+    # siguiente que sobreviva si se borro
+    new_index = [0] * (len(quadruples) + 1)
+    position = 0
+    for index, replacement in enumerate(replacements):
+        new_index[index] = position
+        position += len(replacement)
+    new_index[len(quadruples)] = position
+
+    rebuilt = []
+    for replacement in replacements:
+        for quad in replacement:
+            op = quad[0]
+            if (op in JUMP_OPS or op == 'MAIN_START') and quad[3] is not None:
+                quad = (op, quad[1], quad[2], new_index[quad[3]])
+            rebuilt.append(quad)
+
+    if function_directory is not None:
+        for info in function_directory.values():
+            info['start_quad'] = new_index[info['start_quad']]
+            info['end_quad'] = new_index[info['end_quad']]
+    return rebuilt
+
+class ControlFlowGraph:
+    def __init__(self, quadruples):
+        self.quadruples = quadruples
+        self.blocks = []
+        self.block_at = {}  # indice del primer cuadruplo -> indice del bloque
+        self.entries = {}   # funcion -> bloque de entrada (el FUNC, o el MAIN_START para el main)
+        self._idom = None
+
+        leaders = block_leaders(quadruples)
+        function = MAIN_FUNCTION
+        for start, end in zip(leaders, leaders[1:] + [len(quadruples)]):
+            first, last = quadruples[start][0], quadruples[end - 1][0]
+            if first == 'FUNC':
+                function = quadruples[start][1]
+            block = BasicBlock(len(self.blocks), start, end, function)
+            self.blocks.append(block)
+            self.block_at[start] = block.index
+            self.entries.setdefault(function, block.index)
+            if last == 'ENDFUNC':
+                function = MAIN_FUNCTION
+
+        # los saltos nunca salen de su funcion; el GOSUB regresa al cuadruplo siguiente
+        for block in self.blocks:
+            last = quadruples[block.end - 1]
+            op = last[0]
+            if op in ('GOTO', 'MAIN_START'):
+                targets = (last[3],)
+            elif op in CONDITIONAL_JUMP_OPS:
+                targets = (last[3], block.end)
+            elif op in ('ENDFUNC', 'ENDPROGRAM'):
+                targets = ()
+            else:
+                targets = (block.end,)
+            for target in targets:
+                successor = self.block_at.get(target)
+                if successor is not None and successor not in block.successors:
+                    block.successors.append(successor)
+                    self.blocks[successor].predecessors.append(block.index)
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def ranges(self):
+        return [(block.start, block.end) for block in self.blocks]
+
+    def function_blocks(self, function):
+        return [block for block in self.blocks if block.function == function]
+
+    def reverse_postorder(self, entry):
+        # dfs iterativo desde la entrada; los bloques inalcanzables no aparecen. la pila guarda el
+        # bloque y la posicion del siguiente sucesor en dos listas de enteros: con un iterador por
+        # bloque el recolector de basura se disparaba y recorria todos los cuadruplos vivos
+        blocks = self.blocks
+        order = []
+        visited = [False] * len(blocks)
+        visited[entry] = True
+        stack = [entry]
+        positions = [0]
+        while stack:
+            successors = blocks[stack[-1]].successors
+            position = positions[-1]
+            while position < len(successors) and visited[successors[position]]:
+                position += 1
+            if position < len(successors):
+                positions[-1] = position + 1
+                successor = successors[position]
+                visited[successor] = True
+                stack.append(successor)
+                positions.append(0)
+            else:
+                positions.pop()
+                order.append(stack.pop())
+        order.reverse()
+        return order
+
+    def immediate_dominators(self):
+        # idom[b] es el dominador inmediato del bloque b (la entrada se domina a si misma, None si
+        # es inalcanzable). algoritmo iterativo de Cooper, Harvey y Kennedy sobre el orden
+        # postorden inverso de cada funcion. cada pasada es O(bloques + aristas) mas las subidas de
+        # la interseccion, que en codigo estructurado son cortas; con ciclos estructurados converge
+        # en dos pasadas, asi que el costo total es lineal en el tamano del grafo
+        if self._idom is not None:
+            return self._idom
+        idom = [None] * len(self.blocks)
+        rpo_number = [0] * len(self.blocks)
+        for entry in self.entries.values():
+            order = self.reverse_postorder(entry)
+            for number, block in enumerate(order):
+                rpo_number[block] = number
+            idom[entry] = entry
+
+            changed = True
+            while changed:
+                changed = False
+                for block in order[1:]:
+                    new_idom = None
+                    for predecessor in self.blocks[block].predecessors:
+                        if idom[predecessor] is None:
+                            continue
+                        if new_idom is None:
+                            new_idom = predecessor
+                            continue
+                        # interseccion: subimos por el arbol hasta el ancestro comun
+                        left, right = predecessor, new_idom
+                        while left != right:
+                            while rpo_number[left] > rpo_number[right]:
+                                left = idom[left]
+                            while rpo_number[right] > rpo_number[left]:
+                                right = idom[right]
+                        new_idom = left
+                    if idom[block] != new_idom:
+                        idom[block] = new_idom
+                        changed = True
+        self._idom = idom
+        return idom
+
+    def dominates(self, dominator, block):
+        idom = self.immediate_dominators()
+        if idom[block] is None:
+            return False
+        while block != dominator:
+            if idom[block] == block:
+                return False
+            block = idom[block]
+        return True
+
+    def serialize(self, block_quadruples, function_directory=None):
+        # block_quadruples[b] son los cuadruplos (quiza modificados) del bloque b; los saltos al
+        # inicio de un bloque se recorren a su nueva posicion, o a la del siguiente si quedo vacio
+        replacements = [[] for _ in self.quadruples]
+        for block, quadruples in zip(self.blocks, block_quadruples):
+            replacements[block.start] = quadruples
+        return rebuild_quadruples(self.quadruples, replacements, function_directory)
@@ -0,0 +1,87 @@
+import base64
+import json
+import sys
+from array import array
+from ast_generator import Parameter
+from opcodes import CompactCode
+
+# formato en disco del programa compilado (CompactCode, directorio de funciones y mapa de memoria).
+# las cuatro columnas del CompactCode se guardan como los bytes del array en base64
+COMPILED_EXTENSION = '.bdc'
+FORMAT_VERSION = 2
+CODE_COLUMNS = ('ops', 'arg1', 'arg2', 'result')
+
+def _encode_params(params):
+    return [{'name': p.name, 'type': p.type, 'address': p.address} for p in params]
+
+def _decode_params(params):
+    return [Parameter(name=p['name'], type=p['type'], address=p['address']) for p in params]
+
+def _encode_code(code):
+    data = {column: base64.b64encode(getattr(code, column).tobytes()).decode('ascii') for column in CODE_COLUMNS}
+    data['byteorder'] = sys.byteorder
+    data['strings'] = code.strings
+    data['functions'] = code.functions
+    return data
+
+def _decode_code(data):
+    code = CompactCode()
+    for column in CODE_COLUMNS:
+        values = array('i')
+        values.frombytes(base64.b64decode(data[column]))
+        if data['byteorder'] != sys.byteorder:
+            values.byteswap()
+        setattr(code, column, values)
+    code.strings = data['strings']
+    code.functions = data['functions']
+    return code
+
+def to_json_data(compilation_data):
+    code = compilation_data.get('code')
+    if code is None:
+        code = CompactCode.from_quadruples(compilation_data['quadruples'])
+
+    function_directory = {}
+    for name, info in compilation_data['function_directory'].items():
+        info = dict(info)
+        info['params'] = _encode_params(info['params'])
+        function_directory[name] = info
+
+    return {
+        'version': FORMAT_VERSION,
+        'code': _encode_code(code),
+        'function_directory': function_directory,
+        'memory_map': compilation_data['memory_map'],
+    }
+
+def from_json_data(data):
+    if data.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compiled program version: {data.get('version')}")
+
+    function_directory = {}
+    for name, info in data['function_directory'].items():
+        info['params'] = _decode_params(info['params'])
+        function_directory[name] = info
+
+    # json guarda las llaves como strings, regresamos las constantes a su tipo
+    memory_map = data['memory_map']
+    constants = memory_map['constants']
+    memory_map['constants'] = {
+        'int': {int(value): address for value, address in constants['int'].items()},
+        'float': {float(value): address for value, address in constants['float'].items()},
+    }
+
+    # la VM ejecuta directo del CompactCode; los cuadruplos en tuplas se pueden pedir con code.to_quadruples()
+    return {
+        'code': _decode_code(data['code']),
+        'function_directory': function_directory,
+        'memory_map': memory_map,
+    }
+
+def save(compilation_data, path):
+    with open(path, 'w') as f:
+        json.dump(to_json_data(compilation_data), f)
+
+def load(path):
+    with open(path) as f:
+        return from_json_data(json.load(f))
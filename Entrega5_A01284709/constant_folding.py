@@ -0,0 +1,163 @@
+from ast_generator import Function, Program, Block, Assignment, WhileLoop, IfStatement, PrintStatement, Literal, BinaryOp, UnaryOp, FunctionCall, ArenaExpression, ARENA_LITERAL, ARENA_VARIABLE, ARENA_FIRST_UNARY, ARENA_OPS
+from semantic_analyzer import CuboSemantico
+
+# operaciones que se pueden evaluar en compilacion; se evaluan igual que en la VM.
+# los relacionales dan bool y no hay segmento de constantes bool, asi que no se doblan
+FOLDABLE_OPS = {
+    '+': lambda left, right: left + right,
+    '-': lambda left, right: left - right,
+    '*': lambda left, right: left * right,
+    '/': lambda left, right: left / right,
+}
+
+UNARY_OPS = {
+    '+': lambda value: value,
+    '-': lambda value: -value,
+}
+
+class ConstantFolder:
+    # pasada entre el ASTTransformer y el SemanticAnalyzer: las subexpresiones con solo
+    # literales se evaluan aqui y quedan como una Literal, que el analizador manda al
+    # pool de constantes con MemoryManager.get_constant_address en lugar de generar cuadruplos
+    def __init__(self):
+        self.semantic_cube = CuboSemantico()
+        # cada BinaryOp doblado es un cuadruplo (y un temporal) menos
+        self.removed_quadruples = 0
+        self.folded_unary = 0
+        self._folded_arenas = set()
+
+        self.statement_handlers = {
+            Program: self.fold_program,
+            Function: self.fold_function,
+            Block: self.fold_block,
+            Assignment: self.fold_assignment,
+            WhileLoop: self.fold_while,
+            IfStatement: self.fold_if,
+            PrintStatement: self.fold_print,
+            FunctionCall: self.fold_function_call,
+        }
+
+    def fold(self, ast_node):
+        handler = self.statement_handlers.get(type(ast_node))
+        if handler is not None:
+            handler(ast_node)
+        return ast_node
+
+    def fold_program(self, node):
+        for func in node.functions:
+            self.fold(func)
+        self.fold(node.main)
+
+    def fold_function(self, node):
+        self.fold(node.body)
+
+    def fold_block(self, node):
+        for stmt in node.statements:
+            self.fold(stmt)
+
+    def fold_assignment(self, node):
+        node.value = self.fold_expression(node.value)
+
+    def fold_while(self, node):
+        node.condition = self.fold_expression(node.condition)
+        self.fold(node.body)
+
+    def fold_if(self, node):
+        node.condition = self.fold_expression(node.condition)
+        self.fold(node.then_block)
+        if node.else_block:
+            self.fold(node.else_block)
+
+    def fold_print(self, node):
+        node.items = [item if isinstance(item, str) else self.fold_expression(item) for item in node.items]
+
+    def fold_function_call(self, node):
+        node.arguments = [self.fold_expression(arg) for arg in node.arguments]
+
+    def evaluate_binary(self, op, left_value, left_type, right_value, right_type):
+        # regresa (valor, tipo) o None si la operacion no se puede doblar;
+        # los errores de tipo y la division entre cero se dejan para el analizador y la VM
+        evaluate = FOLDABLE_OPS.get(op)
+        if evaluate is None:
+            return None
+        result_type = self.semantic_cube.check_operation(left_type, op, right_type)
+        if result_type is None:
+            return None
+        if op == '/' and right_value == 0:
+            return None
+
+        value = evaluate(left_value, right_value)
+        if result_type == 'float':
+            value = float(value)
+        self.removed_quadruples += 1
+        return value, result_type
+
+    def evaluate_unary(self, op, value, value_type):
+        self.folded_unary += 1
+        return UNARY_OPS[op](value), value_type
+
+    def fold_expression(self, expr):
+        if type(expr) is ArenaExpression:
+            self.fold_arena(expr.arena)
+            return expr
+
+        # post-orden con pila explicita, igual que la generacion de codigo
+        results = []
+        stack = [(expr, False)]
+        while stack:
+            node, operands_ready = stack.pop()
+            node_type = type(node)
+            if not operands_ready:
+                if node_type is BinaryOp:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                elif node_type is UnaryOp:
+                    stack.append((node, True))
+                    stack.append((node.operand, False))
+                else:
+                    results.append(node)
+                continue
+
+            folded = None
+            if node_type is BinaryOp:
+                node.right = results.pop()
+                node.left = results.pop()
+                if type(node.left) is Literal and type(node.right) is Literal:
+                    folded = self.evaluate_binary(node.op, node.left.value, node.left.type, node.right.value, node.right.type)
+            else:
+                node.operand = results.pop()
+                if type(node.operand) is Literal:
+                    folded = self.evaluate_unary(node.op, node.operand.value, node.operand.type)
+
+            results.append(node if folded is None else Literal(value=folded[0], type=folded[1]))
+        return results[0]
+
+    def fold_arena(self, arena):
+        # los hijos siempre tienen indice menor que el padre, asi que una sola pasada
+        # hacia adelante dobla todas las expresiones de la arena de abajo hacia arriba
+        if id(arena) in self._folded_arenas:
+            return
+        self._folded_arenas.add(id(arena))
+
+        ops, left, right, values, literals = arena.ops, arena.left, arena.right, arena.values, arena.literals
+        for index in range(len(ops)):
+            op = ops[index]
+            if op <= ARENA_VARIABLE:
+                continue
+
+            left_index = left[index]
+            if ops[left_index] != ARENA_LITERAL:
+                continue
+            left_value, left_type = literals[values[left_index]]
+            if op >= ARENA_FIRST_UNARY:
+                folded = self.evaluate_unary(ARENA_OPS[op][1:], left_value, left_type)
+            else:
+                right_index = right[index]
+                if ops[right_index] != ARENA_LITERAL:
+                    continue
+                right_value, right_type = literals[values[right_index]]
+                folded = self.evaluate_binary(ARENA_OPS[op], left_value, left_type, right_value, right_type)
+
+            if folded is not None:
+                arena.set_literal(index, *folded)
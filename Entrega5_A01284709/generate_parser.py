@@ -0,0 +1,26 @@
+import py_compile
+import sys
+from lark import Lark
+from lark.tools.standalone import gen_standalone
+from grammar import grammar
+from parsing import STANDALONE_PATH, grammar_hash
+
+# genera babyduck_parser.py: un parser LALR autocontenido que parsing.py
+# carga en lugar de construir lark en cada proceso
+
+def generate_standalone(path=STANDALONE_PATH):
+    parser = Lark(grammar, start='start', parser='lalr')
+    with open(path, 'w') as out:
+        gen_standalone(parser, out=out)
+        # el hash permite detectar un modulo generado con una gramatica vieja
+        out.write(f"\nGRAMMAR_HASH = {grammar_hash()!r}\n")
+    # dejamos el bytecode listo para que el primer arranque no tenga que compilar el modulo
+    py_compile.compile(path, doraise=True)
+    return path
+
+def main():
+    path = generate_standalone(*sys.argv[1:2])
+    print(f"Standalone parser written to {path}")
+
+if __name__ == "__main__":
+    main()
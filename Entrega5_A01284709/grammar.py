@@ -42,17 +42,12 @@ start: programa
 programa: PROGRAM ID SEMI pro_vars_dec funcs_loop MAIN body END #<Programa> → program id ; <PRO_VARS_DEC> <FUNCS_LOOP> main <Body> end
 pro_vars_dec: #<PRO_VARS_DEC> → ε
     | vars #<PRO_VARS_DEC> → <VARS>
-funcs_loop: #<FUNCS_LOOP> → ε
-    | funcs funcs_loop #<FUNCS_LOOP> → <FUNCS> <FUNCS_LOOP>
+funcs_loop: funcs* #<FUNCS_LOOP> → { <FUNCS> }
 
 # <VARS>
-vars: VAR variable vars_prime #<VARS> → var <VARIABLE> <VARS’>
-vars_prime: #<VARS’> → ε
-    | variable vars_prime #<VARS’> → <VARIABLE> <VARS’>
+vars: VAR variable+ #<VARS> → var <VARIABLE> { <VARIABLE> }
 variable: ids COLON type SEMI  # <VARIABLE> → <IDS> : <TYPE> ;
-ids: ID ids_prime             # <IDS> → id <IDS'>
-ids_prime:                    # <IDS'> → ε
-    | COMMA ID ids_prime      # <IDS'> → , id <IDS'>
+ids: ID (COMMA ID)*           # <IDS> → id { , id }
 
 # <TYPE>
 type: INT #<TYPE> → int
@@ -60,8 +55,7 @@ type: INT #<TYPE> → int
 
 # <BODY>
 body: LBRACE statement_loop RBRACE #<Body> → { <STATEMENT_LOOP> }
-statement_loop: #<STATEMENT_LOOP> → ε
-    | statement statement_loop #<STATEMENT_LOOP> → <STATEMENT> <STATEMENT_LOOP>
+statement_loop: statement* #<STATEMENT_LOOP> → { <STATEMENT> }
 
 
 # <STATEMENT>
@@ -74,11 +68,9 @@ statement: assign #<STATEMENT> → <ASSIGN>
 
 # <Print>
 print_stmt: PRINT LPAR expstr_loop RPAR SEMI #<Print> → print ( <EXPSTR_LOOP> ) ;
-expstr_loop: expresion expstr_loop_prime #<EXPSTR_LOOP> → <EXPRESIÓN> <EXPSTR_LOOP’>
-    | CTE_STRING expstr_loop_prime #<EXPSTR_LOOP> → cte.string <EXPSTR_LOOP’>
-expstr_loop_prime: #<EXPSTR_LOOP’> → ε
-    | COMMA expresion expstr_loop_prime #<EXPSTR_LOOP’> → , <EXPRESIÓN> <EXPSTR_LOOP’>
-    | COMMA CTE_STRING expstr_loop_prime #<EXPSTR_LOOP’> → , cte.string <EXPSTR_LOOP’>
+expstr_loop: expstr (COMMA expstr)* #<EXPSTR_LOOP> → <EXPSTR> { , <EXPSTR> }
+expstr: expresion #<EXPSTR> → <EXPRESIÓN>
+    | CTE_STRING #<EXPSTR> → cte.string
 
 # <ASSIGN>
 assign: ID EQUAL expresion SEMI #<ASSIGN> → id = <EXPRESIÓN> ;
@@ -104,17 +96,11 @@ expresion: exp #<EXPRESION> → <EXP>
 
 # <EXP>
 exp: exp_loop #<EXP> → <EXP_LOOP>
-exp_loop: termino exp_loop_prime #<EXP_LOOP> → <TERMINO> <EXP_LOOP’>
-exp_loop_prime: #<EXP_LOOP’> → ε
-    | PLUS exp_loop #<EXP_LOOP’> → + <EXP_LOOP>
-    | MINUS exp_loop #<EXP_LOOP’> → - <EXP_LOOP>
+exp_loop: termino ((PLUS | MINUS) termino)* #<EXP_LOOP> → <TERMINO> { (+ | -) <TERMINO> }
 
 # <TERMINO>
 termino: term_loop #<TERMINO> → <TERM_LOOP>
-term_loop: factor term_loop_prime #<TERM_LOOP> → <FACTOR> <TERM_LOOP’>
-term_loop_prime: #<TERM_LOOP’> → ε
-    | TIMES term_loop #<TERM_LOOP’> → * <TERM_LOOP>
-    | DIVIDE term_loop #<TERM_LOOP’> → / <TERM_LOOP>
+term_loop: factor ((TIMES | DIVIDE) factor)* #<TERM_LOOP> → <FACTOR> { (* | /) <FACTOR> }
 
 # <FACTOR>
 factor: LPAR expresion RPAR #<FACTOR> → ( <EXPRESIÓN> )
@@ -128,17 +114,11 @@ idcte: ID #<IDCTE> → id
 
 # <FUNCS>
 funcs: VOID ID LPAR id_loop RPAR LBRACK vars_des body RBRACK SEMI #<FUNCS> → void id ( <ID_LOOP> ) [ <VARS_DES> <Body> ]  ;
-id_loop: #<ID_LOOP> → ε
-    | ID COLON type id_loop_prime #<ID_LOOP> → id : <TYPE> <ID_LOOP’>
-id_loop_prime: #<ID_LOOP’> → ε
-    | COMMA ID COLON type id_loop_prime #<ID_LOOP’> → , id : <TYPE> <ID_LOOP’>
+id_loop: (ID COLON type (COMMA ID COLON type)*)? #<ID_LOOP> → [ id : <TYPE> { , id : <TYPE> } ]
 vars_des: #<VARS_DES> → ε
     | vars #<VARS_DES> → <VARS>
 
 # <F_Call>
 f_call: ID LPAR exp_fcall_loop RPAR SEMI #<F_Call> → id ( <EXP_FCALL_LOOP> ) ;
-exp_fcall_loop: #<EXP_FCALL_LOOP> → ε
-    | expresion exp_fcall_loop_prime #<EXP_FCALL_LOOP> → <EXPRESIÓN> <EXP_FCALL_LOOP’>
-exp_fcall_loop_prime: #<EXP_FCALL_LOOP’> → ε
-    | COMMA expresion exp_fcall_loop_prime #<EXP_FCALL_LOOP’> → , <EXPRESIÓN> <EXP_FCALL_LOOP’>
+exp_fcall_loop: (expresion (COMMA expresion)*)? #<EXP_FCALL_LOOP> → [ <EXPRESIÓN> { , <EXPRESIÓN> } ]
 """
\ No newline at end of file
@@ -0,0 +1,173 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List
+from cfg import MAIN_FUNCTION
+from memory_manager import MemoryManager
+from opcodes import (FIRST_ARITHMETIC_OP, NO_OPERAND, OP_ASSIGN, OP_ENDFUNC, OP_ERA, OP_FUNC, OP_GOSUB, OP_GOTOF,
+                     OP_GOTOV, OP_PARAM, OP_PRINT, OP_PRINT_STRING, OP_RETURN)
+
+# direccionamiento plano para la VM. antes de ejecutar, cada direccion virtual del CompactCode
+# se traduce una sola vez a un par (segmento, slot): las constantes y las globales son una lista
+# cada una y cada llamada tiene su propia lista (el frame) con las locales, parametros y
+# temporales de la funcion, en el orden que fija su FrameLayout. la VM lee y escribe con
+# memory[segmento][slot] sin buscar en diccionarios
+CONSTANT_SEGMENT, GLOBAL_SEGMENT, FRAME_SEGMENT = range(3)
+# operando vacio: sin segmento ni slot
+NO_OPERAND_PAIR = (NO_OPERAND, NO_OPERAND)
+
+@dataclass(slots=True)
+class FrameLayout:
+    function: str
+    slots: Dict[int, int] = field(default_factory=dict)  # direccion -> slot en el frame
+    initial: List = field(default_factory=list)          # valores con los que empieza cada frame
+    # los slots van parametros, variables locales y luego temporales; al reusar un frame solo
+    # hay que regresar a 0 las locales (los PARAM escriben todos los parametros y los
+    # temporales siempre se escriben antes de leerse)
+    locals_start: int = 0
+    locals_end: int = 0
+
+    def slot(self, address, value=None):
+        slot = self.slots.get(address)
+        if slot is None:
+            slot = self.slots[address] = len(self.initial)
+            self.initial.append(value)
+        return slot
+
+def _segment(memory, address):
+    segment = memory.segment_of(address)
+    if segment.startswith('const'):
+        return CONSTANT_SEGMENT
+    if segment.startswith('global'):
+        return GLOBAL_SEGMENT
+    return FRAME_SEGMENT
+
+class LinkedCode:
+    # el programa enlazado en columnas, como el CompactCode: ops, arg1, arg2 y result con el slot
+    # de cada operando (array('i')) y arg1_segment, arg2_segment y result_segment con su segmento
+    # (array('b'), NO_OPERAND si no hay). lo que no es un operando se queda como entero en su
+    # columna: los destinos de salto y del GOSUB, el indice de la funcion en FUNC, ENDFUNC, ERA y
+    # GOSUB (de ahi sale el layout del frame) y el del texto en PRINT_STRING. la VM decodifica
+    # directo de las columnas; code[i] arma la tupla (opcode, (segmento, slot), ...) bajo demanda
+    # para quien recorre el programa al compilarlo
+    def __init__(self, code, layouts):
+        self.ops = array('i', code.ops)
+        self.arg1, self.arg2, self.result = array('i'), array('i'), array('i')
+        self.arg1_segment, self.arg2_segment, self.result_segment = array('b'), array('b'), array('b')
+        self.strings = code.strings
+        self.functions = code.functions
+        self.layouts = layouts
+
+    def __len__(self):
+        return len(self.ops)
+
+    def append(self, arg1=NO_OPERAND_PAIR, arg2=NO_OPERAND_PAIR, result=NO_OPERAND_PAIR):
+        self.arg1_segment.append(arg1[0])
+        self.arg1.append(arg1[1])
+        self.arg2_segment.append(arg2[0])
+        self.arg2.append(arg2[1])
+        self.result_segment.append(result[0])
+        self.result.append(result[1])
+
+    def operand(self, segments, slots, index):
+        segment = segments[index]
+        return None if segment == NO_OPERAND else (segment, slots[index])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        op = self.ops[index]
+        arg1 = self.operand(self.arg1_segment, self.arg1, index)
+        arg2 = self.operand(self.arg2_segment, self.arg2, index)
+        result = self.operand(self.result_segment, self.result, index)
+        if op == OP_PRINT_STRING:
+            return (op, None, None, self.strings[self.result[index]])
+        if op == OP_ERA or op == OP_FUNC or op == OP_ENDFUNC:
+            return (op, self.layouts[self.functions[self.arg1[index]]], None, None)
+        if op == OP_GOSUB:
+            return (op, self.functions[self.arg1[index]], None, self.result[index])
+        if result is None and self.result[index] != NO_OPERAND:
+            result = self.result[index]
+        return (op, arg1, arg2, result)
+
+def link_program(code, function_directory, memory_map):
+    # regresa el LinkedCode (opcodes enteros, operandos ya resueltos), las listas iniciales de
+    # constantes y globales y el layout del frame de cada funcion (y del main)
+    memory = MemoryManager()
+
+    # las globales empiezan con su nombre, igual que antes en global_memory
+    global_slots, globals_initial = {}, []
+    for name, address in sorted(memory_map['globals'].items(), key=lambda item: item[1]):
+        global_slots[address] = len(globals_initial)
+        globals_initial.append(name)
+
+    constant_slots, constants = {}, []
+    for const_type, values in memory_map['constants'].items():
+        convert = int if const_type == 'int' else float
+        for value, address in values.items():
+            constant_slots[address] = len(constants)
+            constants.append(convert(value))
+
+    # el GOSUB deja las variables de la funcion en 0; los temporales empiezan vacios
+    layouts = {MAIN_FUNCTION: FrameLayout(MAIN_FUNCTION)}
+    for name, info in function_directory.items():
+        layout = layouts[name] = FrameLayout(name)
+        params = [param.address for param in info['params']]
+        local_vars = sorted(set(info.get('vars_addresses', {}).values()) - set(params))
+        for address in params:
+            if _segment(memory, address) == FRAME_SEGMENT:
+                layout.slot(address, 0)
+        layout.locals_start = len(layout.initial)
+        for address in local_vars:
+            if _segment(memory, address) == FRAME_SEGMENT:
+                layout.slot(address, 0)
+        layout.locals_end = len(layout.initial)
+
+    def operand(address, layout):
+        if address == NO_OPERAND:
+            return NO_OPERAND_PAIR
+        segment = _segment(memory, address)
+        if segment == CONSTANT_SEGMENT:
+            return (segment, constant_slots[address])
+        if segment == GLOBAL_SEGMENT:
+            return (segment, global_slots[address])
+        return (segment, layout.slot(address))
+
+    linked = LinkedCode(code, layouts)
+    layout = layouts[MAIN_FUNCTION]
+    callees = []  # funciones de los ERA pendientes, para resolver el destino de sus PARAM
+    functions = code.functions
+    for op, arg1, arg2, result in zip(code.ops, code.arg1, code.arg2, code.result):
+        # lo que no es un operando va en el slot sin segmento
+        value = (NO_OPERAND, result)
+        if op >= FIRST_ARITHMETIC_OP:
+            linked.append(operand(arg1, layout), operand(arg2, layout), operand(result, layout))
+        elif op == OP_ASSIGN:
+            linked.append(operand(arg1, layout), result=operand(result, layout))
+        elif op == OP_GOTOF or op == OP_GOTOV:
+            linked.append(operand(arg1, layout), result=value)
+        elif op == OP_PRINT or op == OP_RETURN:
+            linked.append(result=operand(result, layout))
+        elif op == OP_PARAM:
+            # el argumento se lee en el frame del llamador y siempre se escribe en el de la funcion
+            # llamada, aunque el parametro comparta direccion con una global (ahi nadie lo lee)
+            slot = layouts[functions[callees[-1]]].slot(result)
+            linked.append(operand(arg1, layout), result=(FRAME_SEGMENT, slot))
+        elif op == OP_ERA:
+            callees.append(arg1)
+            linked.append((NO_OPERAND, arg1))
+        elif op == OP_FUNC or op == OP_ENDFUNC:
+            layout = layouts[functions[arg1]] if op == OP_FUNC else layouts[MAIN_FUNCTION]
+            linked.append((NO_OPERAND, arg1))
+        elif op == OP_GOSUB:
+            callees.pop()
+            linked.append((NO_OPERAND, arg1), result=(NO_OPERAND, function_directory[functions[arg1]]['start_quad']))
+        else:
+            # MAIN_START, GOTO y PRINT_STRING guardan un entero que no se traduce
+            linked.append(result=value)
+
+    return {
+        'quadruples': linked,
+        'constants': constants,
+        'globals': globals_initial,
+        'frames': layouts,
+    }
@@ -1,219 +1,7 @@
-from lark import Lark
-from grammar import grammar
+import parsing
 from semantic_analyzer import SemanticAnalyzer
 from ast_generator import ASTTransformer
-
-test1 = '''
-program myprog;
-var id1,x,y : int; id2: float;
-main {
-    x = 12;
-    id2 = 1-4/2;
-    print("hi:",id2);
-    if (1 > 0) {
-        y = 1;
-        print("Okay si se imprime");
-    } else {
-        y = 0;
-        print("hioakakaokaokoakaoakoa");
-    };
-}
-end
-'''
-
-test2 = '''
-program myprog;
-var id1 : int;
-main {
-    id1 = 0;
-    while (id1 < 10) do {
-        print("Value of id1:", id1);
-        id1 = id1 + 1;
-    };
-}
-end
-'''
-
-test3 = '''
-program myprog;
-var id1 : int; id2 : float;
-void func1(x: int, y: float) [
-var id3 : int;
-    {
-        id2 = x + y;
-        print("id2: ", id2);
-    }
-];
-main {
-    id1 = 2 + 10;
-    func1(id1,2.5);
-}
-end
-'''
-
-test4 = '''
-program myprog;
-var id1 : int;
-main {
-    id1 = 5 + (3 * 2;
-}
-end
-'''
-
-test5 = '''
-program fibonacci;
-var n,a,b,count,temp : int;
-main {
-    n = 10;
-    if (n < 0) {
-        print("Error: n must be greater than 0");
-    };
-    if (n < 1) {
-        print("Fibonacci of", n, "is", 0);
-    };
-    if (n < 2) {
-        print("Fibonacci of", n, "is", 1);
-    } else {
-        a = 0;
-        b = 1;
-        count = 2;
-        while (count < n+1) do {
-            temp = a+b;
-            a = b;
-            b = temp;
-            count = count + 1;
-        };
-        print("Fibonacci of", n, "is", b);
-    };
-}
-end
-'''
-
-test5 = '''
-program fibonacci;
-var input, input2: int;
-void print_fibonacci(n: int, b:int) [
-    {
-        print("Fibonacci of", n, "is", b);
-    }
-];
-void print_factorial(n: int, b:int) [
-    {
-        print("Factorial of", n, "is", b);
-    }
-];
-void factorial(n: int) [
-var result, i: int;
-{
-    if (n < 0) {
-        print("Error: n must be greater than 0");
-    } else {
-        result = 1;
-        i = 1;
-        while (i < n + 1) do {
-            result = result * i;
-            i = i + 1;
-        };
-        print_factorial(n, result);
-    };
-}];
-void fibonacci(n: int) [
-var a,b,count,temp : int;
-{
-    if (n < 0) {
-        print("Error: n must be greater than 0");
-    };
-    if (n < 1) {
-        print_fibonacci(n,0);
-    };
-    if (n < 2) {
-        print_fibonacci(n,1);
-    } else {
-        a = 0;
-        b = 1;
-        count = 2;
-        while (count < n+1) do {
-            temp = a+b;
-            a = b;
-            b = temp;
-            count = count + 1;
-        };
-        print_fibonacci(n,b);
-    };
-}];
-main {
-    input = 10;
-    input2=20;
-    fibonacci(input2);
-    factorial(input);
-}
-end
-'''
-
-test6="""
-program fibonacci_factorial;
-var input: int;
-
-void print_fibonacci(n: int, b: int) [
-    {
-        print("Fibonacci of", n, "is", b);
-    }
-];
-
-void print_factorial(n: int, b: int) [
-    {
-        print("Factorial of", n, "is", b);
-    }
-];
-
-void fibonacci(n: int) [
-var a, b, count, temp: int;
-{
-    if (n < 0) {
-        print("Error: n must be greater than 0");
-    };
-    if (n < 1) {
-        print_fibonacci(n, 0);
-    };
-    if (n < 2) {
-        print_fibonacci(n, 1);
-    } else {
-        a = 0;
-        b = 1;
-        count = 2;
-        while (count < n + 1) do {
-            temp = a + b;
-            a = b;
-            b = temp;
-            count = count + 1;
-        };
-        print_fibonacci(n, b);
-    };
-}];
-
-void factorial(n: int) [
-var result, i: int;
-{
-    if (n < 0) {
-        print("Error: n must be greater than 0");
-    } else {
-        result = 1;
-        i = 1;
-        while (i < n + 1) do {
-            result = result * i;
-            i = i + 1;
-        };
-        print_factorial(n, result);
-    };
-}];
-
-main {
-    input = 10;
-    fibonacci(input);
-    factorial(input);
-}
-end
-"""
+from sample_programs import test1, test2, test3, test4
 
 tests = [
     {'name': 'Test 1', 'code': test1},
@@ -222,7 +10,8 @@ tests = [
     {'name': 'Test 4', 'code': test4}
 ]
 
-parser = Lark(grammar, start='start')
+# mismo parser LALR cacheado que usa compile_and_execute
+parser = parsing.get_parser('lalr')
 
 for test in tests:
     print(f"\n{'='*50}")
@@ -233,7 +22,7 @@ for test in tests:
         parse_tree = parser.parse(test['code'])
         
         ast = ASTTransformer().transform(parse_tree)
-        program_node = ast.children[0]
+        program_node = ast
         
         analyzer = SemanticAnalyzer()
         analyzer.process_ast(program_node)
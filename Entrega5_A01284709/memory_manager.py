@@ -19,6 +19,11 @@ class MemoryManager:
         # inicializamos las direcciones actuales para cada segmento
         self.current_address = {seg: start for seg, (start, end) in self.address_ranges.items()}
         
+        # temporales liberados por segmento; se reusan en orden de pila (el ultimo liberado sale primero)
+        self.free_temps = {'temp_int': [], 'temp_float': [], 'temp_bool': []}
+        self.temps_in_use = {segment: 0 for segment in self.free_temps}
+        self.peak_temps = {segment: 0 for segment in self.free_temps}
+
         # guardamos las direcciones de las variables y constantes
         self.variable_addresses = {}  # {var_name: address}
         self.constants = {
@@ -74,16 +79,60 @@ class MemoryManager:
         self.variable_addresses[var_name] = address
         return address
 
-    def get_temp_address(self, temp_type):
+    def get_temp_address(self, temp_type, avoid=None):
+        # avoid: direcciones que no se pueden reusar (las que ya usa un ciclo al sacar sus invariantes)
         segment = f"temp_{temp_type}"
-        address = self.current_address[segment]
-        
-        if address > self.address_ranges[segment][1]:
-            raise MemoryError(f"Out of temporary memory in {segment} segment")
-        
-        self.current_address[segment] += 1
+        free = self.free_temps[segment]
+        address = None
+        if avoid is None:
+            if free:
+                address = free.pop()
+        else:
+            # el liberado mas reciente que no este en avoid
+            for position in range(len(free) - 1, -1, -1):
+                if free[position] not in avoid:
+                    address = free.pop(position)
+                    break
+
+        if address is None:
+            address = self.current_address[segment]
+            
+            if address > self.address_ranges[segment][1]:
+                raise MemoryError(f"Out of temporary memory in {segment} segment")
+            
+            self.current_address[segment] += 1
+
+        self.temps_in_use[segment] += 1
+        if self.temps_in_use[segment] > self.peak_temps[segment]:
+            self.peak_temps[segment] = self.temps_in_use[segment]
         return address
 
+    def segment_of(self, address):
+        for segment, (start, end) in self.address_ranges.items():
+            if start <= address <= end:
+                return segment
+        return None
+
+    def temp_segment(self, address):
+        segment = self.segment_of(address)
+        return segment if segment in self.free_temps else None
+
+    def release_temp(self, address):
+        # se llama cuando ya se genero el cuadruplo que consume el temporal;
+        # las direcciones que no son temporales (variables, constantes) se ignoran
+        if not isinstance(address, int):
+            return
+        segment = self.temp_segment(address)
+        if segment is not None:
+            self.free_temps[segment].append(address)
+            self.temps_in_use[segment] -= 1
+
+    def reset_temp_peaks(self):
+        # regresa los picos de temporales vivos desde el ultimo reset, por tipo
+        peaks = {segment[len('temp_'):]: peak for segment, peak in self.peak_temps.items()}
+        self.peak_temps = dict(self.temps_in_use)
+        return peaks
+
     def get_constant_address(self, value, const_type):
         if value in self.constants[const_type]:
             return self.constants[const_type][value]
@@ -0,0 +1,84 @@
+from array import array
+
+# codificacion compacta del programa: cada opcode es un entero chico y los cuadruplos se guardan
+# en cuatro columnas array('i') paralelas (igual que el ExpressionArena); lo que no es un entero
+# va a tablas aparte:
+#   FUNC, ENDFUNC, ERA, GOSUB  arg1 es el indice del nombre en functions
+#   PRINT_STRING               result es el indice del texto en strings (PRINT de una constante string)
+#   None                       NO_OPERAND
+# la lista de Parameter del FUNC no se guarda, ya esta en el directorio de funciones
+
+GENERIC_OPS = ('+', '-', '*', '/', '>', '<', '!=')
+# opcodes especializados por tipo de operandos que escoge el analizador con el cubo semantico:
+# sufijo i (int, int), f (float, float), if / fi (mezclados). SPECIALIZED_OPS[opcode] es el generico
+OPERAND_SUFFIXES = {('int', 'int'): 'i', ('float', 'float'): 'f', ('int', 'float'): 'if', ('float', 'int'): 'fi'}
+SPECIALIZED_OPS = {op + suffix: op for op in GENERIC_OPS for suffix in OPERAND_SUFFIXES.values()}
+ARITHMETIC_OPS = GENERIC_OPS + tuple(SPECIALIZED_OPS)
+
+# los operadores van al final, a partir de FIRST_ARITHMETIC_OP
+OPCODE_NAMES = ('MAIN_START', 'FUNC', 'ENDFUNC', 'ERA', 'PARAM', 'GOSUB', 'RETURN', '=',
+                'GOTO', 'GOTOF', 'GOTOV', 'PRINT', 'PRINT_STRING', 'ENDPROGRAM') + ARITHMETIC_OPS
+OPCODES = {name: code for code, name in enumerate(OPCODE_NAMES)}
+(OP_MAIN_START, OP_FUNC, OP_ENDFUNC, OP_ERA, OP_PARAM, OP_GOSUB, OP_RETURN, OP_ASSIGN,
+ OP_GOTO, OP_GOTOF, OP_GOTOV, OP_PRINT, OP_PRINT_STRING, OP_ENDPROGRAM) = range(OPCODES['ENDPROGRAM'] + 1)
+FIRST_ARITHMETIC_OP = OP_ENDPROGRAM + 1
+
+NO_OPERAND = -1
+FUNCTION_OPS = (OP_FUNC, OP_ENDFUNC, OP_ERA, OP_GOSUB)
+
+class CompactCode:
+    def __init__(self):
+        self.ops = array('i')
+        self.arg1 = array('i')
+        self.arg2 = array('i')
+        self.result = array('i')
+        self.strings = []
+        self.functions = []
+        self._string_index = {}
+        self._function_index = {}
+
+    def __len__(self):
+        return len(self.ops)
+
+    def _slot(self, table, index, value):
+        slot = index.get(value)
+        if slot is None:
+            slot = index[value] = len(table)
+            table.append(value)
+        return slot
+
+    def append(self, op, arg1=None, arg2=None, result=None):
+        code = OPCODES[op]
+        if code in FUNCTION_OPS:
+            arg1 = self._slot(self.functions, self._function_index, arg1)
+            arg2 = None
+        elif code == OP_PRINT and isinstance(result, str):
+            code = OP_PRINT_STRING
+            result = self._slot(self.strings, self._string_index, result)
+        self.ops.append(code)
+        self.arg1.append(NO_OPERAND if arg1 is None else arg1)
+        self.arg2.append(NO_OPERAND if arg2 is None else arg2)
+        self.result.append(NO_OPERAND if result is None else result)
+
+    @classmethod
+    def from_quadruples(cls, quadruples):
+        code = cls()
+        for quad in quadruples:
+            code.append(*quad)
+        return code
+
+    def quadruple(self, index, function_directory=None):
+        # el cuadruplo index como tupla, con los mismos valores que genero el analizador
+        op = self.ops[index]
+        arg1, arg2, result = (None if value == NO_OPERAND else value
+                              for value in (self.arg1[index], self.arg2[index], self.result[index]))
+        if op in FUNCTION_OPS:
+            arg1 = self.functions[arg1]
+            if op == OP_FUNC and function_directory is not None:
+                arg2 = function_directory[arg1]['params']
+        elif op == OP_PRINT_STRING:
+            return ('PRINT', None, None, self.strings[result])
+        return (OPCODE_NAMES[op], arg1, arg2, result)
+
+    def to_quadruples(self, function_directory=None):
+        return [self.quadruple(index, function_directory) for index in range(len(self))]
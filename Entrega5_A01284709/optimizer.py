@@ -0,0 +1,232 @@
+from itertools import count
+from cfg import JUMP_OPS, CONDITIONAL_JUMP_OPS, ControlFlowGraph, rebuild_quadruples
+from memory_manager import MemoryManager
+from opcodes import ARITHMETIC_OPS, SPECIALIZED_OPS
+
+# pasadas de optimizacion sobre la lista de cuadruplos que genera el SemanticAnalyzer.
+# los saltos guardan el indice destino en quad[3], asi que toda pasada que borra o agrega
+# cuadruplos tiene que reescribir los destinos con rebuild_quadruples
+
+# los mezclados no: al voltear los operandos cambiaria el opcode
+COMMUTATIVE_OPS = ('+', '*', '!=', '+i', '+f', '*i', '*f', '!=i', '!=f')
+
+_memory = MemoryManager()
+TEMP_RANGES = tuple(_memory.address_ranges[segment] for segment in _memory.free_temps)
+
+def generic_op(op):
+    return SPECIALIZED_OPS.get(op, op)
+
+def is_temp(address):
+    if not isinstance(address, int):
+        return False
+    for start, end in TEMP_RANGES:
+        if start <= address <= end:
+            return True
+    return False
+
+def temps_live_out(graph):
+    # los temporales de una expresion se escriben y se leen en el mismo bloque, pero los del
+    # preheader de un ciclo se leen en otros; esos no se pueden renombrar ni eliminar localmente.
+    # liveness clasica (solo temporales) iterando hasta el punto fijo
+    quadruples = graph.quadruples
+    uses, defs = [], []
+    for start, end in graph.ranges():
+        used, defined = set(), set()
+        for index in range(start, end):
+            quad = quadruples[index]
+            for address in quad_reads(quad):
+                if is_temp(address) and address not in defined:
+                    used.add(address)
+            defined.add(quad_writes(quad))
+        uses.append(used)
+        defs.append(defined)
+
+    live_in = [set(used) for used in uses]
+    live_out = [set() for _ in graph.blocks]
+    changed = True
+    while changed:
+        changed = False
+        for block in range(len(graph) - 1, -1, -1):
+            out = set()
+            for successor in graph.blocks[block].successors:
+                out |= live_in[successor]
+            if out != live_out[block]:
+                live_out[block] = out
+                live_in[block] = uses[block] | (out - defs[block])
+                changed = True
+    return live_out
+
+def eliminate_common_subexpressions(quadruples, function_directory):
+    # numeracion de valores local: dentro de cada bloque basico, un cuadruplo aritmetico cuyo
+    # (op, valor izquierdo, valor derecho) ya esta guardado en alguna direccion se elimina y
+    # sus lecturas posteriores usan esa direccion. un '=' cambia el numero de valor del destino,
+    # asi que despues de reasignar un operando la expresion ya no coincide
+    replacements = [[quad] for quad in quadruples]
+    graph = ControlFlowGraph(quadruples)
+    live_out = temps_live_out(graph)
+    for block in graph.blocks:
+        _number_block(quadruples, block.start, block.end, replacements, live_out[block.index])
+
+    size = len(quadruples)
+    quadruples[:] = rebuild_quadruples(quadruples, replacements, function_directory)
+    return size - len(quadruples)
+
+def _number_block(quadruples, start, end, replacements, live_out):
+    value_of = {}     # direccion -> numero de valor que guarda
+    expressions = {}  # (op, valor, valor) -> numero de valor
+    holders = {}      # numero de valor -> direcciones que lo han guardado
+    alias = {}        # temporal eliminado -> direccion que ya tiene su valor
+    numbers = count(1)
+
+    def value(address):
+        number = value_of.get(address)
+        if number is None:
+            number = value_of[address] = next(numbers)
+            holders.setdefault(number, []).append(address)
+        return number
+
+    def holder(number):
+        for address in holders.get(number, ()):
+            if value_of.get(address) == number:
+                return address
+        return None
+
+    def write(address, output):
+        # antes de sobreescribir una direccion, los temporales que la usaban de alias
+        # necesitan su propia copia (los temporales no viven entre bloques)
+        for temp, target in list(alias.items()):
+            if target == address:
+                output.append(('=', target, None, temp))
+                value_of[temp] = value_of.get(target)
+                del alias[temp]
+        alias.pop(address, None)
+
+    for index in range(start, end):
+        op, arg1, arg2, result = quadruples[index]
+        output = []
+
+        if op in ARITHMETIC_OPS:
+            arg1 = alias.get(arg1, arg1)
+            arg2 = alias.get(arg2, arg2)
+            key = (op, value(arg1), value(arg2))
+            if op in COMMUTATIVE_OPS and key[1] > key[2]:
+                key = (op, key[2], key[1])
+
+            number = expressions.get(key)
+            existing = holder(number) if number is not None else None
+            # el valor ya esta calculado: el cuadruplo sobra y el temporal se lee de la direccion
+            # que ya lo tiene. si otro temporal eliminado todavia lee de este, no se puede
+            # eliminar porque la copia que se generaria despues lo sobreescribiria
+            if existing is not None and (existing == result or (
+                    is_temp(result) and result not in live_out and result not in alias.values())):
+                if existing != result:
+                    alias[result] = existing
+                    value_of.pop(result, None)
+            else:
+                write(result, output)
+                output.append((op, arg1, arg2, result))
+                if number is None:
+                    number = expressions[key] = next(numbers)
+                value_of[result] = number
+                holders.setdefault(number, []).append(result)
+
+        elif op == '=':
+            arg1 = alias.get(arg1, arg1)
+            number = value(arg1)
+            # si la variable ya tiene ese valor la copia sobra
+            if value_of.get(result) != number:
+                write(result, output)
+                output.append((op, arg1, arg2, result))
+                value_of[result] = number
+                holders[number].append(result)
+
+        elif op in CONDITIONAL_JUMP_OPS or op == 'PARAM':
+            output.append((op, alias.get(arg1, arg1), arg2, result))
+
+        elif op == 'PRINT':
+            output.append((op, arg1, arg2, alias.get(result, result)))
+
+        else:
+            if op == 'RETURN':
+                write(result, output)
+                value_of.pop(result, None)
+            output.append(quadruples[index])
+
+        replacements[index] = output
+
+def quad_reads(quad):
+    # direcciones que lee el cuadruplo
+    op = quad[0]
+    if op in ARITHMETIC_OPS:
+        return (quad[1], quad[2])
+    if op in ('=', 'PARAM') or op in CONDITIONAL_JUMP_OPS:
+        return (quad[1],)
+    if op == 'PRINT' and not isinstance(quad[3], str):
+        return (quad[3],)
+    return ()
+
+def quad_writes(quad):
+    # direccion que escribe el cuadruplo en el contexto actual (PARAM escribe en el de la funcion llamada)
+    if quad[0] in ARITHMETIC_OPS or quad[0] in ('=', 'RETURN'):
+        return quad[3]
+    return None
+
+def thread_jump(quadruples, target):
+    # sigue la cadena de GOTOs incondicionales hasta el primer cuadruplo que no lo sea
+    seen = 0
+    while target < len(quadruples) and quadruples[target][0] == 'GOTO' and seen < len(quadruples):
+        target = quadruples[target][3]
+        seen += 1
+    return target
+
+def peephole(quadruples, function_directory):
+    # 1. op a, b -> t; = t -> x  se vuelve  op a, b -> x  cuando t no se vuelve a leer
+    # 2. los saltos que apuntan a un GOTO brincan directo a su destino final
+    # 3. se borran los GOTO/GOTOF cuyo destino es el siguiente cuadruplo que sobrevive
+    graph = ControlFlowGraph(quadruples)
+    live_out = temps_live_out(graph)
+    replacements = [[quad] for quad in quadruples]
+    size = len(quadruples)
+
+    # temporales vivos despues de cada '=' (recorrido hacia atras de cada bloque); el '='
+    # no puede ser el inicio de un bloque porque el op anterior tiene que ir justo antes
+    merge = [False] * size
+    for block in reversed(graph.blocks):
+        start, end = block.start, block.end
+        live = set(live_out[block.index])
+        for index in range(end - 1, start, -1):
+            quad = quadruples[index]
+            op, source = quad[0], quad[1]
+            if op == '=' and is_temp(source) and source not in live:
+                previous = quadruples[index - 1]
+                merge[index] = previous[0] in ARITHMETIC_OPS and previous[3] == source
+            written = quad_writes(quad)
+            if written is not None:
+                live.discard(written)
+            live.update(quad_reads(quad))
+
+    for index in range(1, size):
+        if merge[index]:
+            op, arg1, arg2, _ = quadruples[index - 1]
+            replacements[index - 1] = [(op, arg1, arg2, quadruples[index][3])]
+            replacements[index] = []
+
+    for index, quad in enumerate(quadruples):
+        op = quad[0]
+        if (op in JUMP_OPS or op == 'MAIN_START') and quad[3] is not None:
+            target = thread_jump(quadruples, quad[3])
+            if target != quad[3]:
+                replacements[index] = [(op, quad[1], quad[2], target)]
+
+    # first_kept[i] es el primer cuadruplo que sobrevive a partir de i
+    first_kept = [size] * (size + 1)
+    for index in range(size - 1, -1, -1):
+        replacement = replacements[index]
+        if replacement and replacement[0][0] in JUMP_OPS:
+            target = replacement[0][3]
+            if target > index and first_kept[target] == first_kept[index + 1]:
+                replacements[index] = replacement = []
+        first_kept[index] = index if replacement else first_kept[index + 1]
+
+    quadruples[:] = rebuild_quadruples(quadruples, replacements, function_directory)
+    return size - len(quadruples)
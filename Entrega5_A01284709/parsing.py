@@ -0,0 +1,102 @@
+import hashlib
+import os
+import sys
+from ast_generator import ASTTransformer, ExpressionArena
+from grammar import grammar
+from tokenizer import BabyDuckTokenizer, TokenizedParser
+
+PARSER_MODES = ('earley', 'lalr')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# las tablas LALR se guardan en disco para no reconstruir la gramatica en cada proceso
+CACHE_DIR = os.path.join(BASE_DIR, '.parser_cache')
+
+# modulo generado por generate_parser.py, no requiere lark para importarse
+STANDALONE_MODULE = 'babyduck_parser'
+STANDALONE_PATH = os.path.join(BASE_DIR, f"{STANDALONE_MODULE}.py")
+
+# parsers ya construidos en este proceso, uno por (modo, inline, arena, fast_tokenizer)
+_parsers = {}
+# transformer que usa cada parser inline, para poder darle una arena nueva en cada parse
+_transformers = {}
+
+def grammar_hash():
+    return hashlib.sha256(grammar.encode('utf-8')).hexdigest()[:16]
+
+def cache_path():
+    return os.path.join(CACHE_DIR, f"babyduck_lalr_{grammar_hash()}.cache")
+
+def standalone_enabled():
+    # BABYDUCK_STANDALONE=0 obliga a usar lark aunque exista el modulo generado
+    return os.environ.get('BABYDUCK_STANDALONE', '1') != '0'
+
+def load_standalone(transformer=None):
+    try:
+        import babyduck_parser
+    except ImportError:
+        return None
+
+    # si la gramatica cambio despues de generar el modulo, lo ignoramos
+    if getattr(babyduck_parser, 'GRAMMAR_HASH', None) != grammar_hash():
+        return None
+    return babyduck_parser.Lark_StandAlone(transformer=transformer)
+
+def use_fast_tokenizer(parser):
+    # el parser recibe los tokens de BabyDuckTokenizer en vez de los de su lexer, usando la
+    # clase Token del mismo modulo que el parser (lark o el standalone generado)
+    token_class = sys.modules[type(parser).__module__].Token
+    return TokenizedParser(parser, BabyDuckTokenizer(token_class))
+
+def build_parser(mode='lalr', inline=False, transformer=None, fast_tokenizer=False):
+    if mode not in PARSER_MODES:
+        raise ValueError(f"Unknown parser mode: {mode}. Expected one of {PARSER_MODES}")
+    if fast_tokenizer and mode != 'lalr':
+        raise ValueError("The fast tokenizer only works with the 'lalr' parser mode")
+
+    # con inline el ASTTransformer corre en cada reduccion del parser LALR y parse()
+    # regresa directamente el Program, sin construir el arbol de lark (Earley no lo soporta)
+    if inline and mode == 'lalr':
+        transformer = transformer or ASTTransformer()
+    else:
+        transformer = None
+
+    parser = None
+    if mode == 'lalr' and standalone_enabled():
+        parser = load_standalone(transformer)
+
+    if parser is None:
+        # solo importamos lark cuando no hay parser generado
+        from lark import Lark
+
+        if mode == 'earley':
+            parser = Lark(grammar, start='start')
+        else:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            parser = Lark(grammar, start='start', parser='lalr', cache=cache_path(), transformer=transformer)
+
+    if fast_tokenizer:
+        parser = use_fast_tokenizer(parser)
+    return parser
+
+def get_parser(mode='lalr', inline=False, arena=False, fast_tokenizer=False):
+    key = (mode, inline, arena, fast_tokenizer)
+    parser = _parsers.get(key)
+    if parser is None:
+        transformer = ASTTransformer(ExpressionArena() if arena else None)
+        parser = build_parser(mode, inline, transformer, fast_tokenizer)
+        _parsers[key] = parser
+        _transformers[key] = transformer
+    return parser
+
+def parse_program(source_code, mode='lalr', inline=True, arena=False, fast_tokenizer=False):
+    # con arena=True las expresiones del programa quedan en un ExpressionArena propio
+    parser = get_parser(mode, inline, arena, fast_tokenizer)
+    transformer = _transformers[(mode, inline, arena, fast_tokenizer)]
+    if arena:
+        transformer.arena = ExpressionArena()
+
+    result = parser.parse(source_code)
+    if inline and mode == 'lalr':
+        return result
+    return transformer.transform(result)
@@ -0,0 +1,415 @@
+import sys
+from cfg import MAIN_FUNCTION
+from linker import CONSTANT_SEGMENT, FRAME_SEGMENT, GLOBAL_SEGMENT, link_program
+from opcodes import (FIRST_ARITHMETIC_OP, OPCODE_NAMES, OP_ASSIGN, OP_ENDFUNC, OP_ENDPROGRAM, OP_ERA, OP_FUNC,
+                     OP_GOSUB, OP_GOTO, OP_GOTOF, OP_GOTOV, OP_MAIN_START, OP_PARAM, OP_PRINT, OP_PRINT_STRING,
+                     CompactCode)
+from optimizer import generic_op
+
+# backend que traduce el programa ligado a codigo fuente de python: una funcion de python por
+# cada funcion de BabyDuck (y una para el main) y un while por cada ciclo, compilado con
+# compile()/exec. usa el mismo link_program que la VM, asi que los slots son los mismos:
+#   constantes  se escriben como literales
+#   globales    viven en la lista G (la misma global_memory de la VM); dentro de una funcion se
+#               copian a variables g<slot> y se regresan a G antes de cada llamada y al salir
+#   frame       cada slot es una variable local s<slot>; los parametros son los argumentos
+# los cuadruplos de cada funcion se vuelven a estructurar en while/if; si una funcion no tiene
+# esa forma se genera un despachador por bloques (pc == ...) que acepta cualquier salto
+
+# python no compila mas de 20 ciclos anidados ("too many statically nested blocks"); una
+# funcion que anidaria mas que esto tambien va por el despachador, que siempre usa tres niveles
+MAX_NESTING = 16
+
+# cada llamada de BabyDuck es una llamada de python; la VM no tiene limite de profundidad, asi
+# que al ejecutar se sube el limite de recursion a este valor
+RECURSION_LIMIT = 100000
+
+PYTHON_OPERATORS = {
+    '+': '+',
+    '-': '-',
+    '*': '*',
+    '/': '/',
+    '>': '>',
+    '<': '<',
+    '!=': '!=',
+}
+
+JUMP_OPCODES = (OP_GOTO, OP_GOTOF, OP_GOTOV)
+
+def function_name(function):
+    return f"bd_{function}"
+
+def entry_name(function, entry):
+    return f"bd_{function}_at_{entry}"
+
+class _Unstructured(Exception):
+    pass
+
+class PythonCodeGenerator:
+    def __init__(self, code, function_directory, frames, constants):
+        self.code = code
+        self.function_directory = function_directory
+        self.frames = frames
+        self.constants = constants
+        self.structured = True  # False: todas las funciones van por el despachador
+
+        # rango del cuerpo de cada funcion: del cuadruplo despues del FUNC hasta su ENDFUNC,
+        # y para el main del destino del MAIN_START hasta el ENDPROGRAM
+        self.ranges = {}
+        main_start, start, function = len(code), 0, None
+        for index, quad in enumerate(code):
+            op = quad[0]
+            if op == OP_FUNC:
+                start, function = index + 1, quad[1].function
+            elif op == OP_ENDFUNC:
+                self.ranges[function] = (start, index)
+            elif op == OP_MAIN_START:
+                main_start = quad[3]
+        main_end = next((index for index in range(main_start, len(code)) if code[index][0] == OP_ENDPROGRAM), len(code))
+        self.ranges[MAIN_FUNCTION] = (main_start, main_end)
+
+        # slot del frame de cada parametro en el orden de la declaracion (None si ningun PARAM lo escribe)
+        self.param_slots = {MAIN_FUNCTION: []}
+        for name, info in function_directory.items():
+            slots = frames[name].slots
+            self.param_slots[name] = [slots.get(param.address) for param in info['params']]
+
+    def module_source(self):
+        return '\n'.join(self.function_source(function) for function in self.ranges)
+
+    def function_source(self, function):
+        start, end = self.ranges[function]
+        params = [f"s{slot}" if slot is not None else f"_{position}"
+                  for position, slot in enumerate(self.param_slots[function])]
+        return self.source(f"def {function_name(function)}({', '.join(params)}):", function, start, end, start)
+
+    def entry_source(self, function, entry):
+        # la misma funcion pero empezando en el cuadruplo entry (la cabeza de un ciclo) con los
+        # valores que tiene el frame F de la VM; termina donde termina la funcion
+        start, end = self.ranges[function]
+        return self.source(f"def {entry_name(function, entry)}(F):", function, start, end, entry)
+
+    def source(self, header, function, start, end, entry):
+        # funcion de python para los cuadruplos [start, end) que empieza a ejecutar en entry
+        self.scan(start, end)
+        try:
+            if not self.structured:
+                raise _Unstructured()
+            self.lines = []
+            self.emit_range(entry, end, 1, None, (end,))
+        except _Unstructured:
+            self.lines = []
+            self.calls = []
+            self.emit_dispatcher(start, end, entry, 1)
+        body = self.lines
+
+        layout = self.frames[function]
+        prologue = []
+        if entry == start and layout.locals_end > layout.locals_start:
+            names = ' = '.join(f"s{slot}" for slot in range(layout.locals_start, layout.locals_end))
+            prologue.append(f"    {names} = 0")
+        elif entry != start and layout.initial:
+            names = ', '.join(f"s{slot}" for slot in range(len(layout.initial)))
+            prologue.append(f"    {names}, = F")
+        prologue.extend(f"    g{slot} = G[{slot}]" for slot in sorted(self.used_globals))
+        epilogue = [f"    G[{slot}] = g{slot}" for slot in sorted(self.written_globals)]
+        return '\n'.join([header] + prologue + body + epilogue) + '\n'
+
+    def scan(self, start, end):
+        # lecturas de cada operando, globales usadas y escritas, destinos de salto y saltos hacia atras
+        code = self.code
+        self.reads = {}
+        self.used_globals = set()
+        self.written_globals = set()
+        self.targets = set()
+        self.back_edges = {}
+        self.calls = []
+        for index in range(start, end):
+            quad = code[index]
+            if quad[0] in JUMP_OPCODES:
+                target = quad[3]
+                self.targets.add(target)
+                if target <= index:
+                    self.back_edges.setdefault(target, []).append(index)
+        for index in range(start, end):
+            quad = code[index]
+            for operand in self.read_operands(quad):
+                if not self.condition_read(index, start):
+                    self.reads[operand] = self.reads.get(operand, 0) + 1
+                if operand[0] == GLOBAL_SEGMENT:
+                    self.used_globals.add(operand[1])
+            written = self.written_operand(quad)
+            if written is not None and written[0] == GLOBAL_SEGMENT:
+                self.used_globals.add(written[1])
+                self.written_globals.add(written[1])
+
+    def condition_read(self, index, start):
+        # GOTOF/GOTOV t justo despues del op que escribe t (y sin saltos hacia el): esa lectura
+        # no cuenta, la condicion se puede escribir directo en el if/while (ver fused_condition)
+        quad = self.code[index]
+        if quad[0] not in (OP_GOTOF, OP_GOTOV) or index == start or index in self.targets:
+            return False
+        previous = self.code[index - 1]
+        return previous[0] >= FIRST_ARITHMETIC_OP and previous[3] == quad[1] and quad[1][0] == FRAME_SEGMENT
+
+    def read_operands(self, quad):
+        op = quad[0]
+        if op >= FIRST_ARITHMETIC_OP:
+            return (quad[1], quad[2])
+        if op in (OP_ASSIGN, OP_PARAM, OP_GOTOF, OP_GOTOV):
+            return (quad[1],)
+        if op == OP_PRINT:
+            return (quad[3],)
+        return ()
+
+    def written_operand(self, quad):
+        if quad[0] >= FIRST_ARITHMETIC_OP or quad[0] == OP_ASSIGN:
+            return quad[3]
+        return None
+
+    def emit(self, depth, text):
+        if depth > MAX_NESTING:
+            raise _Unstructured()
+        self.lines.append('    ' * depth + text)
+
+    def operand(self, operand):
+        segment, slot = operand
+        if segment == CONSTANT_SEGMENT:
+            value = self.constants[slot]
+            if value != value or value in (float('inf'), float('-inf')):
+                return f"C[{slot}]"
+            return f"({value!r})" if value < 0 else repr(value)
+        if segment == GLOBAL_SEGMENT:
+            return f"g{slot}"
+        return f"s{slot}"
+
+    def expression(self, quad):
+        operator = PYTHON_OPERATORS[generic_op(OPCODE_NAMES[quad[0]])]
+        return f"{self.operand(quad[1])} {operator} {self.operand(quad[2])}"
+
+    def fused_condition(self, index, end):
+        # op a, b -> t seguido de GOTOF/GOTOV t: si t solo se lee en saltos asi, la condicion se
+        # escribe directo en el if/while sin pasar por t
+        if index + 1 >= end or not self.condition_read(index + 1, index):
+            return None
+        quad = self.code[index]
+        if self.reads.get(quad[3], 0):
+            return None
+        return self.expression(quad)
+
+    def emit_range(self, start, end, depth, loop, follow):
+        # loop es (cabeza, salidas) del ciclo mas interno: un salto a la cabeza es continue y uno a
+        # una salida es break. follow son los cuadruplos a los que equivale salirse del final del
+        # rango (el peephole redirige los saltos al cierre de un if de afuera). cualquier otro
+        # salto tiene que ser un if dentro del rango
+        emitted = len(self.lines)
+        index = start
+        while index < end:
+            sources = [source for source in self.back_edges.get(index, ()) if source < end]
+            if sources and (loop is None or loop[0] != index):
+                index = self.emit_loop(index, max(sources), end, depth, follow)
+                continue
+            quad = self.code[index]
+            op = quad[0]
+            if op == OP_GOTO:
+                if not (quad[3] in follow and index == end - 1):
+                    self.emit(depth, self.jump(quad[3], loop))
+                index += 1
+            elif op == OP_GOTOF or op == OP_GOTOV:
+                index = self.emit_branch(index, end, depth, loop, follow, self.operand(quad[1]))
+            else:
+                condition = self.fused_condition(index, end)
+                if condition is not None:
+                    index = self.emit_branch(index + 1, end, depth, loop, follow, condition)
+                else:
+                    self.emit_quad(index, depth)
+                    index += 1
+        if len(self.lines) == emitted:
+            self.emit(depth, 'pass')
+
+    def jump(self, target, loop):
+        if loop is not None and target == loop[0]:
+            return 'continue'
+        if loop is not None and target in loop[1]:
+            return 'break'
+        raise _Unstructured()
+
+    def emit_loop(self, header, last, end, depth, follow):
+        # el ciclo va de la cabeza al salto de regreso en last; si empieza con la condicion y un
+        # GOTOF a la salida es un while con esa condicion, si no un while True. salir es llegar al
+        # cuadruplo despues de last, o a donde lleve la cadena de GOTOs que empiece ahi
+        exits = [last + 1]
+        while exits[-1] < len(self.code) and self.code[exits[-1]][0] == OP_GOTO and self.code[exits[-1]][3] not in exits:
+            exits.append(self.code[exits[-1]][3])
+        if last + 1 == end:
+            exits.extend(follow)
+        loop = (header, tuple(exits))
+        condition = self.fused_condition(header, last)
+        back_edge = self.code[last]
+        if condition is not None and self.code[header + 1][0] == OP_GOTOF and self.code[header + 1][3] in exits \
+                and back_edge[0] == OP_GOTO:
+            self.emit(depth, f"while {condition}:")
+            self.emit_range(header + 2, last, depth + 1, loop, (header,))
+            return last + 1
+
+        # ciclo rotado: la condicion se evalua al final y el GOTOV regresa a la cabeza
+        self.emit(depth, 'while True:')
+        condition = None
+        if back_edge[0] != OP_GOTO and last - 1 > header:
+            condition = self.fused_condition(last - 1, last + 1)
+        follow = (header,) if back_edge[0] == OP_GOTO else ()
+        self.emit_range(header, last if condition is None else last - 1, depth + 1, loop, follow)
+        if condition is None and back_edge[0] != OP_GOTO:
+            condition = self.operand(back_edge[1])
+        if back_edge[0] == OP_GOTOV:
+            self.emit(depth + 1, f"if not ({condition}):")
+            self.emit(depth + 2, 'break')
+        elif back_edge[0] == OP_GOTOF:
+            self.emit(depth + 1, f"if {condition}:")
+            self.emit(depth + 2, 'break')
+        return last + 1
+
+    def emit_branch(self, index, end, depth, loop, follow, condition):
+        # GOTOF salta si la condicion es falsa (el then corre si es verdadera) y GOTOV al reves
+        op, target = self.code[index][0], self.code[index][3]
+        test = condition if op == OP_GOTOF else f"not ({condition})"
+        if loop is not None and (target == loop[0] or target in loop[1]):
+            self.emit(depth, f"if not ({condition}):" if op == OP_GOTOF else f"if {condition}:")
+            self.emit(depth + 1, self.jump(target, loop))
+            return index + 1
+        if target in follow and not index < target <= end:
+            target = end
+        if not index < target <= end:
+            raise _Unstructured()
+
+        # then hasta el destino; si el then termina con un GOTO hacia adelante (dentro del rango
+        # o al cierre de afuera), lo que hay entre el destino y ese GOTO es el else
+        then_end, else_end = target, None
+        last = self.code[target - 1]
+        if target - 1 > index and last[0] == OP_GOTO:
+            if target < last[3] <= end:
+                then_end, else_end = target - 1, last[3]
+            elif last[3] in follow:
+                then_end, else_end = target - 1, end
+        # salirse del then o del else es llegar a su cierre, o a lo que siga del rango si cierra al final
+        self.emit(depth, f"if {test}:")
+        join = else_end if else_end is not None else target
+        join_follow = (join,) + tuple(follow) if join == end else (join,)
+        self.emit_range(index + 1, then_end, depth + 1, loop, join_follow)
+        if else_end is None:
+            return target
+        self.emit(depth, 'else:')
+        self.emit_range(target, else_end, depth + 1, loop, join_follow)
+        return else_end
+
+    def emit_quad(self, index, depth):
+        quad = self.code[index]
+        op = quad[0]
+        if op >= FIRST_ARITHMETIC_OP:
+            self.emit(depth, f"{self.operand(quad[3])} = {self.expression(quad)}")
+        elif op == OP_ASSIGN:
+            self.emit(depth, f"{self.operand(quad[3])} = {self.operand(quad[1])}")
+        elif op == OP_PRINT:
+            self.emit(depth, f"print({self.operand(quad[3])}, end=' ')")
+        elif op == OP_PRINT_STRING:
+            self.emit(depth, f"print({quad[3].strip(chr(34))!r}, end=' ')")
+        elif op == OP_ERA:
+            self.calls.append((quad[1].function, {}))
+        elif op == OP_PARAM:
+            self.emit_param(index, depth)
+        elif op == OP_GOSUB:
+            self.emit_call(depth)
+        else:
+            # igual que la VM, el error sale hasta que se ejecuta
+            self.emit(depth, f"raise ValueError({'Unknown operation: ' + OPCODE_NAMES[op]!r})")
+
+    def emit_param(self, index, depth):
+        # el PARAM copia el valor en ese momento; si el operando se vuelve a escribir antes del
+        # GOSUB (un temporal reusado para el siguiente argumento) se guarda en una variable aparte
+        quad = self.code[index]
+        function, args = self.calls[-1]
+        position = self.param_slots[function].index(quad[3][1])
+        value = self.operand(quad[1])
+        cursor = index + 1
+        while self.code[cursor][0] != OP_GOSUB:
+            if self.written_operand(self.code[cursor]) == quad[1]:
+                self.emit(depth, f"a{index} = {value}")
+                value = f"a{index}"
+                break
+            cursor += 1
+        args[position] = value
+
+    def emit_call(self, depth):
+        # la funcion llamada ve y cambia las globales en G
+        function, args = self.calls.pop()
+        for slot in sorted(self.written_globals):
+            self.emit(depth, f"G[{slot}] = g{slot}")
+        values = ', '.join(args.get(position, '0') for position in range(len(self.param_slots[function])))
+        self.emit(depth, f"{function_name(function)}({values})")
+        for slot in sorted(self.used_globals):
+            self.emit(depth, f"g{slot} = G[{slot}]")
+
+    def emit_dispatcher(self, start, end, entry, depth):
+        # un bloque por cada destino de salto; pc dice cual sigue y salir del rango termina
+        leaders = {start, entry}
+        for index in range(start, end):
+            if self.code[index][0] in JUMP_OPCODES:
+                leaders.add(self.code[index][3])
+                leaders.add(index + 1)
+        leaders = sorted(leader for leader in leaders if start <= leader < end)
+        self.emit(depth, f"pc = {entry}")
+        self.emit(depth, 'while True:')
+        for position, block_start in enumerate(leaders):
+            block_end = leaders[position + 1] if position + 1 < len(leaders) else end
+            self.emit(depth + 1, f"{'if' if position == 0 else 'elif'} pc == {block_start}:")
+            for index in range(block_start, block_end):
+                quad = self.code[index]
+                op = quad[0]
+                if op == OP_GOTO:
+                    self.emit(depth + 2, f"pc = {quad[3]}")
+                elif op == OP_GOTOF:
+                    self.emit(depth + 2, f"pc = {index + 1} if {self.operand(quad[1])} else {quad[3]}")
+                elif op == OP_GOTOV:
+                    self.emit(depth + 2, f"pc = {quad[3]} if {self.operand(quad[1])} else {index + 1}")
+                else:
+                    self.emit_quad(index, depth + 2)
+            if self.code[block_end - 1][0] not in JUMP_OPCODES:
+                self.emit(depth + 2, f"pc = {block_end}")
+        self.emit(depth + 1, 'else:')
+        self.emit(depth + 2, 'break')
+
+class PythonBackend:
+    def __init__(self, compilation_data):
+        self.function_directory = compilation_data['function_directory']
+        self.memory_map = compilation_data['memory_map']
+        code = compilation_data.get('code')
+        if code is None:
+            code = CompactCode.from_quadruples(compilation_data['quadruples'])
+
+        # mismas direcciones ligadas que la VM; las globales empiezan con su nombre
+        program = link_program(code, self.function_directory, self.memory_map)
+        self.global_memory = program['globals']
+        self.generator = PythonCodeGenerator(program['quadruples'], self.function_directory, program['frames'],
+                                             program['constants'])
+        self.namespace = {'G': self.global_memory, 'C': program['constants']}
+        self.source = self.generator.module_source()
+        try:
+            module = compile(self.source, '<babyduck>', 'exec')
+        except (SyntaxError, RecursionError, MemoryError):
+            # si python no acepta el codigo estructurado, todo va por el despachador
+            self.generator.structured = False
+            self.source = self.generator.module_source()
+            module = compile(self.source, '<babyduck>', 'exec')
+        exec(module, self.namespace)
+
+    def execute(self):
+        # misma salida que VirtualMachine.execute: cada print deja un espacio y al final un salto de linea
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, RECURSION_LIMIT))
+        try:
+            self.namespace[function_name(MAIN_FUNCTION)]()
+        except RecursionError:
+            raise RuntimeError(f"Call depth exceeds the Python backend limit of {RECURSION_LIMIT} nested calls") from None
+        finally:
+            sys.setrecursionlimit(limit)
+        print()
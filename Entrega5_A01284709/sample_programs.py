@@ -0,0 +1,345 @@
+test1 = '''
+program myprog;
+var id1,x,y : int; id2: float;
+main {
+    x = 12;
+    id2 = 1-4/2;
+    print("hi:",id2);
+    if (1 > 0) {
+        y = 1;
+        print("Okay si se imprime");
+    } else {
+        y = 0;
+        print("hioakakaokaokoakaoakoa");
+    };
+}
+end
+'''
+
+test2 = '''
+program myprog;
+var id1 : int;
+main {
+    id1 = 0;
+    while (id1 < 10) do {
+        print("Value of id1:", id1);
+        id1 = id1 + 1;
+    };
+}
+end
+'''
+
+test3 = '''
+program myprog;
+var id1 : int; id2 : float;
+void func1(x: int, y: float) [
+var id3 : int;
+    {
+        id2 = x + y;
+        print("id2: ", id2);
+    }
+];
+main {
+    id1 = 2 + 10;
+    func1(id1,2.5);
+}
+end
+'''
+
+test4 = '''
+program myprog;
+var id1 : int;
+main {
+    id1 = 5 + (3 * 2;
+}
+end
+'''
+
+test5 = '''
+program fibonacci;
+var n,a,b,count,temp : int;
+main {
+    n = 10;
+    if (n < 0) {
+        print("Error: n must be greater than 0");
+    };
+    if (n < 1) {
+        print("Fibonacci of", n, "is", 0);
+    };
+    if (n < 2) {
+        print("Fibonacci of", n, "is", 1);
+    } else {
+        a = 0;
+        b = 1;
+        count = 2;
+        while (count < n+1) do {
+            temp = a+b;
+            a = b;
+            b = temp;
+            count = count + 1;
+        };
+        print("Fibonacci of", n, "is", b);
+    };
+}
+end
+'''
+
+test5 = '''
+program fibonacci;
+var input, input2: int;
+void print_fibonacci(n: int, b:int) [
+    {
+        print("Fibonacci of", n, "is", b);
+    }
+];
+void print_factorial(n: int, b:int) [
+    {
+        print("Factorial of", n, "is", b);
+    }
+];
+void factorial(n: int) [
+var result, i: int;
+{
+    if (n < 0) {
+        print("Error: n must be greater than 0");
+    } else {
+        result = 1;
+        i = 1;
+        while (i < n + 1) do {
+            result = result * i;
+            i = i + 1;
+        };
+        print_factorial(n, result);
+    };
+}];
+void fibonacci(n: int) [
+var a,b,count,temp : int;
+{
+    if (n < 0) {
+        print("Error: n must be greater than 0");
+    };
+    if (n < 1) {
+        print_fibonacci(n,0);
+    };
+    if (n < 2) {
+        print_fibonacci(n,1);
+    } else {
+        a = 0;
+        b = 1;
+        count = 2;
+        while (count < n+1) do {
+            temp = a+b;
+            a = b;
+            b = temp;
+            count = count + 1;
+        };
+        print_fibonacci(n,b);
+    };
+}];
+main {
+    input = 10;
+    input2=20;
+    fibonacci(input2);
+    factorial(input);
+}
+end
+'''
+
+test6="""
+program fibonacci_factorial;
+var input: int;
+
+void print_fibonacci(n: int, b: int) [
+    {
+        print("Fibonacci of", n, "is", b);
+    }
+];
+
+void print_factorial(n: int, b: int) [
+    {
+        print("Factorial of", n, "is", b);
+    }
+];
+
+void fibonacci(n: int) [
+var a, b, count, temp: int;
+{
+    if (n < 0) {
+        print("Error: n must be greater than 0");
+    };
+    if (n < 1) {
+        print_fibonacci(n, 0);
+    };
+    if (n < 2) {
+        print_fibonacci(n, 1);
+    } else {
+        a = 0;
+        b = 1;
+        count = 2;
+        while (count < n + 1) do {
+            temp = a + b;
+            a = b;
+            b = temp;
+            count = count + 1;
+        };
+        print_fibonacci(n, b);
+    };
+}];
+
+void factorial(n: int) [
+var result, i: int;
+{
+    if (n < 0) {
+        print("Error: n must be greater than 0");
+    } else {
+        result = 1;
+        i = 1;
+        while (i < n + 1) do {
+            result = result * i;
+            i = i + 1;
+        };
+        print_factorial(n, result);
+    };
+}];
+
+main {
+    input = 10;
+    fibonacci(input);
+    factorial(input);
+}
+end
+"""
+
+test7 = '''
+program distances;
+var i, n, dx, dy, total: int;
+main {
+    n = 10;
+    i = 0;
+    total = 0;
+    while (i < n) do {
+        dx = i - n;
+        dy = i + n;
+        total = total + (i - n) * (i - n) + (i + n) * (i + n);
+        i = i + 1;
+    };
+    print("Total:", total, "last:", dx, dy);
+}
+end
+'''
+
+def generate_program(statements=1000, chain=1):
+    # programa sintetico para benchmarks: `statements` asignaciones en el main,
+    # cada una con una cadena de `chain` sumas (x = x + 1 + 1 ...)
+    rhs = ' + '.join(['x'] + ['1'] * chain)
+    body = '\n'.join(f"    x = {rhs};" for _ in range(statements))
+    return f"program generated;\nvar x : int;\nmain {{\n    x = 0;\n{body}\n    print(x);\n}}\nend\n"
+
+def generate_mixed_program(blocks=100):
+    # programa sintetico con todos los tipos de statement, `blocks` veces el mismo bloque
+    block = """    x = x + 1;
+    if (x > 5) {
+        y = x;
+    } else {
+        y = 2;
+    };
+    while (y < 3) do {
+        y = y + 1;
+    };
+    print("x:", x, y);
+    show(x);
+"""
+    return ("program mixed;\nvar x, y : int;\n"
+            "void show(v: int) [\n    {\n        print(v);\n    }\n];\n"
+            f"main {{\n    x = 0;\n    y = 0;\n{block * blocks}}}\nend\n")
+
+def generate_expression_program(operators=1000, nested=False):
+    # una sola asignacion con `operators` sumas: en cadena (x + x + ...) o
+    # anidada a la derecha con parentesis (x + (x + (...)))
+    if nested:
+        expr = '(x + ' * operators + 'x' + ')' * operators
+    else:
+        expr = ' + '.join(['x'] * (operators + 1))
+    return f"program deep;\nvar x, y : int;\nmain {{\n    x = 1;\n    y = {expr};\n    print(y);\n}}\nend\n"
+
+def generate_nested_loop_program(outer=100, inner=100):
+    # dos ciclos anidados cuyo cuerpo interno recalcula expresiones que no cambian:
+    # m * 2 - m y n - m en todo el programa, i * n dentro del ciclo interno
+    return f'''
+program nested;
+var i, j, n, m, total: int;
+main {{
+    n = {outer};
+    m = {inner};
+    total = 0;
+    i = 0;
+    while (i < n) do {{
+        j = 0;
+        while (j < m * 2 - m) do {{
+            total = total + i * n + j * (n - m);
+            j = j + 1;
+        }};
+        i = i + 1;
+    }};
+    print("total:", total);
+}}
+end
+'''
+
+def generate_call_program(calls=100):
+    # test6 con el main llamando `calls` veces a fibonacci y factorial: programa dominado por
+    # ERA / PARAM / GOSUB / ENDFUNC
+    header = test6.split('main {')[0].replace('var input: int;', 'var input, k: int;')
+    return f'''{header}main {{
+    input = 10;
+    k = 0;
+    while (k < {calls}) do {{
+        fibonacci(input);
+        factorial(input);
+        k = k + 1;
+    }};
+}}
+end
+'''
+
+def generate_wide_caller_program(local_count=1, calls=1000):
+    # una funcion con `local_count` variables locales que llama `calls` veces a una funcion
+    # chica; sirve para ver si el costo de una llamada depende del tamano del frame del llamador
+    names = ', '.join(f"v{i}" for i in range(local_count))
+    return f'''
+program wide;
+void add(x: int) [
+var y: int;
+    {{
+        y = x + 1;
+    }}
+];
+void caller(n: int) [
+var {names}, k: int;
+{{
+    k = 0;
+    while (k < n) do {{
+        add(k);
+        k = k + 1;
+    }};
+}}];
+main {{
+    caller({calls});
+    print("listo");
+}}
+end
+'''
+
+def generate_deep_nesting_program(depth=21):
+    # `depth` ciclos anidados que dan una vuelta cada uno; python no compila mas de 20 ciclos
+    # anidados, asi que el backend y la ejecucion por niveles tienen que usar el despachador
+    opens = ''.join(f'i{k} = 0; while (i{k} < 1) do {{ ' for k in range(depth))
+    closes = ''.join(f'i{k} = i{k} + 1; }}; ' for k in reversed(range(depth)))
+    names = ', '.join(f'i{k}' for k in range(depth))
+    return f'program nesting; var {names}, c: int; main {{ c = 0; {opens}c = c + 1; {closes}print(c); }} end'
+
+def generate_recursive_program(depth=5000):
+    # una funcion que se llama a si misma `depth` veces; la VM no tiene limite de profundidad
+    # y cada llamada del codigo compilado es una llamada de python
+    return (f'program recursion; void down(n: int) [ {{ if (0 < n) {{ down(n - 1); }} else {{ print(n); }}; }} ]; '
+            f'main {{ down({depth}); print({depth}); }} end')
@@ -1,6 +1,21 @@
-from lark import Token
-from ast_generator import Function, Program, Block, Assignment, WhileLoop, IfStatement, PrintStatement, Literal, Variable, BinaryOp, UnaryOp, FunctionCall
+from ast_generator import Function, Program, Block, Assignment, WhileLoop, IfStatement, PrintStatement, Literal, Variable, BinaryOp, FunctionCall, ArenaExpression, ARENA_VARIABLE, ARENA_FIRST_UNARY, ARENA_OPS
 from memory_manager import MemoryManager
+from cfg import CONDITIONAL_JUMP_OPS, JUMP_OPS
+from opcodes import ARITHMETIC_OPS, OPERAND_SUFFIXES
+from optimizer import generic_op, is_temp, quad_reads, quad_writes
+
+# tipos y operadores internados como enteros chicos. NO_TYPE es el "tipo" de una expresion
+# que no genera codigo (los unarios sin doblar); ninguna operacion es valida con el
+TYPE_NAMES = ('int', 'float', 'bool', None)
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+TYPE_COUNT = len(TYPE_NAMES)
+INT_TYPE, FLOAT_TYPE, BOOL_TYPE, NO_TYPE = range(len(TYPE_NAMES))
+OPERATORS = ('+', '-', '*', '/', '>', '<', '!=')
+OPERATOR_CODES = {op: code for code, op in enumerate(OPERATORS)}
+INVALID_TYPE = -1
+
+def cube_index(left_code, op_code, right_code):
+    return (op_code * TYPE_COUNT + left_code) * TYPE_COUNT + right_code
 
 class CuboSemantico:
     def __init__(self):
@@ -31,19 +46,29 @@ class CuboSemantico:
             ('float', '<', 'float'): 'bool',
         }
 
+        # tabla densa: table[(operador * tipos + izquierdo) * tipos + derecho] es el codigo del
+        # tipo resultante o INVALID_TYPE; opcodes guarda en el mismo indice el opcode especializado
+        # que se emite para esa combinacion. se llenan una vez a partir de ops
+        self.table = [INVALID_TYPE] * (len(OPERATORS) * TYPE_COUNT * TYPE_COUNT)
+        self.opcodes = [None] * len(self.table)
+        for (left_type, op, right_type), result_type in self.ops.items():
+            index = cube_index(TYPE_CODES[left_type], OPERATOR_CODES[op], TYPE_CODES[right_type])
+            self.table[index] = TYPE_CODES[result_type]
+            self.opcodes[index] = op + OPERAND_SUFFIXES[(left_type, right_type)]
+
+    def check_codes(self, left_code, op_code, right_code):
+        return self.table[cube_index(left_code, op_code, right_code)]
+
     def check_operation(self, left_type, op, right_type):
-        result = self.ops.get((left_type, op, right_type))
-        if result:
-            return result
-        
-        # si no hay exacto pero la operacion es valida
-        if op in ('+', '-', '*', '/') and {left_type, right_type} == {'int', 'float'}:
-            return 'float'
-            
-        return None
-    
+        # misma consulta con nombres (la usa el constant folding)
+        op_code = OPERATOR_CODES.get(op)
+        if op_code is None or left_type not in TYPE_CODES or right_type not in TYPE_CODES:
+            return None
+        result = self.check_codes(TYPE_CODES[left_type], op_code, TYPE_CODES[right_type])
+        return None if result == INVALID_TYPE else TYPE_NAMES[result]
+
 class SemanticAnalyzer:
-    def __init__(self):
+    def __init__(self, hoist_invariants=False, rotate_loops=False, specialize_ops=False, inline_threshold=0):
         self.semantic_cube = CuboSemantico()
         self.global_vars = {}
         self.current_scope_vars = self.global_vars
@@ -55,6 +80,43 @@ class SemanticAnalyzer:
         self.memory = MemoryManager()
         self.param_count = 0
         self.main_start_quad = None
+        self.peak_temps = {}  # {funcion o 'main': {tipo: temporales vivos al mismo tiempo}}
+        # con hoist_invariants los calculos invariantes de cada while se sacan a un preheader
+        self.hoist_invariants = hoist_invariants
+        # con rotate_loops el while se genera como guarda + cuerpo + condicion al final con GOTOV
+        self.rotate_loops = rotate_loops
+        self.hoisted_quadruples = 0
+        # con specialize_ops los operadores se emiten con el opcode por tipo de operandos ('+i', '<if', ...)
+        self.specialize_ops = specialize_ops
+        # las funciones void sin llamadas con a lo mas inline_threshold cuadruplos de cuerpo se
+        # copian en el lugar de la llamada (0 lo desactiva)
+        self.inline_threshold = inline_threshold
+        self.inlined_calls = 0
+        self.inlined_overhead = 0  # cuadruplos que ya no se ejecutan en cada llamada (ERA, GOSUB, ENDFUNC, ...)
+
+        # tablas de despacho por tipo de nodo
+        self.statement_handlers = {
+            Program: self.process_program,
+            Function: self.process_function,
+            Block: self.process_block,
+            Assignment: self.process_assignment,
+            WhileLoop: self.process_while,
+            IfStatement: self.process_if,
+            PrintStatement: self.process_print,
+            FunctionCall: self.process_function_call,
+        }
+        self.expression_handlers = {
+            Literal: self.process_literal,
+            Variable: self.process_variable,
+            BinaryOp: self.process_binary_op,
+            ArenaExpression: self.process_arena_root,
+        }
+        # en la arena el opcode es el indice de la tabla (ver ARENA_OPS); los unarios no generan codigo
+        self.arena_handlers = [self.process_arena_literal, self.process_arena_variable]
+        self.arena_handlers += [self.process_arena_binary] * (ARENA_FIRST_UNARY - ARENA_VARIABLE - 1)
+        self.arena_handlers += [None] * (len(ARENA_OPS) - ARENA_FIRST_UNARY)
+        # codigo de operador del cubo para cada opcode binario de la arena
+        self.arena_operator_codes = [OPERATOR_CODES.get(op, INVALID_TYPE) for op in ARENA_OPS]
     
     def get_compilation_data(self):
         return {
@@ -106,130 +168,216 @@ class SemanticAnalyzer:
         return True 
 
     def process_ast(self, ast_node):
-        if isinstance(ast_node, Program):
-            # procesamos las declaraciones globales
-            for var_decl in ast_node.variables:
-                for name in var_decl.names:
-                    address = self.memory.allocate_global(name, var_decl.type)
-                    self.global_vars[name] = {
-                        'type': var_decl.type,
-                        'initialized': False,
-                        'scope': 'global',
-                        'address': address
-                    }
-
-            self.quadruples.insert(0, ('MAIN_START', None, None, None))
-
-            # procesamos las funciones en dado de que existan
-            functions = ast_node.functions if isinstance(ast_node.functions, list) else []
-            for func in functions:
-                if isinstance(func, Function):
-                    self.process_function(func)
-                else:
-                    print(f"Warning: Skipping non-Function node in functions list: {type(func)}")
-            
-            # comenzamos con el MAIN_START que apuntara a la primera instruccion del main
-            self.main_start_quad = len(self.quadruples)
-            
-            # procesamos el main
-            self.process_ast(ast_node.main)
-            
-            # actualizamos el MAIN_START con la posicion actual
-            self.quadruples[0] = ('MAIN_START', None, None, self.main_start_quad)
-            
-            # agregamos el ENDPROGRAM al final
-            self.quadruples.append(('ENDPROGRAM', None, None, None))
-        
-        elif isinstance(ast_node, Function):
-            if ast_node.name in self.function_directory:
-                raise NameError(f"Duplicate function: {ast_node.name}")
-            
-            # registramos la funcion
-            self.function_directory[ast_node.name] = {
-                'params': ast_node.parameters,
-                'vars': {},
-                'return_type': 'void'
-            }
-            
-            # actualizamos el nombre de la funcion actual
-            # y entramos al scope de la funcion
-            self.current_function = ast_node.name
-            self.enter_scope()
-            
-            # procesamos los parametros (considerados declarados y inicializados)
-            for param in ast_node.parameters:
-                self.current_scope_vars[param.name] = {
-                    'type': param.type,
-                    'initialized': True,
-                    'scope': 'param'
+        # despachamos por el tipo exacto del nodo, un handler por clase
+        handler = self.statement_handlers.get(type(ast_node))
+        if handler is not None:
+            handler(ast_node)
+
+    def process_program(self, node):
+        # procesamos las declaraciones globales
+        for var_decl in node.variables:
+            for name in var_decl.names:
+                address = self.memory.allocate_global(name, var_decl.type)
+                self.global_vars[name] = {
+                    'type': var_decl.type,
+                    'type_code': TYPE_CODES[var_decl.type],
+                    'initialized': False,
+                    'scope': 'global',
+                    'address': address
                 }
-                self.function_directory[ast_node.name]['vars'][param.name] = param.type
-            
-            # procesamos las variables locales
-            for var_decl in ast_node.variables:
-                for name in var_decl.names:
-                    if name in self.current_scope_vars:
-                        raise NameError(f"Duplicate variable in function {ast_node.name}: {name}")
-                    self.current_scope_vars[name] = {
-                        'type': var_decl.type,
-                        'initialized': False,
-                        'scope': 'local'
-                    }
-                    self.function_directory[ast_node.name]['vars'][name] = var_decl.type
-            
-            # procesamos el cuerpo de la funcion
-            self.process_ast(ast_node.body)
-            
-            self.exit_scope()
-            self.current_function = None
-        
-        elif isinstance(ast_node, Block):
-            # dado el arreglo de statements, procesamos cada uno
-            for stmt in ast_node.statements:
-                self.process_ast(stmt)
-        
-        elif isinstance(ast_node, Assignment):
-            # primero verificamos si la variable existe
-            var_info = self.lookup_variable(ast_node.target, check_initialized=False)
-            if not var_info:
-                raise NameError(f"Undeclared variable: {ast_node.target}")
-            
-            # procesamos el valor derecho de la asignacion
-            result_type = self.process_expression(ast_node.value)
-            
-            # checamos el tipo de la asignacion
-            if var_info['type'] != result_type:
-                if not (var_info['type'] == 'float' and result_type == 'int'):
-                    raise TypeError(f"Cannot assign {result_type} to {var_info['type']}")
-            
-            # al terminar la marcamos como inicializada
-            var_info['initialized'] = True
-            
-            # generamos el quadruple usando la direccion de la variable
-            rhs_value = self.operand_stack.pop()
-            self.quadruples.append((
-                '=', 
-                rhs_value, 
-                None, 
-                var_info['address']
-            ))
 
-        elif isinstance(ast_node, WhileLoop):
-            loop_start = len(self.quadruples)
-            condition_type = self.process_expression(ast_node.condition)
-            
-            if condition_type != 'bool':
-                raise TypeError("While condition must be boolean")
-            
-            # generamos el GOTOF para el false, no sabemos hacia donde aun
-            self.quadruples.append(('GOTOF', self.operand_stack.pop(), None, None))
-            false_jump_pos = len(self.quadruples) - 1
-            
-            # procesamos el cuerpo del while
-            self.process_ast(ast_node.body)
-            
+        self.quadruples.insert(0, ('MAIN_START', None, None, None))
+
+        # procesamos las funciones en dado de que existan
+        for func in node.functions:
+            if not isinstance(func, Function):
+                raise TypeError(f"Expected a Function node in the functions list, got {type(func).__name__}")
+            self.process_function(func)
+        
+        # comenzamos con el MAIN_START que apuntara a la primera instruccion del main
+        self.main_start_quad = len(self.quadruples)
+        
+        # procesamos el main
+        self.memory.reset_temp_peaks()
+        self.process_ast(node.main)
+        self.peak_temps['main'] = self.memory.reset_temp_peaks()
+        
+        # actualizamos el MAIN_START con la posicion actual
+        self.quadruples[0] = ('MAIN_START', None, None, self.main_start_quad)
+        
+        # agregamos el ENDPROGRAM al final
+        self.quadruples.append(('ENDPROGRAM', None, None, None))
+
+    def process_block(self, node):
+        # dado el arreglo de statements, procesamos cada uno
+        for stmt in node.statements:
+            self.process_ast(stmt)
+
+    def process_assignment(self, node):
+        # primero verificamos si la variable existe
+        var_info = self.lookup_variable(node.target, check_initialized=False)
+        if not var_info:
+            raise NameError(f"Undeclared variable: {node.target}")
+        
+        # procesamos el valor derecho de la asignacion
+        result_type = self.process_expression(node.value)
+        
+        # checamos el tipo de la asignacion
+        if var_info['type_code'] != result_type:
+            if not (var_info['type_code'] == FLOAT_TYPE and result_type == INT_TYPE):
+                raise TypeError(f"Cannot assign {TYPE_NAMES[result_type]} to {var_info['type']}")
+        
+        # al terminar la marcamos como inicializada
+        var_info['initialized'] = True
+        
+        # generamos el quadruple usando la direccion de la variable
+        rhs_value = self.operand_stack.pop()
+        self.quadruples.append((
+            '=', 
+            rhs_value, 
+            None, 
+            var_info['address']
+        ))
+        self.memory.release_temp(rhs_value)
+
+    def process_while(self, node):
+        loop_start = len(self.quadruples)
+        condition_type = self.process_expression(node.condition)
+        
+        if condition_type != BOOL_TYPE:
+            raise TypeError("While condition must be boolean")
+        
+        # generamos el GOTOF para el false, no sabemos hacia donde aun
+        condition = self.operand_stack.pop()
+        self.quadruples.append(('GOTOF', condition, None, None))
+        self.memory.release_temp(condition)
+        false_jump_pos = len(self.quadruples) - 1
+        
+        # procesamos el cuerpo del while
+        body_start = len(self.quadruples)
+        self.process_ast(node.body)
+        
+        if self.rotate_loops:
+            # ciclo rotado: la condicion de arriba solo funciona como guarda y se vuelve a
+            # evaluar al final, con un solo salto condicional de regreso al cuerpo
+            self.process_expression(node.condition)
+            condition = self.operand_stack.pop()
+            self.quadruples.append(('GOTOV', condition, None, body_start))
+            self.memory.release_temp(condition)
+        else:
             # generamos el GOTO para donde inicia la condicion
             self.quadruples.append(('GOTO', None, None, loop_start))
+        
+        # actualizamos el GOTOF para el false
+        self.quadruples[false_jump_pos] = (
+            'GOTOF', 
+            self.quadruples[false_jump_pos][1], 
+            None, 
+            len(self.quadruples)
+        )
+
+        if self.hoist_invariants:
+            self.hoist_loop_invariants(loop_start)
+
+    def is_loop_invariant(self, address, written, has_calls):
+        # constantes y direcciones que el ciclo nunca escribe; si el ciclo llama
+        # funciones, cualquier global puede cambiar
+        if address in written:
+            return False
+        segment = self.memory.segment_of(address)
+        return not (has_calls and segment.startswith('global'))
+
+    def is_nonzero_constant(self, address):
+        for const_type, values in self.memory.constants.items():
+            for value, const_address in values.items():
+                if const_address == address:
+                    return value != 0
+        return False
+
+    def hoist_loop_invariants(self, loop_start):
+        # el ciclo completo (condicion, cuerpo y GOTO de regreso) ya esta en quadruples[loop_start:].
+        # un cuadruplo aritmetico cuyos operandos no cambian dentro del ciclo se mueve a un
+        # preheader antes de loop_start, escribiendo a un temporal nuevo que el ciclo no usa;
+        # las lecturas del temporal original se renombran hasta que se vuelve a escribir.
+        # como los ciclos internos ya se procesaron, sus preheaders pueden volver a subir aqui
+        region = self.quadruples[loop_start:]
+        written = {quad_writes(quad) for quad in region}
+        used = written.union(*(quad_reads(quad) for quad in region))
+        has_calls = any(quad[0] == 'GOSUB' for quad in region)
+
+        hoisted = []
+        kept = []  # (posicion original dentro del ciclo, cuadruplo)
+        renamed = {}
+        for offset, quad in enumerate(region):
+            op, arg1, arg2, result = quad
+            if op in ARITHMETIC_OPS:
+                arg1 = renamed.get(arg1, arg1)
+                arg2 = renamed.get(arg2, arg2)
+                # la division se queda en su lugar salvo con divisor constante distinto de cero,
+                # porque el preheader se ejecuta aunque el cuadruplo estuviera dentro de un if
+                if (is_temp(result)
+                        and self.is_loop_invariant(arg1, written, has_calls)
+                        and self.is_loop_invariant(arg2, written, has_calls)
+                        and (generic_op(op) != '/' or self.is_nonzero_constant(arg2))):
+                    temp_type = self.memory.temp_segment(result)[len('temp_'):]
+                    fresh = self.memory.get_temp_address(temp_type, avoid=used)
+                    used.add(fresh)
+                    hoisted.append((op, arg1, arg2, fresh))
+                    renamed[result] = fresh
+                    continue
+                quad = (op, arg1, arg2, result)
+            elif op in ('=', 'PARAM') or op in CONDITIONAL_JUMP_OPS:
+                quad = (op, renamed.get(arg1, arg1), arg2, result)
+            elif op == 'PRINT':
+                quad = (op, arg1, arg2, renamed.get(result, result))
+
+            renamed.pop(quad_writes(quad), None)
+            kept.append((offset, quad))
+
+        if not hoisted:
+            return
+
+        # nueva posicion (relativa a loop_start) de cada cuadruplo del ciclo; un salto a un
+        # cuadruplo que se movio cae en el siguiente que se quedo (el GOTO de regreso salta el preheader)
+        new_offset = [None] * len(region) + [len(region)]
+        for position, (offset, _) in enumerate(kept):
+            new_offset[offset] = len(hoisted) + position
+        for offset in range(len(region) - 1, -1, -1):
+            if new_offset[offset] is None:
+                new_offset[offset] = new_offset[offset + 1]
+
+        loop = []
+        for _, quad in kept:
+            if quad[0] in JUMP_OPS and quad[3] >= loop_start:
+                quad = (quad[0], quad[1], quad[2], loop_start + new_offset[quad[3] - loop_start])
+            loop.append(quad)
+        self.quadruples[loop_start:] = hoisted + loop
+        self.hoisted_quadruples += len(hoisted)
+
+        # despues del ciclo los temporales del preheader ya se pueden reusar
+        for quad in hoisted:
+            self.memory.release_temp(quad[3])
+
+    def process_if(self, node):
+        condition_type = self.process_expression(node.condition)
+        
+        if condition_type != BOOL_TYPE:
+            raise TypeError("If condition must be boolean")
+        
+        # generamos el GOTOF para el false, no sabemos hacia donde aun
+        condition = self.operand_stack.pop()
+        self.quadruples.append(('GOTOF', condition, None, None))
+        self.memory.release_temp(condition)
+        false_jump_pos = len(self.quadruples) - 1
+        
+        # procesamos el then block
+        self.process_ast(node.then_block)
+        
+        # si existe else block, procesamos el else block
+        if node.else_block:
+            # se genera el GOTO para saltar el else block
+            self.quadruples.append(('GOTO', None, None, None))
+            skip_else_pos = len(self.quadruples) - 1
             
             # actualizamos el GOTOF para el false
             self.quadruples[false_jump_pos] = (
@@ -238,64 +386,36 @@ class SemanticAnalyzer:
                 None, 
                 len(self.quadruples)
             )
-        
-        elif isinstance(ast_node, IfStatement):
-            condition_type = self.process_expression(ast_node.condition)
-            
-            if condition_type != 'bool':
-                raise TypeError("If condition must be boolean")
-            
-            # generamos el GOTOF para el false, no sabemos hacia donde aun
-            self.quadruples.append(('GOTOF', self.operand_stack.pop(), None, None))
-            false_jump_pos = len(self.quadruples) - 1
             
-            # procesamos el then block
-            self.process_ast(ast_node.then_block)
+            # procesamos el else block
+            self.process_ast(node.else_block)
             
-            # si existe else block, procesamos el else block
-            if ast_node.else_block:
-                # se genera el GOTO para saltar el else block
-                self.quadruples.append(('GOTO', None, None, None))
-                skip_else_pos = len(self.quadruples) - 1
-                
-                # actualizamos el GOTOF para el false
-                self.quadruples[false_jump_pos] = (
-                    'GOTOF', 
-                    self.quadruples[false_jump_pos][1], 
-                    None, 
-                    len(self.quadruples)
-                )
-                
-                # procesamos el else block
-                self.process_ast(ast_node.else_block)
-                
-                # actualizamos el GOTO para saltar el else block
-                self.quadruples[skip_else_pos] = (
-                    'GOTO', 
-                    None, 
-                    None, 
-                    len(self.quadruples)
-                )
+            # actualizamos el GOTO para saltar el else block
+            self.quadruples[skip_else_pos] = (
+                'GOTO', 
+                None, 
+                None, 
+                len(self.quadruples)
+            )
+        else:
+            # actualizamos el GOTOF para el false
+            self.quadruples[false_jump_pos] = (
+                'GOTOF', 
+                self.quadruples[false_jump_pos][1], 
+                None, 
+                len(self.quadruples)
+            )
+
+    def process_print(self, node):
+        for item in node.items:
+            if isinstance(item, str):
+                self.quadruples.append(('PRINT', None, None, item))
             else:
-                # actualizamos el GOTOF para el false
-                self.quadruples[false_jump_pos] = (
-                    'GOTOF', 
-                    self.quadruples[false_jump_pos][1], 
-                    None, 
-                    len(self.quadruples)
-                )
-        
-        elif isinstance(ast_node, PrintStatement):
-            for item in ast_node.items:
-                if isinstance(item, Token) and item.type == 'CTE_STRING':
-                    self.quadruples.append(('PRINT', None, None, item.value))
-                else:
-                    # si no es un string, procesamos la expresion
-                    self.process_expression(item)
-                    self.quadruples.append(('PRINT', None, None, self.operand_stack.pop()))
-    
-        elif isinstance(ast_node, FunctionCall):
-                self.process_function_call(ast_node)
+                # si no es un string, procesamos la expresion
+                self.process_expression(item)
+                value = self.operand_stack.pop()
+                self.quadruples.append(('PRINT', None, None, value))
+                self.memory.release_temp(value)
 
     def process_function_call(self, func_call):
         # verificamos si la funcion existe
@@ -305,6 +425,7 @@ class SemanticAnalyzer:
         func_info = self.function_directory[func_call.name]
         
         # generamos el ERA para la funcion
+        call_start = len(self.quadruples)
         self.quadruples.append(('ERA', func_call.name, None, None))
         
         # procesamos los argumentos
@@ -316,10 +437,10 @@ class SemanticAnalyzer:
             if self.param_count >= len(func_info['params']):
                 raise TypeError(f"Too many arguments for function '{func_call.name}'")
             
-            expected_type = func_info['params'][self.param_count].type
+            expected_type = TYPE_CODES[func_info['params'][self.param_count].type]
             if arg_type != expected_type:
-                if not (expected_type == 'float' and arg_type == 'int'):
-                    raise TypeError(f"Type mismatch in argument {self.param_count+1} for '{func_call.name}'. Expected {expected_type}, got {arg_type}")
+                if not (expected_type == FLOAT_TYPE and arg_type == INT_TYPE):
+                    raise TypeError(f"Type mismatch in argument {self.param_count+1} for '{func_call.name}'. Expected {TYPE_NAMES[expected_type]}, got {TYPE_NAMES[arg_type]}")
             
             # obtenemos la direccion actual del parametro
             param_addr = func_info['params'][self.param_count].address
@@ -327,6 +448,7 @@ class SemanticAnalyzer:
             # generamos el PARAM usando la direccion actual
             arg_address = self.operand_stack.pop()
             self.quadruples.append(('PARAM', arg_address, None, param_addr))
+            self.memory.release_temp(arg_address)
             self.param_count += 1
         
         # checamos si el numero de parametros es correcto
@@ -341,6 +463,70 @@ class SemanticAnalyzer:
             temp_address = self.memory.get_temp_address(func_info['return_type'])
             self.quadruples.append(('RETURN', None, None, temp_address))
             self.operand_stack.append(temp_address)
+        elif self.inline_threshold:
+            self.inline_call(call_start, func_info)
+
+    def can_inline(self, func_info):
+        # solo funciones ya terminadas (no la que se esta compilando), chicas y sin llamadas
+        if func_info['end_quad'] is None:
+            return False
+        body = self.quadruples[func_info['start_quad']:func_info['end_quad']]
+        if len(body) > self.inline_threshold or any(quad[0] in ('ERA', 'GOSUB', 'RETURN') for quad in body):
+            return False
+        # las variables de la funcion se renombran a temporales; si alguna comparte direccion
+        # con una global (se asignan por nombre) la funcion escribe en la global y se deja la llamada
+        for address in func_info['vars_addresses'].values():
+            if not self.memory.segment_of(address).startswith('local'):
+                return False
+        return True
+
+    def inline_call(self, call_start, func_info):
+        # quadruples[call_start:] es ERA, argumentos con sus PARAM y GOSUB. se sustituye por los
+        # argumentos copiados a temporales del llamador (uno por parametro y variable local) seguidos
+        # del cuerpo de la funcion con esas direcciones renombradas y los saltos recorridos
+        call = self.quadruples[call_start:]
+        if not self.can_inline(func_info):
+            return
+        start, end = func_info['start_quad'], func_info['end_quad']
+        body = self.quadruples[start:end]
+
+        used = set()
+        for quad in call + body:
+            used.update(address for address in quad_reads(quad) if is_temp(address))
+            used.add(quad_writes(quad))
+        renamed = {}
+        for name, address in func_info['vars_addresses'].items():
+            renamed[address] = self.memory.get_temp_address(func_info['vars'][name], avoid=used)
+            used.add(renamed[address])
+
+        inlined = []
+        for quad in call[1:-1]:
+            if quad[0] == 'PARAM':
+                quad = ('=', quad[1], None, renamed[quad[3]])
+            inlined.append(quad)
+
+        # el GOSUB deja las locales en 0; solo hace falta para las que se leen
+        params = {param.address for param in func_info['params']}
+        read = {address for quad in body for address in quad_reads(quad)}
+        zero = self.memory.get_constant_address(0, 'int')
+        for address, temp in renamed.items():
+            if address not in params and address in read:
+                inlined.append(('=', zero, None, temp))
+
+        base = call_start + len(inlined) - start
+        for op, arg1, arg2, result in body:
+            if op in JUMP_OPS:
+                inlined.append((op, renamed.get(arg1, arg1), arg2, result + base))
+            else:
+                inlined.append((op, renamed.get(arg1, arg1), renamed.get(arg2, arg2), renamed.get(result, result)))
+
+        self.quadruples[call_start:] = inlined
+        for temp in renamed.values():
+            self.memory.release_temp(temp)
+        self.inlined_calls += 1
+        # antes cada llamada ejecutaba la secuencia de la llamada, el cuerpo y el ENDFUNC; ahora
+        # solo lo que se copio (los PARAM se volvieron '=' y se agregaron las locales en 0)
+        self.inlined_overhead += len(call) + len(body) + 1 - len(inlined)
 
     def process_function(self, func_node):
         if not isinstance(func_node, Function):
@@ -370,6 +556,7 @@ class SemanticAnalyzer:
             param.address = param_addr
             self.current_scope_vars[param.name] = {
                 'type': param.type,
+                'type_code': TYPE_CODES[param.type],
                 'address': param_addr,
                 'initialized': True,
                 'scope': 'param'
@@ -384,6 +571,7 @@ class SemanticAnalyzer:
                 address = self.memory.allocate_local(name, var_decl.type)
                 self.current_scope_vars[name] = {
                     'type': var_decl.type,
+                    'type_code': TYPE_CODES[var_decl.type],
                     'initialized': False,
                     'scope': 'local',
                     'address': address
@@ -393,7 +581,9 @@ class SemanticAnalyzer:
         self.function_directory[func_node.name]['vars_addresses'] = {name: var['address'] for name, var in self.current_scope_vars.items()}
         
         # procesamos el cuerpo de la funcion
+        self.memory.reset_temp_peaks()
         self.process_ast(func_node.body)
+        self.peak_temps[func_node.name] = self.memory.reset_temp_peaks()
         
         self.exit_scope()
         self.current_function = None
@@ -405,35 +595,110 @@ class SemanticAnalyzer:
         self.function_directory[func_node.name]['end_quad'] = len(self.quadruples) - 1
 
     def process_expression(self, expr):
-        if isinstance(expr, Literal):
-            address = self.memory.get_constant_address(expr.value, expr.type)
-            self.operand_stack.append(address)
-            return expr.type
-            
-        elif isinstance(expr, Variable):
-            var_info = self.lookup_variable(expr.name)
-            if not var_info:
-                raise NameError(f"Undeclared variable: {expr.name}")
-            
-            self.operand_stack.append(var_info['address'])
-            return var_info['type']
-            
-        if isinstance(expr, BinaryOp):
-            left_type = self.process_expression(expr.left)
-            right_type = self.process_expression(expr.right)
-            
-            # checamos si la operacion es valida
-            result_type = self.semantic_cube.check_operation(left_type, expr.op, right_type)
-            if result_type is None:
-                raise TypeError(f"Invalid operation: {left_type} {expr.op} {right_type}")
-            
-            # obtenemos los operandos
-            right_addr = self.operand_stack.pop()
-            left_addr = self.operand_stack.pop()
-            
-            # generamos el temp para el resultado
-            temp_address = self.memory.get_temp_address(result_type)
-            self.quadruples.append((expr.op, left_addr, right_addr, temp_address))
-            self.operand_stack.append(temp_address)
-            
-            return result_type
\ No newline at end of file
+        # mismo despacho por tipo que process_ast; regresa el codigo del tipo del resultado
+        handler = self.expression_handlers.get(type(expr))
+        if handler is not None:
+            return handler(expr)
+        return NO_TYPE
+
+    def process_literal(self, expr):
+        address = self.memory.get_constant_address(expr.value, expr.type)
+        self.operand_stack.append(address)
+        return TYPE_CODES[expr.type]
+
+    def process_variable(self, expr):
+        var_info = self.lookup_variable(expr.name)
+        if not var_info:
+            raise NameError(f"Undeclared variable: {expr.name}")
+        
+        self.operand_stack.append(var_info['address'])
+        return var_info['type_code']
+
+    def process_binary_op(self, expr):
+        # recorrido post-orden con pila explicita en lugar de recursion, para que expresiones
+        # muy largas o muy anidadas no lleguen al limite de recursion; el orden de los
+        # cuadruplos y temporales es el mismo: izquierdo, derecho y luego el operador
+        operand_types = []
+        stack = [(expr, False)]
+        while stack:
+            node, operands_ready = stack.pop()
+            if operands_ready:
+                right_type = operand_types.pop()
+                left_type = operand_types.pop()
+                operand_types.append(self.emit_binary_op(OPERATOR_CODES[node.op], left_type, right_type))
+            elif type(node) is BinaryOp:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                operand_types.append(self.process_expression(node))
+        return operand_types[0]
+
+    def emit_binary_op(self, op_code, left_type, right_type):
+        # los dos operandos ya estan en el operand_stack; los tipos y el operador llegan como codigos.
+        # el indice del cubo se calcula una vez aqui y se lee en linea el tipo resultante y el opcode
+        index = (op_code * TYPE_COUNT + left_type) * TYPE_COUNT + right_type
+        cube = self.semantic_cube
+        result_type = cube.table[index]
+        if result_type == INVALID_TYPE:
+            raise TypeError(f"Invalid operation: {TYPE_NAMES[left_type]} {OPERATORS[op_code]} {TYPE_NAMES[right_type]}")
+        op = cube.opcodes[index] if self.specialize_ops else OPERATORS[op_code]
+        
+        # obtenemos los operandos
+        right_addr = self.operand_stack.pop()
+        left_addr = self.operand_stack.pop()
+        
+        # generamos el temp para el resultado
+        temp_address = self.memory.get_temp_address(TYPE_NAMES[result_type])
+        self.quadruples.append((op, left_addr, right_addr, temp_address))
+        self.operand_stack.append(temp_address)
+
+        # el cuadruplo ya consumio los operandos, sus temporales se pueden reusar
+        self.memory.release_temp(left_addr)
+        self.memory.release_temp(right_addr)
+        
+        return result_type
+
+    def process_arena_root(self, expr):
+        return self.process_arena_expression(expr.arena, expr.index)
+
+    def process_arena_expression(self, arena, index):
+        # mismo recorrido que process_expression pero leyendo los arreglos del ExpressionArena,
+        # despachando por opcode en lugar de por clase
+        handler = self.arena_handlers[arena.ops[index]]
+        if handler is not None:
+            return handler(arena, index)
+        return NO_TYPE
+
+    def process_arena_literal(self, arena, index):
+        value, const_type = arena.literals[arena.values[index]]
+        address = self.memory.get_constant_address(value, const_type)
+        self.operand_stack.append(address)
+        return TYPE_CODES[const_type]
+
+    def process_arena_variable(self, arena, index):
+        var_info = self.lookup_variable(arena.names[arena.values[index]])
+        self.operand_stack.append(var_info['address'])
+        return var_info['type_code']
+
+    def process_arena_binary(self, arena, index):
+        # mismo recorrido post-orden que process_binary_op; en la pila un indice
+        # negativo (~index) marca un nodo cuyos operandos ya fueron procesados
+        ops, left, right = arena.ops, arena.left, arena.right
+        operator_codes = self.arena_operator_codes
+        operand_types = []
+        stack = [index]
+        while stack:
+            index = stack.pop()
+            if index < 0:
+                index = ~index
+                right_type = operand_types.pop()
+                left_type = operand_types.pop()
+                operand_types.append(self.emit_binary_op(operator_codes[ops[index]], left_type, right_type))
+            elif ARENA_VARIABLE < ops[index] < ARENA_FIRST_UNARY:
+                stack.append(~index)
+                stack.append(right[index])
+                stack.append(left[index])
+            else:
+                operand_types.append(self.process_arena_expression(arena, index))
+        return operand_types[0]
@@ -0,0 +1,67 @@
+from cfg import ControlFlowGraph, block_leaders
+from sample_programs import test1, test2, test3, test5, test6
+from vm import compile_program
+
+# while con un if dentro, escrito a mano para que no dependa de las optimizaciones
+LOOP_QUADRUPLES = [
+    ('MAIN_START', None, None, 1),
+    ('=', 8000, None, 1000),
+    ('<', 1000, 8001, 7000),       # 2: condicion del while
+    ('GOTOF', 7000, None, 10),
+    ('<', 1000, 8002, 7001),       # 4: condicion del if
+    ('GOTOF', 7001, None, 7),
+    ('+', 1001, 8003, 1001),
+    ('+', 1000, 8003, 1000),       # 7: union del if
+    ('GOTO', None, None, 2),
+    ('PRINT', None, None, 1001),   # 9: inalcanzable
+    ('PRINT', None, None, 1000),   # 10: salida del while
+    ('ENDPROGRAM', None, None, None),
+]
+
+def test_block_leaders():
+    assert block_leaders(LOOP_QUADRUPLES) == [0, 1, 2, 4, 6, 7, 9, 10]
+
+def test_successors_and_predecessors():
+    graph = ControlFlowGraph(LOOP_QUADRUPLES)
+    assert graph.ranges() == [(0, 1), (1, 2), (2, 4), (4, 6), (6, 7), (7, 9), (9, 10), (10, 12)]
+    assert [block.successors for block in graph.blocks] == [[1], [2], [7, 3], [5, 4], [5], [2], [7], []]
+    assert graph.blocks[2].predecessors == [1, 5]
+    assert graph.blocks[5].predecessors == [3, 4]
+
+def test_immediate_dominators():
+    graph = ControlFlowGraph(LOOP_QUADRUPLES)
+    assert graph.immediate_dominators() == [0, 0, 1, 2, 3, 3, None, 2]
+    # la cabecera del while domina el cuerpo y la salida, pero no al reves
+    assert all(graph.dominates(2, block) for block in (3, 4, 5, 7))
+    assert not graph.dominates(5, 2)
+    # la union del if no la domina la rama del then
+    assert not graph.dominates(4, 5)
+    assert not graph.dominates(0, 6)
+
+def test_functions_get_their_own_entry():
+    program = compile_program(test3)
+    graph = ControlFlowGraph(program['quadruples'])
+    for function, info in program['function_directory'].items():
+        # la entrada es el bloque del FUNC, justo antes del primer cuadruplo del cuerpo
+        entry = graph.blocks[graph.entries[function]]
+        assert graph.quadruples[entry.start][0] == 'FUNC'
+        assert entry.end == info['start_quad']
+        assert all(block.function == function for block in graph.function_blocks(function))
+    assert graph.blocks[graph.entries['main']].start == 0
+
+def test_sample_programs_are_consistent():
+    for source in (test1, test2, test3, test5, test6):
+        quadruples = compile_program(source)['quadruples']
+        graph = ControlFlowGraph(quadruples)
+        idom = graph.immediate_dominators()
+        for block in graph.blocks:
+            # cada salto cae en el inicio de un bloque de la misma funcion
+            last = quadruples[block.end - 1]
+            if last[0] in ('GOTO', 'GOTOF', 'GOTOV'):
+                assert graph.blocks[graph.block_at[last[3]]].function == block.function
+            if idom[block.index] is not None:
+                assert graph.dominates(idom[block.index], block.index)
+                assert graph.dominates(graph.entries[block.function], block.index)
+        # serializar los bloques sin cambios devuelve los mismos cuadruplos
+        blocks = [quadruples[block.start:block.end] for block in graph.blocks]
+        assert graph.serialize(blocks) == quadruples
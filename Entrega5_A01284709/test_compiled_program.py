@@ -0,0 +1,52 @@
+import base64
+import contextlib
+import io
+import json
+import pytest
+import compiled_program
+from sample_programs import test1, test2, test3, test5, test6
+from vm import compile_program, VirtualMachine
+
+def run(compilation_data):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        VirtualMachine(compilation_data).execute()
+    return output.getvalue()
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'program.bdc'
+    for source in (test1, test2, test3, test5, test6):
+        data = compile_program(source)
+        compiled_program.save(data, path)
+        loaded = compiled_program.load(path)
+        code = loaded['code']
+        for column in compiled_program.CODE_COLUMNS:
+            assert getattr(code, column) == getattr(data['code'], column)
+        assert code.strings == data['code'].strings
+        assert code.functions == data['code'].functions
+        # las tuplas se recuperan tal cual, con la lista de Parameter del FUNC desde el directorio
+        assert code.to_quadruples(loaded['function_directory']) == data['quadruples']
+        assert loaded['function_directory'] == data['function_directory']
+        assert loaded['memory_map'] == data['memory_map']
+        assert run(loaded) == run(data)
+
+def test_columns_are_base64_array_bytes(tmp_path):
+    path = tmp_path / 'program.bdc'
+    data = compile_program(test3)
+    compiled_program.save(data, path)
+    with open(path) as f:
+        saved = json.load(f)
+    assert saved['version'] == compiled_program.FORMAT_VERSION
+    for column in compiled_program.CODE_COLUMNS:
+        assert base64.b64decode(saved['code'][column]) == getattr(data['code'], column).tobytes()
+
+def test_rejects_other_versions(tmp_path):
+    path = tmp_path / 'program.bdc'
+    compiled_program.save(compile_program(test1), path)
+    with open(path) as f:
+        saved = json.load(f)
+    saved['version'] = compiled_program.FORMAT_VERSION - 1
+    with open(path, 'w') as f:
+        json.dump(saved, f)
+    with pytest.raises(ValueError, match='Unsupported compiled program version'):
+        compiled_program.load(path)
@@ -0,0 +1,52 @@
+import contextlib
+import io
+from sample_programs import test1, test2, test3, test5, test6
+from vm import compile_program, VirtualMachine
+
+FOLDING_PROGRAM = '''
+program folding;
+var a: int;
+b, c: float;
+main {
+    a = 2 * 3 + 1;
+    b = (4 + 6) / 2 * a;
+    c = 1.5 * 2 + a;
+    print(a, b, c);
+}
+end
+'''
+
+def run(source, **options):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        VirtualMachine(compile_program(source, **options)).execute()
+    return output.getvalue()
+
+def test_folding_keeps_output():
+    for source in (test1, test2, test3, test5, test6, FOLDING_PROGRAM):
+        expected = run(source, fold_constants=False)
+        assert run(source) == expected
+        assert run(source, expression_arena=True) == expected
+
+def test_folding_removes_literal_quadruples():
+    for arena in (False, True):
+        stats = {}
+        folded = compile_program(FOLDING_PROGRAM, expression_arena=arena, stats=stats)
+        plain = compile_program(FOLDING_PROGRAM, expression_arena=arena, fold_constants=False)
+        # 2 * 3, 2 * 3 + 1, 4 + 6, (4 + 6) / 2 y 1.5 * 2
+        assert stats['folded_quadruples'] == 5
+        assert len(folded['quadruples']) < len(plain['quadruples'])
+    assert run(FOLDING_PROGRAM) == "7 35.0 10.0 \n"
+
+def test_folding_unary_literal():
+    stats = {}
+    source = 'program z; var a: int; main { a = 2 * -3 + 1; print(a); } end'
+    compile_program(source, stats=stats)
+    assert stats['folded_unary'] == 1
+    assert stats['folded_quadruples'] == 2
+    assert run(source) == "-5 \n"
+
+def test_division_by_zero_is_not_folded():
+    stats = {}
+    compile_program('program z; var c: float; main { c = 1 / 0; } end', stats=stats)
+    assert stats['folded_quadruples'] == 0
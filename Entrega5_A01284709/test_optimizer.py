@@ -0,0 +1,166 @@
+import contextlib
+import io
+from sample_programs import test1, test2, test3, test5, test6, test7
+from vm import compile_program, VirtualMachine
+
+# main en linea recta donde la CSE eliminaba un cuadruplo cuyo temporal todavia leia otro
+# alias; al materializar ese alias despues, la copia sobreescribia el temporal
+CSE_ALIAS_PROGRAM = '''
+program aliases;
+var a, b, c, d, e: int;
+main {
+    a = 1;
+    b = 2;
+    c = 3;
+    d = 4;
+    e = a + b;
+    c = ((a + b) * ((a + c) * (a + c))) + (((1) + (b)) * (a + c));
+    a = ((d + b) + (c - a)) + (((d + b) + (b * 2)) + ((d) + (a + b)));
+    print(a, b, c, d, e);
+}
+end
+'''
+
+def run(source, **options):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        VirtualMachine(compile_program(source, **options)).execute()
+    return output.getvalue()
+
+def test_cse_keeps_temp_read_by_alias():
+    assert run(CSE_ALIAS_PROGRAM, eliminate_subexpressions=False) == "82 2 60 4 3 \n"
+    assert run(CSE_ALIAS_PROGRAM) == "82 2 60 4 3 \n"
+
+# b vale 0: a / b solo se ejecuta dentro del if, asi que no puede salir al preheader;
+# 0 < b y a / 2 si son invariantes
+LICM_PROGRAM = '''
+program licm;
+var i, a, b: int;
+c, d: float;
+main {
+    i = 0;
+    a = 4;
+    b = 0;
+    c = 0.0;
+    d = 0.0;
+    while (i < 3) do {
+        if (0 < b) {
+            c = a / DIVISOR;
+        };
+        d = a / 2 + d;
+        i = i + 1;
+    };
+    print(i, c, d);
+}
+end
+'''
+
+def executed(source, **options):
+    vm = VirtualMachine(compile_program(source, **options))
+    with contextlib.redirect_stdout(io.StringIO()):
+        vm.execute()
+    return vm.executed_instructions
+
+def test_licm_keeps_division_by_variable_in_loop():
+    source = LICM_PROGRAM.replace('DIVISOR', 'b')
+    stats = {}
+    compile_program(source, stats=stats)
+    assert stats['hoisted_quadruples'] == 2
+    assert run(source, hoist_invariants=False) == "3 0.0 6.0 \n"
+    assert run(source) == "3 0.0 6.0 \n"
+    assert executed(source) < executed(source, hoist_invariants=False)
+
+def test_licm_keeps_division_by_zero_constant_in_loop():
+    source = LICM_PROGRAM.replace('DIVISOR', '0')
+    stats = {}
+    compile_program(source, stats=stats)
+    assert stats['hoisted_quadruples'] == 2
+    assert run(source) == "3 0.0 6.0 \n"
+
+def test_licm_sample_programs():
+    for source in (test1, test2, test3, test5, test6, test7):
+        assert run(source) == run(source, hoist_invariants=False)
+    # n + 1 de la condicion del while sale del ciclo en fibonacci y factorial
+    assert executed(test5) < executed(test5, hoist_invariants=False)
+
+# ciclos anidados, uno interno que no corre en la primera vuelta y uno que nunca entra
+ROTATION_PROGRAM = '''
+program rotation;
+var i, j, s: int;
+main {
+    i = 0;
+    s = 0;
+    while (i < 4) do {
+        j = 0;
+        while (j < i) do {
+            s = s + j;
+            j = j + 1;
+        };
+        i = i + 1;
+    };
+    while (s < 0) do {
+        s = s - 1;
+    };
+    print(i, j, s);
+}
+end
+'''
+
+def test_rotated_loops_branch_back_with_gotov():
+    data = compile_program(ROTATION_PROGRAM, rotate_loops=True)
+    assert sum(quad[0] == 'GOTOV' for quad in data['quadruples']) == 3
+    assert run(ROTATION_PROGRAM, rotate_loops=True) == "4 3 4 \n"
+    assert run(ROTATION_PROGRAM) == "4 3 4 \n"
+    # una sola rama condicional por vuelta en vez de GOTOF + GOTO
+    assert executed(ROTATION_PROGRAM, rotate_loops=True) < executed(ROTATION_PROGRAM)
+
+def test_rotation_sample_programs():
+    for source in (test1, test2, test3, test5, test6, test7):
+        assert run(source, rotate_loops=True) == run(source)
+
+# twice se inlinea dentro del while; show dentro de swap y swap en el main tambien, porque con el
+# marco propio del linker los PARAM ya no pisan los parametros que lee el llamador
+INLINE_PROGRAM = '''
+program inlining;
+var i: int;
+void twice(x: int) [
+var y: int;
+{
+    y = x * 2;
+    print(y);
+}];
+void show(n: int, b: int) [
+{
+    print(n, b);
+}];
+void swap(n: int, b: int) [
+{
+    show(b, n);
+}];
+main {
+    i = 0;
+    while (i < 3) do {
+        twice(i);
+        i = i + 1;
+    };
+    swap(1, 2);
+}
+end
+'''
+
+def test_inlining_small_void_function():
+    stats = {}
+    quadruples = compile_program(INLINE_PROGRAM, inline_threshold=8, stats=stats)['quadruples']
+    assert stats['inlined_calls'] == 3
+    assert not any(quad[0] == 'GOSUB' for quad in quadruples)
+    assert run(INLINE_PROGRAM, inline_threshold=8) == run(INLINE_PROGRAM, inline_threshold=0)
+    # inlined_overhead es lo que ahorra cada ejecucion de la llamada (twice corre 3 veces)
+    source = INLINE_PROGRAM.replace('show(b, n);', 'print(b, n);').replace('swap(1, 2);', '')
+    stats = {}
+    compile_program(source, inline_threshold=8, stats=stats)
+    saved = executed(source, inline_threshold=0) - executed(source, inline_threshold=8)
+    assert saved == 3 * stats['inlined_overhead'] > 0
+
+def test_inlining_sample_programs():
+    for source in (test1, test2, test3, test5, test6, test7):
+        assert run(source, inline_threshold=32) == run(source, inline_threshold=0)
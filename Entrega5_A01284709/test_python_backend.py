@@ -0,0 +1,47 @@
+import contextlib
+import io
+import pytest
+import python_backend
+from python_backend import PythonBackend
+from sample_programs import (test1, test2, test3, test5, test6, test7, generate_call_program, generate_deep_nesting_program,
+                             generate_nested_loop_program, generate_recursive_program)
+from vm import compile_program, VirtualMachine
+
+def run(make, compilation_data):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        make(compilation_data).execute()
+    return output.getvalue()
+
+def test_backend_matches_vm():
+    programs = (test1, test2, test3, test5, test6, test7, generate_nested_loop_program(5, 5), generate_call_program(20))
+    for source in programs:
+        for options in ({}, {'rotate_loops': True}, {'specialize_ops': False}, {'inline_threshold': 0}):
+            data = compile_program(source, **options)
+            assert run(PythonBackend, data) == run(VirtualMachine, data)
+
+def test_deep_nesting_uses_dispatcher():
+    data = compile_program(generate_deep_nesting_program(21))
+    backend = PythonBackend(data)
+    assert 'pc = ' in backend.source
+    assert run(PythonBackend, data) == run(VirtualMachine, data) == "1 \n"
+    # con poca anidacion se sigue generando el while
+    assert 'pc = ' not in PythonBackend(compile_program(generate_deep_nesting_program(5))).source
+
+def test_compile_error_falls_back_to_dispatcher(monkeypatch):
+    # sin el limite de anidacion python rechaza los 21 while; se regenera con el despachador
+    monkeypatch.setattr(python_backend, 'MAX_NESTING', 1000)
+    data = compile_program(generate_deep_nesting_program(21))
+    backend = PythonBackend(data)
+    assert not backend.generator.structured
+    assert run(PythonBackend, data) == "1 \n"
+
+def test_deep_recursion():
+    data = compile_program(generate_recursive_program(5000))
+    assert run(PythonBackend, data) == run(VirtualMachine, data) == "0 5000 \n"
+
+def test_recursion_past_limit_is_reported(monkeypatch):
+    monkeypatch.setattr(python_backend, 'RECURSION_LIMIT', 2000)
+    data = compile_program(generate_recursive_program(5000))
+    with pytest.raises(RuntimeError, match='Call depth exceeds'):
+        run(PythonBackend, data)
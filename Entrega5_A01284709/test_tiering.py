@@ -0,0 +1,53 @@
+import contextlib
+import io
+import python_backend
+from cfg import MAIN_FUNCTION
+from sample_programs import (test1, test2, test3, test5, test6, test7, generate_call_program, generate_deep_nesting_program,
+                             generate_nested_loop_program, generate_recursive_program)
+from vm import compile_program, VirtualMachine
+
+def run(compilation_data, **options):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        vm = VirtualMachine(compilation_data, **options)
+        vm.execute()
+    return output.getvalue(), vm
+
+def test_tiering_matches_vm():
+    programs = (test1, test2, test3, test5, test6, test7, generate_nested_loop_program(5, 5), generate_call_program(20))
+    for source in programs:
+        for options in ({}, {'rotate_loops': True}, {'inline_threshold': 0}):
+            data = compile_program(source, **options)
+            expected, _ = run(data)
+            for threshold in (1, 2, 10):
+                assert run(data, tier_threshold=threshold)[0] == expected
+
+def test_hot_functions_are_promoted():
+    data = compile_program(generate_call_program(20), inline_threshold=0)
+    output, vm = run(data, tier_threshold=10)
+    assert output == run(data)[0]
+    promoted = {promotion.function for promotion in vm.promotions}
+    assert {MAIN_FUNCTION, 'fibonacci', 'factorial'} <= promoted
+
+def test_deep_nesting_is_promoted():
+    data = compile_program(generate_deep_nesting_program(21))
+    output, vm = run(data, tier_threshold=1)
+    assert output == run(data)[0] == "1 \n"
+    assert [promotion.function for promotion in vm.promotions] == [MAIN_FUNCTION]
+
+def test_compile_error_keeps_interpreting(monkeypatch):
+    # sin el limite de anidacion python rechaza los 21 while: no se promueve nada y sigue la VM
+    monkeypatch.setattr(python_backend, 'MAX_NESTING', 1000)
+    data = compile_program(generate_deep_nesting_program(21))
+    output, vm = run(data, tier_threshold=1)
+    assert output == "1 \n"
+    assert vm.promotions == []
+    assert MAIN_FUNCTION not in vm.promotable
+
+def test_recursive_functions_stay_interpreted():
+    data = compile_program(generate_recursive_program(5000))
+    output, vm = run(data, tier_threshold=10)
+    assert output == run(data)[0] == "0 5000 \n"
+    # down es recursiva y el main la llama
+    assert vm.promotable == set()
+    assert vm.promotions == []
@@ -0,0 +1,22 @@
+import parsing
+from sample_programs import test1, test2, test3, test5, test6, generate_program
+from tokenizer import BabyDuckTokenizer
+
+PROGRAMS = [test1, test2, test3, test5, test6, generate_program(statements=50, chain=3),
+            'program s; main { print("dos\nlineas", 1.5); } end']
+
+def token_fields(token):
+    return (token.type, token.value, token.start_pos, token.line, token.column,
+            token.end_line, token.end_column, token.end_pos)
+
+def test_tokens_match_lark_lexer():
+    # mismos tipos, valores y posiciones (inicio y fin) que el lexer de lark
+    lark_parser = parsing.build_parser('lalr')
+    tokenizer = BabyDuckTokenizer()
+    for source in PROGRAMS:
+        expected = [token_fields(token) for token in lark_parser.lex(source)]
+        assert [token_fields(token) for token in tokenizer.tokenize(source)] == expected
+
+def test_fast_tokenizer_builds_same_ast():
+    for source in PROGRAMS:
+        assert parsing.parse_program(source, fast_tokenizer=True) == parsing.parse_program(source)
@@ -0,0 +1,49 @@
+import contextlib
+import io
+from sample_programs import test1, test2, test3, test5, test6, test7
+from vm import BINARY_HANDLERS, compile_program, VirtualMachine
+
+MIXED_PROGRAM = '''
+program mixed;
+var i, j: int;
+x, y: float;
+main {
+    i = 7;
+    j = 2;
+    x = 2.5;
+    y = i / j + x * i - j;
+    if (i < x * j) {
+        print("menor");
+    } else {
+        print("mayor");
+    };
+    print(i + j, i * x, x - j, i / x, j > x, y);
+}
+end
+'''
+
+def run(source, **options):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        VirtualMachine(compile_program(source, **options)).execute()
+    return output.getvalue()
+
+def test_specialized_opcodes_follow_operand_types():
+    ops = {quad[0] for quad in compile_program(MIXED_PROGRAM)['quadruples']}
+    assert {'/i', '*fi', '-fi', '+f', '<if', '*if', '+i', '/if', '>if'} <= ops
+    assert not ops & set('+-*/<>')
+    generic = {quad[0] for quad in compile_program(MIXED_PROGRAM, specialize_ops=False)['quadruples']}
+    assert {'+', '*', '/', '<', '>', '-'} <= generic
+
+def test_specialized_handlers_differ_from_generic():
+    # los mezclados convierten el operando int, los genericos revisan tipos en ejecucion
+    assert BINARY_HANDLERS['+i'] is not BINARY_HANDLERS['+']
+    assert BINARY_HANDLERS['+if'] is not BINARY_HANDLERS['+fi']
+    assert type(BINARY_HANDLERS['+if'](1, 0.5)) is float
+    assert type(BINARY_HANDLERS['*fi'](0.5, 2)) is float
+    assert BINARY_HANDLERS['<i'](1, 2) and not BINARY_HANDLERS['<if'](2, 1.5)
+
+def test_specialized_output_matches_generic():
+    assert run(MIXED_PROGRAM) == run(MIXED_PROGRAM, specialize_ops=False) == "mayor 9 17.5 0.5 2.8 False 19.0 \n"
+    for source in (test1, test2, test3, test5, test6, test7):
+        assert run(source) == run(source, specialize_ops=False)
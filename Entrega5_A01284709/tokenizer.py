@@ -0,0 +1,123 @@
+import re
+
+# scanner escrito a mano para los terminales de grammar.py; produce los mismos
+# tipos de token que el lexer de lark, asi que puede alimentar al parser LALR
+
+KEYWORDS = {
+    'program': 'PROGRAM',
+    'main': 'MAIN',
+    'end': 'END',
+    'int': 'INT',
+    'float': 'FLOAT',
+    'void': 'VOID',
+    'if': 'IF',
+    'else': 'ELSE',
+    'while': 'WHILE',
+    'do': 'DO',
+    'print': 'PRINT',
+    'var': 'VAR',
+}
+
+PUNCTUATION = {
+    '+': 'PLUS',
+    '-': 'MINUS',
+    '*': 'TIMES',
+    '/': 'DIVIDE',
+    '=': 'EQUAL',
+    '!=': 'NEQ',
+    '<': 'LT',
+    '>': 'GT',
+    '(': 'LPAR',
+    ')': 'RPAR',
+    '[': 'LBRACK',
+    ']': 'RBRACK',
+    '{': 'LBRACE',
+    '}': 'RBRACE',
+    ':': 'COLON',
+    ';': 'SEMI',
+    ',': 'COMMA',
+}
+
+# un solo patron con un grupo por clase de token; el orden importa (float antes que int).
+# el espacio en blanco se consume como prefijo de cada token para no generar un match extra,
+# y ERROR atrapa cualquier otro caracter para que finditer nunca se salte texto
+TOKEN_PATTERN = re.compile(r'''
+    [ \t\f\r\n]*
+    (?:
+        (?P<ID>[a-zA-Z_][a-zA-Z0-9_]*)
+      | (?P<CTE_FLOAT>[0-9]+\.[0-9]+)
+      | (?P<CTE_INT>[0-9]+)
+      | (?P<CTE_STRING>"[^"]*")
+      | (?P<PUNCT>!=|[-+*/=<>()\[\]{}:;,])
+      | (?P<ERROR>.)
+      | $
+    )
+''', re.VERBOSE | re.DOTALL)
+
+class BabyDuckTokenizer:
+    def __init__(self, token_class=None):
+        if token_class is None:
+            from lark import Token as token_class
+        self.token_class = token_class
+        # _future_new evita el chequeo de argumentos obsoletos de Token.__new__ (lark y standalone)
+        self._new_token = getattr(token_class, '_future_new', token_class)
+
+    def tokenize(self, text):
+        new_token = self._new_token
+        keywords = KEYWORDS
+        punctuation = PUNCTUATION
+        find = text.find
+
+        line = 1
+        line_start = 0  # posicion donde empieza la linea actual, para calcular la columna
+        no_newline = len(text) + 1
+        newline = find('\n')
+        if newline < 0:
+            newline = no_newline
+
+        for m in TOKEN_PATTERN.finditer(text):
+            kind = m.lastgroup
+            if kind is None:  # solo quedaba espacio en blanco
+                break
+
+            pos = m.start(kind)
+            # avanzamos las lineas que quedaron antes de este token (espacios o strings multilinea)
+            while newline < pos:
+                line += 1
+                line_start = newline + 1
+                newline = find('\n', line_start)
+                if newline < 0:
+                    newline = no_newline
+
+            value = m.group(kind)
+            if kind == 'ID':
+                kind = keywords.get(value, 'ID')
+            elif kind == 'PUNCT':
+                kind = punctuation[value]
+            elif kind == 'ERROR':
+                raise SyntaxError(f"Unexpected character {value!r} at line {line}, column {pos - line_start + 1}")
+
+            column = pos - line_start + 1
+            end_pos = pos + len(value)
+            # igual que lark, la posicion final es la del caracter que sigue al token; solo un
+            # string puede abarcar varias lineas
+            if kind == 'CTE_STRING' and '\n' in value:
+                yield new_token(kind, value, pos, line, column, line + value.count('\n'),
+                                len(value) - value.rfind('\n'), end_pos)
+            else:
+                yield new_token(kind, value, pos, line, column, line, column + len(value), end_pos)
+
+class TokenizedParser:
+    # envuelve un parser LALR de lark (o del standalone) y le pasa los tokens de BabyDuckTokenizer
+    # con la API publica del parser interactivo, sin tocar el lexer interno del frontend
+    def __init__(self, parser, tokenizer):
+        self.parser = parser
+        self.tokenizer = tokenizer
+
+    def parse(self, text):
+        interactive = self.parser.parse_interactive(text)
+        feed_token = interactive.feed_token
+        token = None
+        for token in self.tokenizer.tokenize(text):
+            feed_token(token)
+        return interactive.feed_eof(token)
@@ -1,243 +1,585 @@
-from typing import Union
-from lark import Lark
-from ast_generator import ASTTransformer
+import operator
+import time
+from dataclasses import dataclass
 from semantic_analyzer import SemanticAnalyzer
-from grammar import grammar
+from constant_folding import ConstantFolder
+from cfg import MAIN_FUNCTION
+from linker import FRAME_SEGMENT, link_program
+from opcodes import (OPCODE_NAMES, SPECIALIZED_OPS, OP_ASSIGN, OP_ENDFUNC, OP_ENDPROGRAM, OP_ERA, OP_FUNC, OP_GOSUB, OP_GOTO, OP_GOTOF,
+                     OP_GOTOV, OP_MAIN_START, OP_PARAM, OP_PRINT, OP_PRINT_STRING, CompactCode)
+from optimizer import eliminate_common_subexpressions, peephole
+from parsing import parse_program
+from python_backend import PythonCodeGenerator, entry_name, function_name
+
+OPERATOR_FUNCTIONS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '>': operator.gt,
+    '<': operator.lt,
+    '!=': operator.ne,
+}
+
+def promoting_handler(function):
+    # operador generico: los tipos se conocen hasta ejecutar, asi que se revisan en cada
+    # cuadruplo y el int se promueve a float si los operandos son de distinto tipo
+    def handler(left, right):
+        if type(left) is not type(right):
+            return function(float(left), float(right))
+        return function(left, right)
+    return handler
+
+def float_left_handler(function):
+    # int op float: el cubo ya sabe que solo el izquierdo es int
+    return lambda left, right: function(float(left), right)
+
+def float_right_handler(function):
+    # float op int
+    return lambda left, right: function(left, float(right))
+
+# un handler por cada opcode aritmetico o relacional. los genericos revisan tipos en ejecucion;
+# los especializados que emite el analizador con specialize_ops ya no: 'i' (int, int) y
+# 'f' (float, float) van directo a la funcion del operador y los mezclados convierten con float()
+# solo el operando int
+BINARY_HANDLERS = {op: promoting_handler(function) for op, function in OPERATOR_FUNCTIONS.items()}
+SPECIALIZED_HANDLERS = {'i': lambda function: function, 'f': lambda function: function,
+                        'if': float_left_handler, 'fi': float_right_handler}
+for opcode, op in SPECIALIZED_OPS.items():
+    BINARY_HANDLERS[opcode] = SPECIALIZED_HANDLERS[opcode[len(op):]](OPERATOR_FUNCTIONS[op])
+# la misma tabla indexada por el opcode entero (None para los que no son operadores)
+OPCODE_HANDLERS = [BINARY_HANDLERS.get(name) for name in OPCODE_NAMES]
+
+@dataclass(slots=True)
+class Promotion:
+    function: str
+    trigger: str      # la funcion caliente que la causo (ella misma, o la que la llama)
+    calls: int        # GOSUB y saltos hacia atras contados hasta ese momento
+    back_edges: int
+    pc: int           # cuadruplo en el que se decidio
+    seconds: float    # desde el inicio de execute
 
 class VirtualMachine:
-    def __init__(self, compilation_data):
-        self.quadruples = compilation_data['quadruples']
+    def __init__(self, compilation_data, tier_threshold=None):
         self.function_directory = compilation_data['function_directory']
         self.memory_map = compilation_data['memory_map']
-        
-        # inicializamos los segmentos de memoria
-        self.global_memory = {}
-        self.local_memory = {}
-        self.temp_memory = {}
-        self.constant_memory = {}
-        
-        # inicializamos las variables globales
-        for var_name, address in self.memory_map['globals'].items():
-            self.global_memory[address] = var_name
-            
-        # inicializamos las constantes
-        for const_type, const_values in self.memory_map['constants'].items():
-            for value, address in const_values.items():
-                if const_type == 'int':
-                    self.constant_memory[address] = int(value)
-                elif const_type == 'float':
-                    self.constant_memory[address] = float(value)
-        
+        # el programa en columnas de enteros; si solo vienen los cuadruplos (directo del analizador) se codifican aqui
+        self.compact_code = compilation_data.get('code')
+        if self.compact_code is None:
+            self.compact_code = CompactCode.from_quadruples(compilation_data['quadruples'])
+
+        # resolvemos todas las direcciones a (segmento, slot) antes de ejecutar
+        program = link_program(self.compact_code, self.function_directory, self.memory_map)
+        self.code = program['quadruples']
+        self.frames = program['frames']
+
+        # inicializamos los segmentos de memoria: constantes, globales y el frame actual
+        self.constant_memory = program['constants']
+        self.global_memory = program['globals']
+        self.memory = [self.constant_memory, self.global_memory, list(self.frames[MAIN_FUNCTION].initial)]
+
         self.pc = 0 # puntero de programa
-        self.call_stack = [] # pila de llamadas a funciones
-        self.current_function = None # funcion actual
-        self.param_mapping = {}  # mapeo de nombres de parametros a direcciones
-        self.func_stack = []  # pila de contextos de funciones
+        self.call_stack = [] # pila de llamadas a funciones: (cuadruplo de regreso, frame del llamador)
+        self.pending_frames = []  # frames creados por ERA que todavia no entran con GOSUB
+        # frames libres de cada funcion: el ENDFUNC regresa el suyo y el siguiente ERA lo reusa,
+        # asi una llamada no crea ni copia listas
+        self.frame_pools = {name: [] for name in self.frames}
+        self.executed_instructions = 0  # cuadruplos despachados, para medir las optimizaciones
+
+        # ejecucion por niveles: con tier_threshold, cuando los GOSUB a una funcion mas los saltos
+        # hacia atras dentro de ella llegan al umbral, la funcion (y las que llama) se compila con
+        # python_backend y sus handlers se cambian a la version compilada a media ejecucion. el
+        # estado pasa por el frame (parametros, o todo el frame al entrar a la cabeza de un ciclo)
+        # y por global_memory. los cuadruplos que corren compilados no cuentan en executed_instructions
+        self.tier_threshold = tier_threshold
+        self.call_counts = {name: 0 for name in self.frames}
+        self.back_edge_counts = {name: 0 for name in self.frames}
+        self.promotions = []
+        self.compiled_functions = set()
+        self.started = time.perf_counter()
+        if tier_threshold is not None:
+            self.generator = PythonCodeGenerator(self.code, self.function_directory, self.frames, self.constant_memory)
+            self.namespace = {'G': self.global_memory, 'C': self.constant_memory}
+            self.owners = [MAIN_FUNCTION] * len(self.code)
+            for name, (start, end) in self.generator.ranges.items():
+                self.owners[start:end] = [name] * (end - start)
+            # GOSUB que llaman a cada funcion y saltos hacia atras dentro de cada una, para cambiarlos al promoverla
+            self.call_sites = {name: [] for name in self.frames}
+            self.back_edge_sites = {name: [] for name in self.frames}
+            code = self.code
+            for pc, op in enumerate(code.ops):
+                if op == OP_GOSUB:
+                    self.call_sites[code.functions[code.arg1[pc]]].append(pc)
+                elif (op == OP_GOTO or op == OP_GOTOV) and code.result[pc] <= pc:
+                    self.back_edge_sites[self.owners[pc]].append(pc)
+            # el codigo compilado llama a las funciones con llamadas de python, asi que una funcion
+            # recursiva llegaria al limite de recursion donde la VM sigue; esas, y las que las
+            # llaman, se quedan en la VM y sus saltos y GOSUB ni cuentan
+            self.callees = {name: [] for name in self.frames}
+            for name, sites in self.call_sites.items():
+                for site in sites:
+                    if name not in self.callees[self.owners[site]]:
+                        self.callees[self.owners[site]].append(name)
+            recursive = {name for name in self.frames
+                         if any(name in self.reachable_functions(callee) for callee in self.callees[name])}
+            self.promotable = {name for name in self.frames if not recursive.intersection(self.reachable_functions(name))}
+
+        # cada cuadruplo ya decodificado a un handler sin argumentos (ver decode)
+        self.program = self.decode()
 
     def execute(self):
-        while self.pc < len(self.quadruples):
-            quad = self.quadruples[self.pc]
-            op = quad[0]
+        # threaded code: cada handler hace su trabajo y regresa el indice del siguiente
+        program = self.program
+        pc = self.pc
+        executed = 0
+        self.started = time.perf_counter()
+        while pc >= 0:
+            pc = program[pc]()
+            executed += 1
+        self.executed_instructions += executed
+        print()
+
+    def decode(self):
+        # un decoder por opcode entero; los operadores comparten decode_binary
+        decoders = [self.decode_binary if handler is not None else self.decode_unknown for handler in OPCODE_HANDLERS]
+        decoders[OP_MAIN_START] = self.decode_goto
+        decoders[OP_GOTO] = self.decode_goto
+        decoders[OP_FUNC] = self.decode_nop
+        decoders[OP_ENDFUNC] = self.decode_endfunc
+        decoders[OP_ERA] = self.decode_era
+        decoders[OP_PARAM] = self.decode_param
+        decoders[OP_GOSUB] = self.decode_gosub
+        decoders[OP_ASSIGN] = self.decode_copy
+        decoders[OP_GOTOF] = self.decode_gotof
+        decoders[OP_GOTOV] = self.decode_gotov
+        decoders[OP_PRINT] = self.decode_print
+        decoders[OP_PRINT_STRING] = self.decode_print_string
+        decoders[OP_ENDPROGRAM] = self.decode_end
+        if self.tier_threshold is not None:
+            decoders[OP_GOTO] = self.decode_counted_goto
+            decoders[OP_GOTOV] = self.decode_counted_gotov
+            decoders[OP_GOSUB] = self.decode_counted_gosub
+        # se decodifica directo de las columnas del LinkedCode, sin armar tuplas por cuadruplo
+        ops = self.code.ops
+        program = [decoders[ops[pc]](pc) for pc in range(len(ops))]
+        # si el programa no termina con ENDPROGRAM, salir del final tambien lo detiene
+        program.append(self.decode_end(len(program)))
+        return program
+
+    def decode_binary(self, pc):
+        code, memory, next_pc = self.code, self.memory, pc + 1
+        handler = OPCODE_HANDLERS[code.ops[pc]]
+        left_segment, left = code.arg1_segment[pc], code.arg1[pc]
+        right_segment, right = code.arg2_segment[pc], code.arg2[pc]
+        result_segment, result = code.result_segment[pc], code.result[pc]
+        def run():
+            memory[result_segment][result] = handler(memory[left_segment][left], memory[right_segment][right])
+            return next_pc
+        return run
+
+    def decode_copy(self, pc):
+        code, memory, next_pc = self.code, self.memory, pc + 1
+        source_segment, source = code.arg1_segment[pc], code.arg1[pc]
+        result_segment, result = code.result_segment[pc], code.result[pc]
+        def run():
+            memory[result_segment][result] = memory[source_segment][source]
+            return next_pc
+        return run
+
+    def decode_goto(self, pc):
+        target = self.code.result[pc]
+        return lambda: target
+
+    def decode_nop(self, pc):
+        next_pc = pc + 1
+        return lambda: next_pc
+
+    def decode_gotof(self, pc):
+        code, memory, next_pc = self.code, self.memory, pc + 1
+        segment, slot, target = code.arg1_segment[pc], code.arg1[pc], code.result[pc]
+        def run():
+            return next_pc if memory[segment][slot] else target
+        return run
+
+    def decode_gotov(self, pc):
+        # salto si la condicion es verdadera (fin de un ciclo rotado)
+        code, memory, next_pc = self.code, self.memory, pc + 1
+        segment, slot, target = code.arg1_segment[pc], code.arg1[pc], code.result[pc]
+        def run():
+            return target if memory[segment][slot] else next_pc
+        return run
+
+    def decode_print_string(self, pc):
+        text, next_pc = self.code.strings[self.code.result[pc]].strip('"'), pc + 1
+        def run():
+            print(text, end=' ')
+            return next_pc
+        return run
+
+    def decode_print(self, pc):
+        code, memory, next_pc = self.code, self.memory, pc + 1
+        segment, slot = code.result_segment[pc], code.result[pc]
+        def run():
+            print(memory[segment][slot], end=' ')
+            return next_pc
+        return run
+
+    def decode_era(self, pc):
+        # frame para la funcion, del pool si hay uno libre; los argumentos se siguen evaluando en el frame actual
+        layout, pending, next_pc = self.frames[self.code.functions[self.code.arg1[pc]]], self.pending_frames, pc + 1
+        pool, initial, start, end = self.frame_pools[layout.function], layout.initial, layout.locals_start, layout.locals_end
+        zeros = initial[start:end]
+        def run():
+            if pool:
+                frame = pool.pop()
+                frame[start:end] = zeros
+            else:
+                frame = initial[:]
+            pending.append(frame)
+            return next_pc
+        return run
+
+    def decode_param(self, pc):
+        # copiamos el argumento al slot del parametro en el frame nuevo
+        code, memory, pending, next_pc = self.code, self.memory, self.pending_frames, pc + 1
+        source_segment, source, slot = code.arg1_segment[pc], code.arg1[pc], code.result[pc]
+        def run():
+            pending[-1][slot] = memory[source_segment][source]
+            return next_pc
+        return run
+
+    def decode_gosub(self, pc):
+        memory, pending, call_stack, target, return_pc = self.memory, self.pending_frames, self.call_stack, self.code.result[pc], pc + 1
+        def run():
+            call_stack.append((return_pc, memory[FRAME_SEGMENT]))
+            memory[FRAME_SEGMENT] = pending.pop()
+            return target
+        return run
+
+    def decode_endfunc(self, pc):
+        # regresamos al llamador con su frame y el de la funcion queda libre en su pool
+        memory, call_stack, next_pc = self.memory, self.call_stack, pc + 1
+        pool = self.frame_pools[self.code.functions[self.code.arg1[pc]]]
+        def run():
+            if call_stack:
+                pool.append(memory[FRAME_SEGMENT])
+                return_pc, memory[FRAME_SEGMENT] = call_stack.pop()
+                return return_pc
+            return next_pc
+        return run
+
+    def decode_end(self, pc):
+        return lambda: -1
+
+    def decode_unknown(self, pc):
+        # el error sale hasta que se ejecuta, igual que en el ciclo con elif
+        op = OPCODE_NAMES[self.code.ops[pc]]
+        def run():
+            raise ValueError(f"Unknown operation: {op}")
+        return run
+
+    def decode_counted_goto(self, pc):
+        # salto hacia atras: cuenta para la funcion que lo contiene
+        target = self.code.result[pc]
+        if target > pc or self.owners[pc] not in self.promotable:
+            return self.decode_goto(pc)
+        function, calls, back_edges, threshold = self.owners[pc], self.call_counts, self.back_edge_counts, self.tier_threshold
+        def run():
+            back_edges[function] += 1
+            if calls[function] + back_edges[function] >= threshold:
+                return self.promote(function, pc)
+            return target
+        return run
+
+    def decode_counted_gotov(self, pc):
+        # solo cuenta cuando el ciclo rotado si regresa
+        code, memory, next_pc = self.code, self.memory, pc + 1
+        segment, slot, target = code.arg1_segment[pc], code.arg1[pc], code.result[pc]
+        if target > pc or self.owners[pc] not in self.promotable:
+            return self.decode_gotov(pc)
+        function, calls, back_edges, threshold = self.owners[pc], self.call_counts, self.back_edge_counts, self.tier_threshold
+        def run():
+            if not memory[segment][slot]:
+                return next_pc
+            back_edges[function] += 1
+            if calls[function] + back_edges[function] >= threshold:
+                return self.promote(function, pc)
+            return target
+        return run
+
+    def decode_counted_gosub(self, pc):
+        function, calls, back_edges, threshold = self.callee(pc), self.call_counts, self.back_edge_counts, self.tier_threshold
+        gosub = self.decode_gosub(pc)
+        if function not in self.promotable:
+            return gosub
+        def run():
+            calls[function] += 1
+            if calls[function] + back_edges[function] >= threshold:
+                return self.promote(function, pc)
+            return gosub()
+        return run
+
+    def reachable_functions(self, function):
+        # la funcion y las que llama directa o indirectamente, en preorden
+        order, stack = [], [function]
+        while stack:
+            name = stack.pop()
+            if name not in order:
+                order.append(name)
+                stack.extend(reversed(self.callees[name]))
+        return order
+
+    def callee(self, pc):
+        # funcion que llama el GOSUB en pc
+        return self.code.functions[self.code.arg1[pc]]
+
+    def promote(self, function, pc):
+        # compilamos y seguimos con el handler nuevo del cuadruplo que disparo la promocion
+        self.compile_function(function, pc)
+        return self.program[pc]()
+
+    def compile_function(self, function, pc):
+        # el codigo compilado llama directo a las versiones compiladas de las demas funciones, asi
+        # que se compilan todas las que alcanza. si python rechaza alguna, ninguna se promueve:
+        # sus handlers dejan de contar y el programa sigue interpretado
+        functions = [name for name in self.reachable_functions(function) if name not in self.compiled_functions]
+        try:
+            modules = [compile(self.generator.function_source(name), '<babyduck>', 'exec') for name in functions]
+        except (SyntaxError, RecursionError, MemoryError):
+            for name in functions:
+                self.promotable.discard(name)
+                self.stop_counting(name)
+            return
+        for name, module in zip(functions, modules):
+            exec(module, self.namespace)
+            self.compiled_functions.add(name)
+            self.promotions.append(Promotion(name, function, self.call_counts[name], self.back_edge_counts[name],
+                                             pc, time.perf_counter() - self.started))
+
+        for name in functions:
+            for site in self.call_sites.get(name, ()):
+                self.program[site] = self.decode_compiled_gosub(site)
+            # solo se entra por los ciclos de afuera: entrar a uno anidado necesitaria el despachador
+            # por bloques, asi que los de adentro dejan de contar y siguen en la VM hasta el siguiente
+            # regreso del de afuera
+            sites, targets = self.back_edge_sites[name], self.code.result
+            for site in sites:
+                if not any(targets[other] < targets[site] and other > site for other in sites):
+                    self.program[site] = self.decode_entry(site)
+                else:
+                    self.program[site] = self.decode_back_edge(site)
+
+    def stop_counting(self, function):
+        for site in self.call_sites.get(function, ()):
+            self.program[site] = self.decode_gosub(site)
+        for site in self.back_edge_sites[function]:
+            self.program[site] = self.decode_back_edge(site)
+
+    def decode_back_edge(self, pc):
+        # el salto hacia atras sin contar
+        if self.code.ops[pc] == OP_GOTO:
+            return self.decode_goto(pc)
+        return self.decode_gotov(pc)
+
+    def decode_compiled_gosub(self, pc):
+        # los PARAM ya escribieron el frame pendiente; sus parametros son los argumentos de la
+        # funcion compilada y el frame regresa a su pool
+        function = self.callee(pc)
+        compiled, pending, return_pc = self.namespace[function_name(function)], self.pending_frames, pc + 1
+        pool, slots = self.frame_pools[function], self.generator.param_slots[function]
+        def run():
+            frame = pending.pop()
+            compiled(*[frame[slot] for slot in slots])
+            pool.append(frame)
+            return return_pc
+        return run
+
+    def decode_entry(self, pc):
+        # salto hacia atras en una funcion ya compilada que sigue corriendo en la VM (el ciclo
+        # del main, o una llamada que empezo antes de promoverla): entramos a la version
+        # compilada en la cabeza del ciclo con el frame actual y al terminar seguimos en el
+        # ENDFUNC / ENDPROGRAM de la funcion
+        code = self.code
+        function, header = self.owners[pc], code.result[pc]
+        name = entry_name(function, header)
+        if name not in self.namespace:
+            # si python no acepta la entrada, el ciclo sigue en la VM
+            try:
+                module = compile(self.generator.entry_source(function, header), '<babyduck>', 'exec')
+            except (SyntaxError, RecursionError, MemoryError):
+                return self.decode_back_edge(pc)
+            exec(module, self.namespace)
+        compiled, memory, end = self.namespace[name], self.memory, self.generator.ranges[function][1]
+        if code.ops[pc] == OP_GOTO:
+            def run():
+                compiled(memory[FRAME_SEGMENT])
+                return end
+            return run
+        segment, slot, next_pc = code.arg1_segment[pc], code.arg1[pc], pc + 1
+        def run():
+            if not memory[segment][slot]:
+                return next_pc
+            compiled(memory[FRAME_SEGMENT])
+            return end
+        return run
+
+    def execute_switch(self):
+        # el ciclo anterior con la cadena de elif, para comparar en benchmark.py. lee directo de
+        # las columnas del LinkedCode
+        code = self.code
+        ops, arg1s, arg2s, results = code.ops, code.arg1, code.arg2, code.result
+        arg1_segments, arg2_segments, result_segments = code.arg1_segment, code.arg2_segment, code.result_segment
+        memory = self.memory
+        while self.pc < len(ops):
+            pc = self.pc
+            op = ops[pc]
+            self.executed_instructions += 1
+
+            # los operadores se despachan con una sola consulta a la tabla en lugar de la cadena de elif
+            handler = OPCODE_HANDLERS[op]
+            if handler is not None:
+                memory[result_segments[pc]][results[pc]] = handler(memory[arg1_segments[pc]][arg1s[pc]],
+                                                                   memory[arg2_segments[pc]][arg2s[pc]])
+                self.pc += 1
+                continue
             
-            if op == 'MAIN_START':
-                self.pc = quad[3]
+            if op == OP_MAIN_START:
+                self.pc = results[pc]
                 continue
                 
-            elif op == 'FUNC':
+            elif op == OP_FUNC:
                 # solo movemos al siguiente quad
                 self.pc += 1
                 continue
                 
-            elif op == 'ENDFUNC':
-                # Restaura el contexto anterior
-                if self.func_stack:
-                    context = self.func_stack.pop()
-                    self.local_memory = context['local_memory']
-                    self.temp_memory = context['temp_memory']
-                    self.param_mapping = context['param_mapping']
-                    self.pc = self.call_stack.pop() if self.call_stack else self.pc + 1
+            elif op == OP_ENDFUNC:
+                # regresamos al llamador con su frame
+                if self.call_stack:
+                    self.frame_pools[code.functions[arg1s[pc]]].append(memory[FRAME_SEGMENT])
+                    self.pc, memory[FRAME_SEGMENT] = self.call_stack.pop()
                 else:
                     self.pc += 1
                 continue
 
-                
-            elif op == 'ERA':
-                # Guarda el contexto actual
-                self.func_stack.append({
-                    'local_memory': dict(self.local_memory),
-                    'temp_memory': dict(self.temp_memory),
-                    'param_mapping': dict(self.param_mapping),
-                })
-                self.local_memory = {}
-                self.temp_memory = {}
-                self.param_mapping = {}
+            elif op == OP_ERA:
+                # frame nuevo con el layout de la funcion; los argumentos se siguen
+                # evaluando en el frame actual
+                self.pending_frames.append(self.allocate_frame(self.frames[code.functions[arg1s[pc]]]))
                 self.pc += 1
                 continue
 
-                
-            elif op == 'PARAM':
-                # asignamos el valor del parametro en la memoria local
-                param_value = self.get_value(quad[1])
-                param_addr = quad[3]
-                self.local_memory[param_addr] = param_value
+            elif op == OP_PARAM:
+                # copiamos el argumento al slot del parametro en el frame nuevo
+                self.pending_frames[-1][results[pc]] = memory[arg1_segments[pc]][arg1s[pc]]
                 self.pc += 1
                 continue
                 
-            elif op == 'GOSUB':
-                self.call_stack.append(self.pc + 1)
-                func_info = self.function_directory[quad[1]]
-                self.pc = func_info['start_quad']
-                # Inicializa variables locales de la función llamada
-                vars_addresses = func_info["vars_addresses"]
-                for k, v in vars_addresses.items():
-                    if v not in self.local_memory:
-                        self.local_memory[v] = 0
+            elif op == OP_GOSUB:
+                self.call_stack.append((pc + 1, memory[FRAME_SEGMENT]))
+                memory[FRAME_SEGMENT] = self.pending_frames.pop()
+                self.pc = results[pc]
                 continue
 
-                
-            elif op == '=':
-                src_value = self.get_value(quad[1])
-                dest_addr = quad[3]
-                self.set_value(dest_addr, src_value)
-                
-            elif op == '+':
-                left = self.get_value(quad[1])
-                right = self.get_value(quad[2])
-                result = left + right
-                self.temp_memory[quad[3]] = result
-            elif op == '-':
-                left = self.get_value(quad[1])
-                right = self.get_value(quad[2])
-                result = left - right
-                self.temp_memory[quad[3]] = result
-                
-            elif op == '*':
-                left = self.get_value(quad[1])
-                right = self.get_value(quad[2])
-                result = left * right
-                self.temp_memory[quad[3]] = result
-                
-            elif op == '/':
-                left = self.get_value(quad[1])
-                right = self.get_value(quad[2])
-                result = left / right
-                self.temp_memory[quad[3]] = result
-            
-            elif op == '>':
-                left = self.get_value(quad[1])
-                right = self.get_value(quad[2])
-                result = left > right
-                self.temp_memory[quad[3]] = result
-                
-            elif op == '<':
-                left = self.get_value(quad[1])
-                right = self.get_value(quad[2])
-                result = left < right
-                self.temp_memory[quad[3]] = result
-                
-            elif op == '!=':
-                left = self.get_value(quad[1])
-                right = self.get_value(quad[2])
-                result = left != right
-                self.temp_memory[quad[3]] = result
-                
-            elif op == 'GOTOF':
-                condition = self.get_value(quad[1])
-                if not condition:
-                    self.pc = quad[3]
+            elif op == OP_ASSIGN:
+                memory[result_segments[pc]][results[pc]] = memory[arg1_segments[pc]][arg1s[pc]]
+
+            elif op == OP_GOTOF:
+                if not memory[arg1_segments[pc]][arg1s[pc]]:
+                    self.pc = results[pc]
                     continue
 
                 self.pc += 1
                 continue
 
-                
-            elif op == 'GOTO':
-                self.pc = quad[3]
+            elif op == OP_GOTOV:
+                # salto si la condicion es verdadera (fin de un ciclo rotado)
+                if memory[arg1_segments[pc]][arg1s[pc]]:
+                    self.pc = results[pc]
+                    continue
+
+                self.pc += 1
+                continue
+
+            elif op == OP_GOTO:
+                self.pc = results[pc]
                 continue
                 
-            elif op == 'PRINT':
-                item = quad[3]
-                if isinstance(item, str) and item.startswith('"'):
-                    print(item.strip('"'), end=' ')
-                else:
-                    value = self.get_value(item)
-                    print(value, end=' ')
+            elif op == OP_PRINT:
+                print(memory[result_segments[pc]][results[pc]], end=' ')
+
+            elif op == OP_PRINT_STRING:
+                print(code.strings[results[pc]].strip('"'), end=' ')
                     
-            elif op == 'ENDPROGRAM':
+            elif op == OP_ENDPROGRAM:
                 break
                 
             else:
-                raise ValueError(f"Unknown operation: {op}")
+                raise ValueError(f"Unknown operation: {OPCODE_NAMES[op]}")
                 
             self.pc += 1
 
         print()
 
-    def get_value(self, address: Union[int, str]):
-        # manejamos los nombres de los parametros
-        if isinstance(address, str) and address.startswith('param'):
-            param_addr = self.param_mapping.get(address)
-            if param_addr is None:
-                raise ValueError(f"Unknown parameter: {address}")
-            address = param_addr
-            
-        # checamos la memoria de constantes primero
-        if address in self.constant_memory:
-            return self.constant_memory[address]
-            
-        # checamos la memoria global
-        if address in self.global_memory:
-            return self.global_memory[address]
-            
-        # checamos la memoria local
-        if address in self.local_memory:
-            return self.local_memory[address]
-            
-        # checamos la memoria temporal
-        if address in self.temp_memory:
-            return self.temp_memory[address]
-        
-        # current context stack
-        if address in self.func_stack[-1]["local_memory"]:
-            return self.func_stack[-1]["local_memory"][address]
-        if address in self.func_stack[-1]["temp_memory"]:
-            return self.func_stack[-1]["temp_memory"][address]
-        if address in self.func_stack[-1]["param_mapping"]:
-            return self.func_stack[-1]["param_mapping"][address]
-            
-        raise ValueError(f"Unknown address: {address}")
-
-    def set_value(self, address: Union[int, str], value):
-        # manejamos los nombres de los parametros
-        if isinstance(address, str) and address.startswith('param'):
-            param_addr = self.param_mapping.get(address)
-            if param_addr is None:
-                raise ValueError(f"Unknown parameter: {address}")
-            address = param_addr
-            
-        # variables globales
-        if address in self.global_memory:
-            self.global_memory[address] = value
-        # variables locales
-        elif address in self.local_memory:
-            self.local_memory[address] = value
-        # variables temporales
-        elif isinstance(address, int) and address >= 5000:
-            self.temp_memory[address] = value
-        else:
-            raise ValueError(f"Cannot set value at unknown address: {address}")
-
-def compile_and_execute(source_code):
-    parser = Lark(grammar, start='start')
-    transformer = ASTTransformer()
-    analyzer = SemanticAnalyzer()
-    
+    def allocate_frame(self, layout):
+        pool = self.frame_pools[layout.function]
+        if not pool:
+            return layout.initial[:]
+        frame = pool.pop()
+        frame[layout.locals_start:layout.locals_end] = layout.initial[layout.locals_start:layout.locals_end]
+        return frame
+
+def compile_program(source_code, parser_mode='lalr', inline_transform=True, expression_arena=False, fast_tokenizer=False, fold_constants=True, hoist_invariants=True, rotate_loops=False, specialize_ops=True, inline_threshold=8, eliminate_subexpressions=True, peephole_optimize=True, timings=None, stats=None):
+    # si se pasa un dict en timings, guardamos ahi los segundos de cada fase;
+    # en stats quedan los contadores de las optimizaciones
+    if timings is None:
+        timings = {}
+    if stats is None:
+        stats = {}
+
+    start = time.perf_counter()
+    ast = parse_program(source_code, parser_mode, inline_transform, expression_arena, fast_tokenizer)
+    timings['parse'] = time.perf_counter() - start
+
+    if fold_constants:
+        start = time.perf_counter()
+        folder = ConstantFolder()
+        folder.fold(ast)
+        stats['folded_quadruples'] = folder.removed_quadruples
+        stats['folded_unary'] = folder.folded_unary
+        timings['fold'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyzer = SemanticAnalyzer(hoist_invariants=hoist_invariants, rotate_loops=rotate_loops, specialize_ops=specialize_ops,
+                                inline_threshold=inline_threshold)
+    analyzer.process_ast(ast)
+    compilation_data = analyzer.get_compilation_data()
+    stats['peak_temps'] = analyzer.peak_temps
+    stats['hoisted_quadruples'] = analyzer.hoisted_quadruples
+    stats['inlined_calls'] = analyzer.inlined_calls
+    stats['inlined_overhead'] = analyzer.inlined_overhead
+    timings['semantic'] = time.perf_counter() - start
+
+    if eliminate_subexpressions:
+        start = time.perf_counter()
+        stats['cse_quadruples'] = eliminate_common_subexpressions(compilation_data['quadruples'], compilation_data['function_directory'])
+        timings['cse'] = time.perf_counter() - start
+
+    if peephole_optimize:
+        start = time.perf_counter()
+        stats['peephole_quadruples'] = peephole(compilation_data['quadruples'], compilation_data['function_directory'])
+        timings['peephole'] = time.perf_counter() - start
+
+    # los pases trabajan sobre la lista de tuplas; al final el programa se codifica en columnas
+    # de enteros, que es lo que consumen la VM y compiled_program
+    start = time.perf_counter()
+    compilation_data['code'] = CompactCode.from_quadruples(compilation_data['quadruples'])
+    timings['encode'] = time.perf_counter() - start
+
+    return compilation_data
+
+def compile_and_execute(source_code, **options):
     try:
-        parse_tree = parser.parse(source_code)
-        ast = transformer.transform(parse_tree)
-        analyzer.process_ast(ast.children[0])
-        
-        compilation_data = analyzer.get_compilation_data()
+        compilation_data = compile_program(source_code, **options)
         
         vm = VirtualMachine(compilation_data)
         vm.execute()